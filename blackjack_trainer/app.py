@@ -1,3 +1,5 @@
+import uuid
+
 import streamlit as st
 
 
@@ -14,6 +16,7 @@ from ui.analytics_view import render_analytics
 from ui.simulation_view import render_simulation
 from data.game_session import GameSession
 from data.database import Database
+from data.session_pool import SessionPool
 
 
 st.markdown(GLOBAL_CSS, unsafe_allow_html=True)
@@ -26,12 +29,26 @@ def get_database():
     return Database()
 
 
+@st.cache_resource
+def get_session_pool() -> SessionPool:
+    """Process-wide pool: tabs share models per player, idle sessions get closed."""
+    return SessionPool(get_database())
+
+
+ROUND_STATE_KEYS = ["round_started", "round_result", "dealer_final_cards",
+                    "dealer_final_value", "sim_results"]
+
+
 def get_game_session() -> GameSession:
-    """GameSession persists in session_state across Streamlit reruns."""
-    if "gs" not in st.session_state:
-        db = get_database()
-        st.session_state["gs"] = GameSession(db=db)
-    return st.session_state["gs"]
+    """Each browser session holds only a token; the GameSession lives in the pool."""
+    token = st.session_state.setdefault("gs_token", uuid.uuid4().hex)
+    gs = get_session_pool().get(token)
+    if st.session_state.get("gs_session_id") != gs.session_id:
+        # fresh or re-created after idle eviction: drop UI state of the old round
+        for key in ROUND_STATE_KEYS:
+            st.session_state.pop(key, None)
+        st.session_state["gs_session_id"] = gs.session_id
+    return gs
 
 
 
@@ -96,11 +113,8 @@ with st.sidebar:
     
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("🔄 New Session", use_container_width=True):
-        gs.end_session()
-        del st.session_state["gs"]
-        
-        for key in ["round_started", "round_result", "dealer_final_cards",
-                    "dealer_final_value", "sim_results"]:
+        get_session_pool().close(st.session_state.pop("gs_token"))
+        for key in ROUND_STATE_KEYS:
             st.session_state.pop(key, None)
         st.rerun()
 
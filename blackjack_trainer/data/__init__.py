@@ -1,9 +1,12 @@
 from data.database import Database
 from data.repository import PlayerRepo, SessionRepo, RoundRepo, MoveRepo, AnalyticsRepo
 from data.game_session import GameSession
+from data.compaction import compact_history
+from data.session_pool import SessionPool
 
 __all__ = [
     "Database",
     "PlayerRepo", "SessionRepo", "RoundRepo", "MoveRepo", "AnalyticsRepo",
-    "GameSession",
+    "GameSession", "SessionPool",
+    "compact_history",
 ]
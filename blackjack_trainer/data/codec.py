@@ -0,0 +1,30 @@
+from __future__ import annotations
+import json
+
+from game.engine import Deck, Suit
+
+# One byte per card: rank index * 4 + suit index (0..51)
+_SUITS = [s.value for s in Suit]
+_CARD_TO_BYTE = {
+    f"{rank}{suit}": r * 4 + s
+    for r, rank in enumerate(Deck.RANKS)
+    for s, suit in enumerate(_SUITS)
+}
+_BYTE_TO_CARD = {b: card for card, b in _CARD_TO_BYTE.items()}
+
+
+def encode_cards(cards: list[str]) -> bytes:
+    """Pack card strings like "10♠" into a BLOB, one byte per card."""
+    try:
+        return bytes(_CARD_TO_BYTE[c] for c in cards)
+    except KeyError as e:
+        raise ValueError(f"Invalid card: {e.args[0]!r}") from None
+
+
+def decode_cards(value: bytes | str | None) -> list[str] | None:
+    """Inverse of encode_cards. Rows written before the BLOB format hold JSON text."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return json.loads(value)
+    return [_BYTE_TO_CARD[b] for b in value]
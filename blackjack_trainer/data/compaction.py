@@ -0,0 +1,141 @@
+from __future__ import annotations
+import argparse
+
+from data.codec import encode_cards
+from data.database import Database
+from data.repository import SUMMARY_COLUMNS
+
+KEEP_SESSIONS = 20  # newest sessions per player whose moves stay row-by-row
+KEEP_MISTAKES = 50  # newest mistakes are never rolled up (recent_mistakes reads them)
+
+_COLS = ", ".join(SUMMARY_COLUMNS)
+
+
+def compact_history(
+    db: Database,
+    keep_sessions: int = KEEP_SESSIONS,
+    keep_mistakes: int = KEEP_MISTAKES,
+) -> dict:
+    """
+    Rolls moves from a player's older (finished) sessions into move_summaries,
+    re-encodes any rows still holding JSON card lists as BLOBs and hands freed
+    pages back to the filesystem with an incremental VACUUM.
+
+    Aggregate analytics and the ML dataset read summaries alongside live moves,
+    so their results do not change.
+    """
+    conn = db.get_conn()
+    moves_compacted = 0
+
+    with db.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS compact_ids (id INTEGER PRIMARY KEY)")
+        player_ids = [r["id"] for r in cur.execute("SELECT id FROM players").fetchall()]
+
+        for pid in player_ids:
+            cur.execute("DELETE FROM compact_ids")
+            cur.execute("""
+                INSERT INTO compact_ids
+                SELECT m.id
+                FROM moves m
+                JOIN rounds   r ON r.id = m.round_id
+                JOIN sessions s ON s.id = r.session_id
+                WHERE s.player_id = ?
+                  AND s.ended_at IS NOT NULL
+                  AND s.id NOT IN (
+                      SELECT id FROM sessions WHERE player_id = ?
+                      ORDER BY id DESC LIMIT ?
+                  )
+                  AND m.id NOT IN (
+                      SELECT m2.id
+                      FROM moves m2
+                      JOIN rounds   r2 ON r2.id = m2.round_id
+                      JOIN sessions s2 ON s2.id = r2.session_id
+                      WHERE s2.player_id = ? AND m2.is_correct = 0
+                      ORDER BY m2.id DESC LIMIT ?
+                  )
+            """, (pid, pid, keep_sessions, pid, keep_mistakes))
+
+            if cur.rowcount <= 0:
+                continue
+            moves_compacted += cur.rowcount
+
+            cur.execute(f"""
+                INSERT INTO move_summaries (player_id, {_COLS}, n)
+                SELECT ?, {_COLS}, COUNT(*)
+                FROM moves
+                WHERE id IN (SELECT id FROM compact_ids)
+                GROUP BY {_COLS}
+                ON CONFLICT (player_id, {_COLS}) DO UPDATE SET n = n + excluded.n
+            """, (pid,))
+            cur.execute("DELETE FROM moves WHERE id IN (SELECT id FROM compact_ids)")
+
+        rows_reencoded = _reencode_json_cards(cur)
+
+    pages_before = conn.execute("PRAGMA page_count").fetchone()[0]
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # DBs created before incremental mode need one full VACUUM to switch
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    else:
+        conn.execute("PRAGMA incremental_vacuum")
+    pages_after = conn.execute("PRAGMA page_count").fetchone()[0]
+
+    return {
+        "moves_compacted": moves_compacted,
+        "rows_reencoded":  rows_reencoded,
+        "pages_freed":     pages_before - pages_after,
+    }
+
+
+def _reencode_json_cards(cur) -> int:
+    """Rewrites card columns that still hold legacy JSON text as packed BLOBs."""
+    n = 0
+    cur.execute("""
+        SELECT id, player_cards_start, player_cards_final, dealer_cards_final
+        FROM rounds
+        WHERE typeof(player_cards_start) = 'text'
+           OR typeof(player_cards_final) = 'text'
+           OR typeof(dealer_cards_final) = 'text'
+    """)
+    for r in cur.fetchall():
+        cur.execute(
+            "UPDATE rounds SET player_cards_start = ?, player_cards_final = ?, "
+            "dealer_cards_final = ? WHERE id = ?",
+            (*(_reencode(r[c]) for c in ("player_cards_start", "player_cards_final",
+                                         "dealer_cards_final")), r["id"])
+        )
+        n += 1
+
+    cur.execute("SELECT id, hand_cards FROM moves WHERE typeof(hand_cards) = 'text'")
+    for r in cur.fetchall():
+        cur.execute("UPDATE moves SET hand_cards = ? WHERE id = ?",
+                    (_reencode(r["hand_cards"]), r["id"]))
+        n += 1
+    return n
+
+
+def _reencode(value):
+    if isinstance(value, str):
+        return encode_cards(Database.from_json(value))
+    return value
+
+
+def main(argv: list[str] | None = None) -> dict:
+    """Maintenance job: ``python -m data.compaction [--db PATH]``, e.g. from cron."""
+    parser = argparse.ArgumentParser(description="Compact old move history.")
+    parser.add_argument("--db", help="database file (default: the app's blackjack.db)")
+    parser.add_argument("--keep-sessions", type=int, default=KEEP_SESSIONS)
+    parser.add_argument("--keep-mistakes", type=int, default=KEEP_MISTAKES)
+    args = parser.parse_args(argv)
+
+    db = Database(args.db) if args.db else Database()
+    try:
+        stats = compact_history(db, args.keep_sessions, args.keep_mistakes)
+    finally:
+        db.close()
+    print(", ".join(f"{k}={v}" for k, v in stats.items()))
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,13 @@ class GameSession:
         result = gs.finish_round()
     """
 
-    def __init__(self, db: Optional[Database] = None, num_decks: int = 6):
+    def __init__(
+        self,
+        db: Optional[Database] = None,
+        num_decks: int = 6,
+        trainer: Optional[MLTrainer] = None,
+        predictor: Optional[MLPredictor] = None,
+    ):
         self.db = db or Database()
         self._player_repo  = PlayerRepo(self.db)
         self._session_repo = SessionRepo(self.db)
@@ -42,9 +48,14 @@ class GameSession:
         self.last_optimal: Optional[Action] = None
         self.last_correct: Optional[bool]   = None
 
-        self._trainer   = MLTrainer(player_id=self.player_id)
-        self._predictor = MLPredictor(self._trainer)
-        self._try_train()  # train on existing data if we have enough
+        if trainer is not None:
+            # Shared models (see SessionPool): the owner already trained them
+            self._trainer   = trainer
+            self._predictor = predictor or MLPredictor(trainer)
+        else:
+            self._trainer   = MLTrainer(player_id=self.player_id)
+            self._predictor = MLPredictor(self._trainer)
+            self.train_if_needed()  # train on existing data if we have enough
 
     def new_round(self) -> None:
         self._engine.new_round()
@@ -138,7 +149,7 @@ class GameSession:
         )
 
         self._player_repo.update_stats(self.player_id, result.value)
-        self._try_train()  # retrain every 25 new moves
+        self.train_if_needed()  # retrain every 25 new moves
 
         accuracy = (
             self._moves_correct / self._moves_total
@@ -157,7 +168,8 @@ class GameSession:
 
     # ML methods
 
-    def _try_train(self) -> None:
+    def train_if_needed(self) -> None:
+        """(Re)train the player's models when enough new moves came in since the last fit."""
         try:
             moves = self._move_repo.all_for_player(self.player_id)
             if self._trainer.needs_retrain(len(moves)):
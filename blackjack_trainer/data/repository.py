@@ -1,9 +1,30 @@
 from __future__ import annotations
-import json
 from typing import Optional
 
+from data.codec import encode_cards, decode_cards
 from data.database import Database
 
+_ROUND_CARD_COLUMNS = ("player_cards_start", "player_cards_final", "dealer_cards_final")
+
+# Columns kept per situation when old moves are rolled into move_summaries
+SUMMARY_COLUMNS = (
+    "player_total", "dealer_upcard_val", "is_soft", "is_pair",
+    "pair_card_value", "action_taken", "optimal_action", "is_correct",
+)
+
+
+def _decode_round(row) -> dict:
+    r = dict(row)
+    for col in _ROUND_CARD_COLUMNS:
+        r[col] = decode_cards(r[col])
+    return r
+
+
+def _decode_move(row) -> dict:
+    m = dict(row)
+    m["hand_cards"] = decode_cards(m["hand_cards"])
+    return m
+
 
 class PlayerRepo:
     def __init__(self, db: Database):
@@ -125,7 +146,7 @@ class RoundRepo:
                 ) VALUES (?, ?, ?, ?, ?)
             """, (
                 session_id, round_num,
-                json.dumps(player_cards_start),
+                encode_cards(player_cards_start),
                 dealer_upcard,
                 dealer_hole_card,
             ))
@@ -156,8 +177,8 @@ class RoundRepo:
                     round_accuracy      = ?
                 WHERE id = ?
             """, (
-                json.dumps(player_cards_final),
-                json.dumps(dealer_cards_final),
+                encode_cards(player_cards_final),
+                encode_cards(dealer_cards_final),
                 player_final_value,
                 dealer_final_value,
                 result,
@@ -171,7 +192,7 @@ class RoundRepo:
         with self.db.cursor() as cur:
             cur.execute("SELECT * FROM rounds WHERE id = ?", (round_id,))
             row = cur.fetchone()
-            return dict(row) if row else None
+            return _decode_round(row) if row else None
 
     def list_for_session(self, session_id: int) -> list[dict]:
         with self.db.cursor() as cur:
@@ -179,7 +200,7 @@ class RoundRepo:
                 "SELECT * FROM rounds WHERE session_id = ? ORDER BY round_num",
                 (session_id,)
             )
-            return [dict(r) for r in cur.fetchall()]
+            return [_decode_round(r) for r in cur.fetchall()]
 
 
 class MoveRepo:
@@ -214,7 +235,7 @@ class MoveRepo:
                 round_id, move_num,
                 player_total, dealer_upcard_val,
                 int(is_soft), int(is_pair), pair_card_value,
-                json.dumps(hand_cards),
+                encode_cards(hand_cards),
                 action_taken, optimal_action, int(is_correct),
                 ml_error_prob,
             ))
@@ -226,11 +247,25 @@ class MoveRepo:
                 "SELECT * FROM moves WHERE round_id = ? ORDER BY move_num",
                 (round_id,)
             )
-            return [dict(r) for r in cur.fetchall()]
+            return [_decode_move(r) for r in cur.fetchall()]
 
     def all_for_player(self, player_id: int) -> list[dict]:
-        """Pull every move this player has ever made — main ML dataset."""
+        """
+        Pull every move this player has ever made — main ML dataset.
+        Compacted moves come first, expanded back from move_summaries with
+        only their situation columns.
+        """
+        cols = ", ".join(SUMMARY_COLUMNS)
         with self.db.cursor() as cur:
+            cur.execute(
+                f"SELECT {cols}, n FROM move_summaries WHERE player_id = ? ORDER BY {cols}",
+                (player_id,)
+            )
+            moves = []
+            for r in cur.fetchall():
+                summary = {c: r[c] for c in SUMMARY_COLUMNS}
+                moves.extend(dict(summary) for _ in range(r["n"]))
+
             cur.execute("""
                 SELECT m.*
                 FROM moves m
@@ -239,7 +274,24 @@ class MoveRepo:
                 WHERE s.player_id = ?
                 ORDER BY m.id
             """, (player_id,))
-            return [dict(r) for r in cur.fetchall()]
+            moves.extend(_decode_move(r) for r in cur.fetchall())
+            return moves
+
+
+# Live moves plus compacted summaries as one weighted relation (bind player_id twice)
+_PLAYER_MOVES_CTE = f"""
+    WITH pm AS (
+        SELECT {", ".join("m." + c for c in SUMMARY_COLUMNS)}, 1 AS n
+        FROM moves m
+        JOIN rounds   r ON r.id = m.round_id
+        JOIN sessions s ON s.id = r.session_id
+        WHERE s.player_id = ?
+        UNION ALL
+        SELECT {", ".join(SUMMARY_COLUMNS)}, n
+        FROM move_summaries
+        WHERE player_id = ?
+    )
+"""
 
 
 class AnalyticsRepo:
@@ -249,25 +301,22 @@ class AnalyticsRepo:
     def error_heatmap(self, player_id: int) -> list[dict]:
         """Error rate per situation (player_total × dealer_upcard) for the heatmap."""
         with self.db.cursor() as cur:
-            cur.execute("""
+            cur.execute(_PLAYER_MOVES_CTE + """
                 SELECT
-                    m.player_total,
-                    m.dealer_upcard_val,
-                    m.is_soft,
-                    m.is_pair,
-                    COUNT(*)                                            AS total_moves,
-                    SUM(CASE WHEN m.is_correct = 0 THEN 1 ELSE 0 END) AS errors,
+                    player_total,
+                    dealer_upcard_val,
+                    is_soft,
+                    is_pair,
+                    SUM(n)                                          AS total_moves,
+                    SUM(CASE WHEN is_correct = 0 THEN n ELSE 0 END) AS errors,
                     ROUND(
-                        SUM(CASE WHEN m.is_correct = 0 THEN 1 ELSE 0 END) * 1.0
-                        / NULLIF(COUNT(*), 0), 3
-                    )                                                   AS error_rate
-                FROM moves m
-                JOIN rounds   r ON r.id = m.round_id
-                JOIN sessions s ON s.id = r.session_id
-                WHERE s.player_id = ?
-                GROUP BY m.player_total, m.dealer_upcard_val, m.is_soft, m.is_pair
+                        SUM(CASE WHEN is_correct = 0 THEN n ELSE 0 END) * 1.0
+                        / NULLIF(SUM(n), 0), 3
+                    )                                               AS error_rate
+                FROM pm
+                GROUP BY player_total, dealer_upcard_val, is_soft, is_pair
                 ORDER BY error_rate DESC
-            """, (player_id,))
+            """, (player_id, player_id))
             return [dict(r) for r in cur.fetchall()]
 
     def accuracy_by_session(self, player_id: int) -> list[dict]:
@@ -289,18 +338,15 @@ class AnalyticsRepo:
     def action_breakdown(self, player_id: int) -> list[dict]:
         """Accuracy broken down by action type (hit/stand/double/split)."""
         with self.db.cursor() as cur:
-            cur.execute("""
+            cur.execute(_PLAYER_MOVES_CTE + """
                 SELECT
-                    m.optimal_action                                          AS action,
-                    COUNT(*)                                                  AS total,
-                    SUM(m.is_correct)                                         AS correct,
-                    ROUND(SUM(m.is_correct) * 1.0 / NULLIF(COUNT(*), 0), 3)  AS accuracy
-                FROM moves m
-                JOIN rounds   r ON r.id = m.round_id
-                JOIN sessions s ON s.id = r.session_id
-                WHERE s.player_id = ?
-                GROUP BY m.optimal_action
-            """, (player_id,))
+                    optimal_action                                          AS action,
+                    SUM(n)                                                  AS total,
+                    SUM(is_correct * n)                                     AS correct,
+                    ROUND(SUM(is_correct * n) * 1.0 / NULLIF(SUM(n), 0), 3) AS accuracy
+                FROM pm
+                GROUP BY optimal_action
+            """, (player_id, player_id))
             return [dict(r) for r in cur.fetchall()]
 
     def overall_stats(self, player_id: int) -> dict:
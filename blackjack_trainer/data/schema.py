@@ -1,4 +1,5 @@
 SCHEMA_SQL = """
+PRAGMA auto_vacuum = INCREMENTAL;
 PRAGMA journal_mode = WAL;
 PRAGMA foreign_keys = ON;
 
@@ -30,11 +31,11 @@ CREATE TABLE IF NOT EXISTS rounds (
     session_id          INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
     round_num           INTEGER NOT NULL,
     started_at          TEXT    NOT NULL DEFAULT (datetime('now')),
-    player_cards_start  TEXT    NOT NULL,
+    player_cards_start  BLOB    NOT NULL,
     dealer_upcard       TEXT    NOT NULL,
     dealer_hole_card    TEXT    NOT NULL,
-    player_cards_final  TEXT,
-    dealer_cards_final  TEXT,
+    player_cards_final  BLOB,
+    dealer_cards_final  BLOB,
     player_final_value  INTEGER,
     dealer_final_value  INTEGER,
     result              TEXT,
@@ -52,7 +53,7 @@ CREATE TABLE IF NOT EXISTS moves (
     is_soft             INTEGER NOT NULL,
     is_pair             INTEGER NOT NULL,
     pair_card_value     INTEGER NOT NULL DEFAULT 0,
-    hand_cards          TEXT    NOT NULL,
+    hand_cards          BLOB    NOT NULL,
     action_taken        TEXT    NOT NULL,
     optimal_action      TEXT    NOT NULL,
     is_correct          INTEGER NOT NULL,
@@ -60,6 +61,24 @@ CREATE TABLE IF NOT EXISTS moves (
     created_at          TEXT    NOT NULL DEFAULT (datetime('now'))
 );
 
+-- Moves rolled up by the compaction job: one row per distinct situation + decision
+CREATE TABLE IF NOT EXISTS move_summaries (
+    player_id           INTEGER NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    player_total        INTEGER NOT NULL,
+    dealer_upcard_val   INTEGER NOT NULL,
+    is_soft             INTEGER NOT NULL,
+    is_pair             INTEGER NOT NULL,
+    pair_card_value     INTEGER NOT NULL,
+    action_taken        TEXT    NOT NULL,
+    optimal_action      TEXT    NOT NULL,
+    is_correct          INTEGER NOT NULL,
+    n                   INTEGER NOT NULL,
+    PRIMARY KEY (
+        player_id, player_total, dealer_upcard_val, is_soft, is_pair,
+        pair_card_value, action_taken, optimal_action, is_correct
+    )
+) WITHOUT ROWID;
+
 CREATE INDEX IF NOT EXISTS idx_moves_round      ON moves(round_id);
 CREATE INDEX IF NOT EXISTS idx_moves_correct    ON moves(is_correct);
 CREATE INDEX IF NOT EXISTS idx_moves_situation  ON moves(player_total, dealer_upcard_val, is_soft, is_pair);
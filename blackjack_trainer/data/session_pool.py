@@ -0,0 +1,136 @@
+from __future__ import annotations
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from data.database import Database
+from data.game_session import GameSession
+from data.repository import PlayerRepo
+from ml.trainer import MLTrainer
+from ml.predictor import MLPredictor
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 30 * 60
+DEFAULT_MAX_SESSIONS = 64
+
+
+class SessionPool:
+    """
+    Process-wide LRU of GameSessions keyed by a client token (one per browser tab).
+
+    Sessions are built on first access and share one MLTrainer/MLPredictor per
+    player, so N tabs hold one forest instead of N. Sessions idle longer than
+    ttl_seconds, or the least recently used ones beyond max_sessions, are
+    closed with end_session() and dropped; a player's models go with the last
+    of their sessions.
+
+    The bound is a session count, not a memory budget. That is enough here
+    because a session itself is small (a shoe and one round); what is large
+    are the models, and those are bounded by the number of distinct players
+    among the live sessions, i.e. by max_sessions forests at worst.
+
+    Usage:
+        pool = SessionPool(db)
+        gs   = pool.get(token)
+    """
+
+    def __init__(
+        self,
+        db: Database,
+        num_decks: int = 6,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be >= 1")
+        self.db = db
+        self.num_decks    = num_decks
+        self.ttl_seconds  = ttl_seconds
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._lock  = threading.RLock()
+        # token -> (GameSession, last_used); oldest first
+        self._sessions: OrderedDict[str, tuple[GameSession, float]] = OrderedDict()
+        # player_id -> (trainer, predictor, live session count)
+        self._models: dict[int, list] = {}
+
+    def get(self, token: str) -> GameSession:
+        """Return the session for token, creating it if it is new or was evicted."""
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+
+            entry = self._sessions.get(token)
+            if entry is not None:
+                gs = entry[0]
+                self._sessions[token] = (gs, now)
+                self._sessions.move_to_end(token)
+                return gs
+
+            gs = self._create()
+            self._sessions[token] = (gs, now)
+            while len(self._sessions) > self.max_sessions:
+                self._evict(next(iter(self._sessions)))
+            return gs
+
+    def close(self, token: str) -> None:
+        """End and drop one session (e.g. the user started a new one)."""
+        with self._lock:
+            if token in self._sessions:
+                self._evict(token)
+
+    def close_all(self) -> None:
+        with self._lock:
+            for token in list(self._sessions):
+                self._evict(token)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def n_models(self) -> int:
+        return len(self._models)
+
+    def _create(self) -> GameSession:
+        player_id = PlayerRepo(self.db).get_or_create_default()
+        models = self._models.get(player_id)
+        if models is None:
+            trainer = MLTrainer(player_id=player_id)
+            models  = [trainer, MLPredictor(trainer), 0]
+            self._models[player_id] = models
+
+        gs = GameSession(self.db, self.num_decks, trainer=models[0], predictor=models[1])
+        if models[2] == 0:
+            gs.train_if_needed()  # once per player, not once per tab
+        models[2] += 1
+        return gs
+
+    def _evict_idle(self, now: float) -> None:
+        cutoff = now - self.ttl_seconds
+        # oldest first, so stop at the first fresh one
+        while self._sessions:
+            token, (_, last_used) = next(iter(self._sessions.items()))
+            if last_used > cutoff:
+                break
+            self._evict(token)
+
+    def _evict(self, token: str) -> None:
+        gs, _ = self._sessions.pop(token)
+        try:
+            gs.end_session()
+        except Exception:
+            # the session row may already be gone; still free the memory
+            log.exception("could not end session %s", gs.session_id)
+
+        models = self._models.get(gs.player_id)
+        if models is not None:
+            models[2] -= 1
+            if models[2] <= 0:
+                del self._models[gs.player_id]
@@ -30,6 +30,10 @@ class GameResult(Enum):
 FACE_CARDS = {"J", "Q", "K"}
 ACE = "A"
 
+# Hi-Lo card counting tags: low cards +1, tens and aces -1
+HI_LO = {**{str(i): 1 for i in range(2, 7)}, "7": 0, "8": 0, "9": 0,
+         **{r: -1 for r in ("10", "J", "Q", "K", ACE)}}
+
 
 @dataclass(frozen=True)
 class Card:
@@ -68,6 +72,7 @@ class Deck:
             raise ValueError("num_decks must be >= 1")
         self.num_decks = num_decks
         self._cards: List[Card] = []
+        self.running_count = 0
         self.reshuffle()
 
     def reshuffle(self) -> None:
@@ -78,12 +83,20 @@ class Deck:
             for rank in self.RANKS
         ]
         random.shuffle(self._cards)
+        self.running_count = 0
 
     def deal(self) -> Card:
         # Reshuffle when less than 20% of cards remain
         if len(self._cards) < self.num_decks * 52 * 0.20:
             self.reshuffle()
-        return self._cards.pop()
+        card = self._cards.pop()
+        self.running_count += HI_LO[card.rank]
+        return card
+
+    @property
+    def true_count(self) -> float:
+        """Hi-Lo running count divided by the number of decks left in the shoe."""
+        return self.running_count / max(len(self._cards) / 52, 0.5)
 
     @property
     def remaining(self) -> int:
@@ -1,19 +1,23 @@
 from ml.features import (
     moves_to_dataframe, get_feature_matrix,
     extract_features_single, compute_cluster_features,
+    situation_ids, situation_feature_matrix,
     FEATURE_NAMES, CLUSTER_FEATURE_NAMES,
 )
 from ml.trainer import MLTrainer, CLUSTER_NAMES
 from ml.predictor import MLPredictor, WARNING_THRESHOLD
 from ml.bootstrap import generate_synthetic_moves
 from ml.simulation import run_all_simulations, simulate_strategy
+from ml.bankroll import simulate_bankroll, FlatBet, KellyBet, CountSpread
 
 __all__ = [
     "moves_to_dataframe", "get_feature_matrix",
     "extract_features_single", "compute_cluster_features",
+    "situation_ids", "situation_feature_matrix",
     "FEATURE_NAMES", "CLUSTER_FEATURE_NAMES",
     "MLTrainer", "CLUSTER_NAMES",
     "MLPredictor", "WARNING_THRESHOLD",
     "generate_synthetic_moves",
     "run_all_simulations", "simulate_strategy",
+    "simulate_bankroll", "FlatBet", "KellyBet", "CountSpread",
 ]
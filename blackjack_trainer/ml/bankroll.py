@@ -0,0 +1,232 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024  # memory cap for one block of trajectories
+PATH_CHUNK          = 256               # paths per random stream; blocks hold whole chunks
+N_SAMPLE_PATHS      = 20
+DRAWDOWN_QUANTILES  = (0.50, 0.90, 0.95, 0.99)
+
+
+@dataclass(frozen=True)
+class FlatBet:
+    """Same bet every round."""
+    unit: float = 10.0
+
+
+@dataclass(frozen=True)
+class KellyBet:
+    """
+    Bet a fraction of the current bankroll. The full-Kelly fraction is
+    edge / variance for the true count bucket; negative edge means no bet.
+    """
+    fraction: float = 0.5
+
+
+@dataclass(frozen=True)
+class CountSpread:
+    """
+    Bet ramp by Hi-Lo true count: ramp maps the minimum true count to a
+    multiple of unit. Counts below the lowest key bet one unit.
+    """
+    unit: float = 10.0
+    ramp: dict = field(default_factory=lambda: {2: 2.0, 3: 4.0, 4: 8.0})
+
+    def units_for(self, true_count: int) -> float:
+        units = 1.0
+        for tc in sorted(self.ramp):
+            if true_count >= tc:
+                units = self.ramp[tc]
+        return units
+
+
+def pnl_distribution(sim_result: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flattens a simulate_strategy() result into (true_count, unit_pnl, prob)
+    arrays — one entry per observed (count, outcome) pair.
+    """
+    tcs, pnls, freq = [], [], []
+    for tc, outcomes in sim_result["pnl_by_count"].items():
+        for pnl, n in outcomes.items():
+            tcs.append(int(tc))
+            pnls.append(float(pnl))
+            freq.append(n)
+
+    if not freq:
+        raise ValueError("simulation result has no rounds")
+
+    freq = np.asarray(freq, dtype=np.float64)
+    return (
+        np.asarray(tcs, dtype=np.int64),
+        np.asarray(pnls, dtype=np.float64),
+        freq / freq.sum(),
+    )
+
+
+def _alias_table(probs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Walker alias table: O(1) exact sampling per draw instead of a CDF binary search."""
+    k      = len(probs)
+    scaled = probs * k
+    accept = np.ones(k)
+    alias  = np.arange(k)
+    small  = [i for i in range(k) if scaled[i] < 1.0]
+    large  = [i for i in range(k) if scaled[i] >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        accept[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    return accept.astype(np.float32), alias.astype(np.int16)
+
+
+def _bet_sizes(policy, tcs: np.ndarray, pnls: np.ndarray, probs: np.ndarray) -> np.ndarray:
+    """Per-outcome bet: dollars for additive policies, bankroll fraction for Kelly."""
+    if isinstance(policy, FlatBet):
+        return np.full(len(tcs), float(policy.unit))
+
+    if isinstance(policy, CountSpread):
+        return np.array([policy.unit * policy.units_for(int(tc)) for tc in tcs])
+
+    if isinstance(policy, KellyBet):
+        # f * pnl must stay above -1 or log1p blows up; a double or split
+        # can lose more than one unit, so cap against the worst outcome
+        cap   = 0.99 / max(1.0, -float(pnls.min()))
+        sizes = np.zeros(len(tcs))
+        for tc in np.unique(tcs):
+            mask = tcs == tc
+            p    = probs[mask] / probs[mask].sum()
+            edge = float((p * pnls[mask]).sum())
+            var  = float((p * pnls[mask] ** 2).sum()) - edge ** 2
+            if edge > 0 and var > 0:
+                sizes[mask] = min(policy.fraction * edge / var, cap)
+        return sizes
+
+    raise TypeError(f"Unknown bet policy: {policy!r}")
+
+
+def _draw(rng: np.random.Generator, shape: tuple, accept: np.ndarray, alias: np.ndarray) -> np.ndarray:
+    """Outcome indices for shape (rounds, paths) from the alias table."""
+    idx = rng.integers(0, len(accept), shape, dtype=np.int16)
+    return np.where(rng.random(shape, dtype=np.float32) < accept[idx], idx, alias[idx])
+
+
+def simulate_bankroll(
+    sim_result: dict,
+    policy=None,
+    bankroll:   float = 1000.0,
+    n_rounds:   int   = 1000,
+    n_paths:    int   = 100_000,
+    target:     Optional[float] = None,
+    ruin_level: float = 0.0,
+    block_size: Optional[int] = None,
+    seed:       Optional[int] = None,
+) -> dict:
+    """
+    Resamples the per-round PnL distribution of a simulator run into n_paths
+    bankroll trajectories at once. Paths are built as NumPy cumulative sums
+    (cumulative log-growth for Kelly) in blocks, so memory stays around
+    block_size × n_rounds floats no matter how many paths are requested.
+    Each chunk of PATH_CHUNK paths draws from its own stream spawned from
+    seed, so block_size never changes the result.
+
+    A path is ruined the first round it drops to ruin_level or below and
+    stays there afterwards.
+    """
+    policy = policy or FlatBet()
+    if n_rounds < 1 or n_paths < 1:
+        raise ValueError("n_rounds and n_paths must be >= 1")
+
+    tcs, pnls, probs = pnl_distribution(sim_result)
+    sizes = _bet_sizes(policy, tcs, pnls, probs)
+    kelly = isinstance(policy, KellyBet)
+
+    if kelly:
+        steps = np.log1p(sizes * pnls)
+    else:
+        steps = sizes * pnls
+    accept, alias = _alias_table(probs)
+
+    if block_size is None:
+        # index, step and cumsum matrices plus boolean masks per path-round
+        block_size = max(1, DEFAULT_BLOCK_BYTES // (n_rounds * 28))
+    block_size = min(max(1, block_size // PATH_CHUNK) * PATH_CHUNK, n_paths)
+
+    streams = np.random.SeedSequence(seed).spawn(-(-n_paths // PATH_CHUNK))
+
+    ruined        = np.zeros(n_paths, dtype=bool)
+    max_drawdown  = np.empty(n_paths)
+    final         = np.empty(n_paths)
+    hit_round     = np.full(n_paths, -1, dtype=np.int64)
+    path_sum      = np.zeros(n_rounds)
+    path_sq_sum   = np.zeros(n_rounds)
+    sample_paths  = None
+
+    for start in range(0, n_paths, block_size):
+        stop = min(start + block_size, n_paths)
+        # round-major layout: the cumulative ops run over contiguous rows
+        idx   = np.hstack([
+            _draw(np.random.default_rng(streams[c // PATH_CHUNK]),
+                  (n_rounds, min(c + PATH_CHUNK, stop) - c), accept, alias)
+            for c in range(start, stop, PATH_CHUNK)
+        ])
+
+        if kelly:
+            paths = bankroll * np.exp(np.cumsum(steps[idx], axis=0))
+        else:
+            paths = bankroll + np.cumsum(steps[idx], axis=0)
+        del idx
+
+        # absorb ruined paths at the ruin level; only those columns need the scan
+        dead = paths.min(axis=0) <= ruin_level
+        if dead.any():
+            sub = paths[:, dead]
+            sub[np.logical_or.accumulate(sub <= ruin_level, axis=0)] = ruin_level
+            paths[:, dead] = sub
+
+        peak = np.maximum(np.maximum.accumulate(paths, axis=0), bankroll)
+        max_drawdown[start:stop] = (peak - paths).max(axis=0)
+        del peak
+        ruined[start:stop] = dead
+        final[start:stop]  = paths[-1]
+
+        if target is not None:
+            reached = paths >= target
+            hit_round[start:stop] = np.where(reached.any(axis=0), reached.argmax(axis=0) + 1, -1)
+
+        path_sum    += paths.sum(axis=1)
+        path_sq_sum += np.einsum("ij,ij->i", paths, paths)
+        if sample_paths is None:
+            sample_paths = paths[:, :N_SAMPLE_PATHS].T.copy()
+
+    mean_path = path_sum / n_paths
+    std_path  = np.sqrt(np.maximum(path_sq_sum / n_paths - mean_path ** 2, 0.0))
+
+    result = {
+        "n_paths":            n_paths,
+        "n_rounds":           n_rounds,
+        "bankroll":           bankroll,
+        "risk_of_ruin":       float(ruined.mean()),
+        "drawdown_quantiles": {
+            q: float(v) for q, v in zip(DRAWDOWN_QUANTILES, np.quantile(max_drawdown, DRAWDOWN_QUANTILES))
+        },
+        "final_mean":         float(final.mean()),
+        "final_quantiles":    {
+            q: float(v) for q, v in zip((0.05, 0.50, 0.95), np.quantile(final, (0.05, 0.50, 0.95)))
+        },
+        "mean_path":          mean_path,
+        "std_path":           std_path,
+        "sample_paths":       sample_paths,
+    }
+
+    if target is not None:
+        hits = hit_round[hit_round > 0]
+        result["time_to_target"] = {
+            "target":   target,
+            "hit_rate": len(hits) / n_paths,
+            "median":   float(np.median(hits)) if len(hits) else None,
+            "mean":     float(hits.mean()) if len(hits) else None,
+        }
+
+    return result
@@ -89,6 +89,68 @@ def extract_features_single(move: dict) -> np.ndarray:
     return np.array([features[f] for f in FEATURE_NAMES], dtype=np.float32).reshape(1, -1)
 
 
+# Situation ids: every feature is a function of these six small integers, so a
+# move collapses to one id and a whole history to a np.bincount over the ids.
+SITUATION_ACTIONS = ("hit", "stand", "double", "split")  # anything else -> 4
+SITUATION_DIMS    = (32, 12, 2, 2, 12, len(SITUATION_ACTIONS) + 1)
+N_SITUATIONS      = int(np.prod(SITUATION_DIMS))
+
+
+def situation_ids(moves: list[dict]) -> np.ndarray:
+    """Map each move to an integer id of (total, upcard, soft, pair, pair card, action)."""
+    if not moves:
+        return np.empty(0, dtype=np.int64)
+
+    action_code = {a: i for i, a in enumerate(SITUATION_ACTIONS)}
+    cols = np.array([
+        (
+            int(m.get("player_total", 10)),
+            int(m.get("dealer_upcard_val", 7)),
+            int(m.get("is_soft", 0)),
+            int(m.get("is_pair", 0)),
+            int(m.get("pair_card_value", 0)),
+            action_code.get(str(m.get("action_taken", "stand")), len(SITUATION_ACTIONS)),
+        )
+        for m in moves
+    ], dtype=np.int64)
+    cols = np.clip(cols, 0, np.array(SITUATION_DIMS) - 1)
+    return np.ravel_multi_index(cols.T, SITUATION_DIMS)
+
+
+def decode_situations(ids: np.ndarray) -> dict[str, np.ndarray]:
+    pt, du, soft, pair, pcv, act = np.unravel_index(ids, SITUATION_DIMS)
+    return {
+        "player_total": pt, "dealer_upcard_val": du,
+        "is_soft": soft, "is_pair": pair,
+        "pair_card_value": pcv, "action": act,
+    }
+
+
+def situation_feature_matrix(ids: np.ndarray) -> np.ndarray:
+    """Vectorized _extract_features for situation ids, columns in FEATURE_NAMES order."""
+    s  = decode_situations(ids)
+    pt = s["player_total"]
+    du = s["dealer_upcard_val"]
+    act = s["action"]
+    features = {
+        "player_total_norm":  pt / 21.0,
+        "dealer_upcard_norm": du / 11.0,
+        "pair_card_norm":     s["pair_card_value"] / 11.0,
+        "is_soft":       s["is_soft"],
+        "is_pair":       s["is_pair"],
+        "is_risky":      ((pt == 15) | (pt == 16)) & (du >= 7),
+        "dealer_strong": du >= 7,
+        "dealer_weak":   (du >= 2) & (du <= 6),
+        "player_low":    pt <= 11,
+        "player_high":   pt >= 17,
+        "action_hit":    act == 0,
+        "action_stand":  act == 1,
+        "action_double": act == 2,
+        "action_split":  act == 3,
+    }
+    return np.column_stack([features[f] for f in FEATURE_NAMES]).astype(np.float32)
+
+
 def compute_cluster_features(moves: list[dict]) -> Optional[np.ndarray]:
     if len(moves) < 20:
         return None
@@ -2,7 +2,10 @@ from __future__ import annotations
 from typing import Optional
 
 import numpy as np
-from ml.features import extract_features_single, FEATURE_NAMES
+from ml.features import (
+    extract_features_single, situation_ids, decode_situations,
+    situation_feature_matrix, SITUATION_DIMS, N_SITUATIONS,
+)
 from ml.trainer import MLTrainer, CLUSTER_NAMES
 
 WARNING_THRESHOLD = 0.60
@@ -56,60 +59,66 @@ class MLPredictor:
             return f"⚠️ High error risk ({error_prob*100:.0f}%) — double check the strategy"
         return f"⚠️ You often make mistakes in this spot ({error_prob*100:.0f}%)"
 
+    def _situation_counts(self, moves: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+        """Distinct situation ids in the history and how often each occurs."""
+        counts = np.bincount(situation_ids(moves), minlength=N_SITUATIONS)
+        ids    = np.flatnonzero(counts)
+        return ids, counts[ids]
+
     def get_cluster_info(self, moves: list[dict]) -> Optional[dict]:
         if self.trainer._km is None or self.trainer._scaler is None:
             return None
-
-        from ml.features import get_feature_matrix
-        X, _ = get_feature_matrix(moves)
-        if X.shape[0] < 20:
+        if len(moves) < 20:
             return None
 
         try:
-            X_scaled   = self.trainer._scaler.transform(X)
-            player_vec = X_scaled.mean(axis=0).reshape(1, -1)
-            cluster_id = int(self.trainer._km.predict(player_vec)[0])
+            # The scaler is affine, so scaling the count-weighted mean of the
+            # distinct situations equals the mean of the scaled full matrix.
+            ids, counts = self._situation_counts(moves)
+            X_mean      = counts @ situation_feature_matrix(ids).astype(np.float64) / counts.sum()
+            player_vec  = self.trainer._scaler.transform(X_mean.reshape(1, -1).astype(np.float32))
+            cluster_id  = int(self.trainer._km.predict(player_vec)[0])
             return {"cluster_id": cluster_id, "cluster_name": CLUSTER_NAMES.get(cluster_id, "unknown")}
         except Exception:
             return None
 
     def top_mistakes(self, moves: list[dict], n: int = 5) -> list[dict]:
-        """Top N situations by average error probability — used for personal tips."""
-        if not self.trainer.is_trained:
+        """
+        Top N (total, upcard, soft) spots by average error probability — used for
+        personal tips. The forest runs once per distinct situation and the
+        per-move average is recovered by weighting with the situation counts.
+        """
+        if not self.trainer.is_trained or not moves:
             return []
 
-        from ml.features import moves_to_dataframe
-        import pandas as pd
-
-        df = moves_to_dataframe(moves)
-        if df.empty:
-            return []
-
-        X = df[FEATURE_NAMES].values.astype(np.float32)
+        ids, counts = self._situation_counts(moves)
 
         try:
-            proba     = self.trainer._rf.predict_proba(X)
+            proba     = self.trainer._rf.predict_proba(situation_feature_matrix(ids))
             classes   = self.trainer._rf.classes_
             wrong_idx = list(classes).index(0) if 0 in classes else 0
             error_probs = proba[:, wrong_idx]
         except Exception:
             return []
 
-        df["error_prob"] = error_probs
-        agg = (
-            df.groupby(["player_total_norm", "dealer_upcard_norm", "is_soft"])["error_prob"]
-            .mean()
-            .reset_index()
-            .sort_values("error_prob", ascending=False)
-            .head(n)
+        s = decode_situations(ids)
+        spot = np.ravel_multi_index(
+            (s["player_total"], s["dealer_upcard_val"], s["is_soft"]), SITUATION_DIMS[:3]
         )
-
-        results = []
-        for _, row in agg.iterrows():
-            results.append({
-                "player_total":  round(row["player_total_norm"] * 21),
-                "dealer_upcard": round(row["dealer_upcard_norm"] * 11),
-                "is_soft":       bool(row["is_soft"]),
-                "error_prob":    round(float(row["error_prob"]), 3),
-            })
-        return results
+        n_spot   = np.bincount(spot, weights=counts, minlength=int(np.prod(SITUATION_DIMS[:3])))
+        err_spot = np.bincount(spot, weights=counts * error_probs, minlength=len(n_spot))
+
+        seen = np.flatnonzero(n_spot)
+        mean = err_spot[seen] / n_spot[seen]
+        top  = seen[np.argsort(-mean, kind="stable")[:n]]
+
+        pt, du, soft = np.unravel_index(top, SITUATION_DIMS[:3])
+        return [
+            {
+                "player_total":  int(pt[i]),
+                "dealer_upcard": int(du[i]),
+                "is_soft":       bool(soft[i]),
+                "error_prob":    round(float(err_spot[top[i]] / n_spot[top[i]]), 3),
+            }
+            for i in range(len(top))
+        ]
@@ -2,6 +2,8 @@ import random
 from game.engine import Game, Action, GameResult
 from game.strategy import get_optimal_action
 
+TRUE_COUNT_CLIP = 6  # true counts beyond ±6 are rare enough to share a bucket
+
 
 def _basic_strategy(total, dealer, soft, pair, pv, can_double, can_split):
     action = get_optimal_action(total, dealer, soft, pair, pv)
@@ -32,8 +34,10 @@ def simulate_strategy(strategy_fn, n: int, num_decks: int, bet: float) -> dict:
     balance = 0.0
     counts  = {"win": 0, "lose": 0, "push": 0, "blackjack": 0, "bust": 0}
     history = []
+    pnl_by_count: dict[int, dict[float, int]] = {}
 
     for _ in range(n):
+        tc = max(-TRUE_COUNT_CLIP, min(TRUE_COUNT_CLIP, round(game.deck.true_count)))
         game.new_round()
 
         for _ in range(10):  # cap hits to avoid infinite loops
@@ -66,6 +70,9 @@ def simulate_strategy(strategy_fn, n: int, num_decks: int, bet: float) -> dict:
 
         balance += pnl
         counts[rk] = counts.get(rk, 0) + 1
+        unit_pnl = pnl / bet if bet else 0.0
+        bucket = pnl_by_count.setdefault(tc, {})
+        bucket[unit_pnl] = bucket.get(unit_pnl, 0) + 1
         history.append(balance)
 
     total_rounds = sum(counts.values())
@@ -78,6 +85,8 @@ def simulate_strategy(strategy_fn, n: int, num_decks: int, bet: float) -> dict:
         "balance_history": history[::max(1, n // 200)],
         "ev_per_round":    balance / n if n else 0,
         "counts":          counts,
+        # per-round PnL in bet units, keyed by the Hi-Lo true count at round start
+        "pnl_by_count":    pnl_by_count,
     }
 
 
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import pickle
+import threading
 import time
+import warnings
 from pathlib import Path
 from typing import Optional
 
@@ -9,12 +11,10 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import cross_val_score
+from sklearn.metrics import roc_auc_score
+from sklearn.utils.class_weight import compute_sample_weight
 
-from ml.features import (
-    get_feature_matrix, compute_cluster_features,
-    FEATURE_NAMES, CLUSTER_FEATURE_NAMES,
-)
+from ml.features import get_feature_matrix, FEATURE_NAMES
 
 MODELS_DIR = Path(__file__).parent.parent / "models"
 MODELS_DIR.mkdir(exist_ok=True)
@@ -23,6 +23,12 @@ MIN_MOVES_RF      = 50
 MIN_MOVES_CLUSTER = 20
 MIN_MOVES_LR      = 30
 
+TRAIN_BUDGET_S  = 2.0   # wall-clock budget for one retrain of all three models
+RF_BUDGET_SHARE = 0.6
+RF_MIN_TREES    = 20
+RF_MAX_TREES    = 100
+KM_MAX_INIT     = 10
+
 CLUSTER_NAMES = {0: "expert", 1: "cautious", 2: "impulsive", 3: "chaotic"}
 
 
@@ -37,6 +43,8 @@ class MLTrainer:
         self._scaler: Optional[StandardScaler]         = None
         self._trained_at:     float = 0.0
         self._n_moves_trained: int  = 0
+        # one trainer can be shared by several GameSessions (SessionPool)
+        self._lock = threading.Lock()
 
         self._load()
 
@@ -68,87 +76,132 @@ class MLTrainer:
             except Exception:
                 pass  # corrupted file, we'll just retrain
 
-    def train(self, moves: list[dict]) -> dict:
-        results = {}
+    def train(self, moves: list[dict], budget_s: float = TRAIN_BUDGET_S) -> dict:
+        with self._lock:
+            return self._train(moves, budget_s)
 
-        if len(moves) >= MIN_MOVES_RF:
-            results["rf"] = self._train_rf(moves)
+    def _train(self, moves: list[dict], budget_s: float) -> dict:
+        """
+        One pass over the data under a wall-clock budget: features are built
+        once, one scaler is shared by KMeans and LR, and every model is fit
+        exactly once. The forest takes RF_BUDGET_SHARE of the budget and the
+        remaining KMeans restarts fill whatever is left.
+        """
+        started = time.perf_counter()
+        results = {"budget_s": budget_s}
 
-        if len(moves) >= MIN_MOVES_CLUSTER:
-            results["km"] = self._train_km(moves)
+        X, y = get_feature_matrix(moves)
+        X_scaled = None
+        if len(moves) >= min(MIN_MOVES_CLUSTER, MIN_MOVES_LR):
+            self._scaler = StandardScaler()
+            X_scaled = self._scaler.fit_transform(X)
+
+        if len(moves) >= MIN_MOVES_RF:
+            results["rf"] = self._timed(self._train_rf, X, y, budget_s * RF_BUDGET_SHARE)
 
         if len(moves) >= MIN_MOVES_LR:
-            results["lr"] = self._train_lr(moves)
+            results["lr"] = self._timed(self._train_lr, X_scaled, y)
+
+        if len(moves) >= MIN_MOVES_CLUSTER:
+            remaining = budget_s - (time.perf_counter() - started)
+            results["km"] = self._timed(self._train_km, X_scaled, remaining)
 
         self._trained_at      = time.time()
         self._n_moves_trained = len(moves)
         self._save()
 
+        results["seconds"] = round(time.perf_counter() - started, 3)
         return results
 
-    def _train_rf(self, moves: list[dict]) -> dict:
-        X, y = get_feature_matrix(moves)
+    @staticmethod
+    def _timed(fn, *args) -> dict:
+        t0 = time.perf_counter()
+        result = fn(*args)
+        result["seconds"] = round(time.perf_counter() - t0, 3)
+        return result
 
+    def _train_rf(self, X: np.ndarray, y: np.ndarray, budget_s: float) -> dict:
         if len(np.unique(y)) < 2:
             return {"status": "skipped", "reason": "only_one_class"}
 
+        # Grow the forest in chunks with warm_start until the budget or
+        # RF_MAX_TREES runs out. "balanced" weights are passed as sample
+        # weights: identical to class_weight, without the warm_start warning.
+        weights = compute_sample_weight("balanced", y)
         self._rf = RandomForestClassifier(
-            n_estimators=100,
+            n_estimators=RF_MIN_TREES,
             max_depth=6,
             min_samples_leaf=3,
-            class_weight="balanced",
             random_state=42,
             n_jobs=-1,
+            oob_score=True,
+            warm_start=True,
         )
-        self._rf.fit(X, y)
+        with warnings.catch_warnings():
+            # rows no tree left out get NaN votes; _oob_auc drops them
+            warnings.filterwarnings("ignore", message="Some inputs do not have OOB scores")
+            t0 = time.perf_counter()
+            self._rf.fit(X, y, sample_weight=weights)
+            per_tree = (time.perf_counter() - t0) / RF_MIN_TREES
+
+            affordable = int(budget_s / per_tree) if per_tree > 0 else RF_MAX_TREES
+            n_trees = max(RF_MIN_TREES, min(RF_MAX_TREES, affordable))
+            if n_trees > RF_MIN_TREES:
+                self._rf.set_params(n_estimators=n_trees)
+                self._rf.fit(X, y, sample_weight=weights)  # adds only the new trees
+
+        return {
+            "status":     "trained",
+            "n_samples":  len(X),
+            "n_trees":    n_trees,
+            "roc_auc":    round(self._oob_auc(y), 3),
+            "importance": dict(zip(FEATURE_NAMES, self._rf.feature_importances_.tolist())),
+        }
 
+    def _oob_auc(self, y: np.ndarray) -> float:
+        """ROC-AUC from out-of-bag votes: each tree scores only rows it never saw."""
         try:
-            cv_scores = cross_val_score(self._rf, X, y, cv=min(3, len(y)//10 + 1), scoring="roc_auc")
-            auc = float(cv_scores.mean())
+            proba = self._rf.oob_decision_function_[:, list(self._rf.classes_).index(1)]
+            seen  = ~np.isnan(proba)
+            return float(roc_auc_score(y[seen], proba[seen]))
         except Exception:
-            auc = 0.0
+            return 0.0
 
-        importance = dict(zip(FEATURE_NAMES, self._rf.feature_importances_.tolist()))
-        return {"status": "trained", "n_samples": len(X), "roc_auc": round(auc, 3), "importance": importance}
-
-    def _train_km(self, moves: list[dict]) -> dict:
-        X, _ = get_feature_matrix(moves)
-        if X.shape[0] < MIN_MOVES_CLUSTER:
+    def _train_km(self, X_scaled: np.ndarray, budget_s: float) -> dict:
+        if X_scaled.shape[0] < MIN_MOVES_CLUSTER:
             return {"status": "skipped", "reason": "too_few"}
 
-        self._scaler = StandardScaler()
-        X_scaled = self._scaler.fit_transform(X)
-
-        self._km = KMeans(n_clusters=4, random_state=42, n_init=10)
-        self._km.fit(X_scaled)
-
-        cluster_feat = compute_cluster_features(moves)
-        if cluster_feat is not None:
-            player_mean = X_scaled.mean(axis=0).reshape(1, -1)
-            cluster_id  = int(self._km.predict(player_mean)[0])
-        else:
-            cluster_id = 3
-
-        return {"status": "trained", "cluster_id": cluster_id, "cluster_name": CLUSTER_NAMES.get(cluster_id, "unknown")}
+        # KMeans(n_init=k) is k independent restarts keeping the lowest inertia;
+        # run them one at a time so we can stop when the budget is spent.
+        deadline = time.perf_counter() + budget_s
+        best, n_init = None, 0
+        while n_init < KM_MAX_INIT and (n_init == 0 or time.perf_counter() < deadline):
+            km = KMeans(n_clusters=4, random_state=42 + n_init, n_init=1).fit(X_scaled)
+            if best is None or km.inertia_ < best.inertia_:
+                best = km
+            n_init += 1
+        self._km = best
+
+        player_mean = X_scaled.mean(axis=0).reshape(1, -1)
+        cluster_id  = int(self._km.predict(player_mean)[0])
+
+        return {
+            "status":       "trained",
+            "n_init":       n_init,
+            "cluster_id":   cluster_id,
+            "cluster_name": CLUSTER_NAMES.get(cluster_id, "unknown"),
+        }
 
-    def _train_lr(self, moves: list[dict]) -> dict:
-        X, y = get_feature_matrix(moves)
+    def _train_lr(self, X_scaled: np.ndarray, y: np.ndarray) -> dict:
         if len(np.unique(y)) < 2:
             return {"status": "skipped", "reason": "only_one_class"}
 
-        scaler   = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-
         self._lr = LogisticRegression(max_iter=500, class_weight="balanced", random_state=42, C=1.0)
         self._lr.fit(X_scaled, y)
-        self._lr_scaler = scaler
-
-        try:
-            score = cross_val_score(self._lr, X_scaled, y, cv=min(3, len(y)//10 + 1)).mean()
-        except Exception:
-            score = 0.0
 
-        return {"status": "trained", "accuracy": round(float(score), 3)}
+        # in-sample: a linear model on 14 features barely overfits, and a
+        # cross-validated score would cost k extra fits
+        return {"status": "trained", "accuracy": round(float(self._lr.score(X_scaled, y)), 3)}
 
     def needs_retrain(self, current_n_moves: int) -> bool:
         if self._rf is None:
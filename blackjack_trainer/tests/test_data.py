@@ -7,7 +7,10 @@
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+import contextlib
+import io
 import json
+import tempfile
 import unittest
 
 from data.database import Database
@@ -15,7 +18,10 @@ from data.repository import (
     PlayerRepo, SessionRepo, RoundRepo, MoveRepo, AnalyticsRepo
 )
 from data.game_session import GameSession
-from game.engine import Action
+from data.codec import encode_cards, decode_cards
+from data.compaction import compact_history, main as compaction_main
+from data.session_pool import SessionPool
+from game.engine import Action, Deck, Suit
 
 
 # ─── helpers ──────────────────────────────────────────────────────────────────
@@ -252,11 +258,26 @@ class TestRoundRepo(unittest.TestCase):
         r = self.repo.get(rid)
         self.assertIsNone(r["round_accuracy"])
 
-    def test_player_cards_stored_as_json(self):
+    def test_player_cards_decoded_on_read(self):
         rid = self._start()
         r = self.repo.get(rid)
-        cards = json.loads(r["player_cards_start"])
-        self.assertEqual(cards, ["A♠", "K♥"])
+        self.assertEqual(r["player_cards_start"], ["A♠", "K♥"])
+
+    def test_player_cards_stored_as_blob(self):
+        rid = self._start()
+        raw = self.db.get_conn().execute(
+            "SELECT player_cards_start FROM rounds WHERE id = ?", (rid,)
+        ).fetchone()[0]
+        self.assertEqual(raw, encode_cards(["A♠", "K♥"]))
+        self.assertEqual(len(raw), 2)
+
+    def test_legacy_json_cards_still_decoded(self):
+        rid = self._start()
+        self.db.get_conn().execute(
+            "UPDATE rounds SET player_cards_start = ? WHERE id = ?",
+            (json.dumps(["Q♦", "5♣"]), rid)
+        )
+        self.assertEqual(self.repo.get(rid)["player_cards_start"], ["Q♦", "5♣"])
 
     def test_list_for_session(self):
         self._start(1); self._start(2); self._start(3)
@@ -432,6 +453,114 @@ class TestAnalyticsRepo(unittest.TestCase):
         self.assertEqual(self.analytics.accuracy_by_session(empty_pid), [])
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+#  CARD CODEC
+# ══════════════════════════════════════════════════════════════════════════════
+
+class TestCardCodec(unittest.TestCase):
+
+    def test_roundtrip_all_cards(self):
+        cards = [f"{r}{s.value}" for r in Deck.RANKS for s in Suit]
+        self.assertEqual(decode_cards(encode_cards(cards)), cards)
+
+    def test_one_byte_per_card(self):
+        self.assertEqual(len(encode_cards(["10♠", "A♥", "K♦"])), 3)
+
+    def test_invalid_card_raises(self):
+        with self.assertRaises(ValueError):
+            encode_cards(["1♠"])
+
+    def test_none_passthrough(self):
+        self.assertIsNone(decode_cards(None))
+
+
+# ══════════════════════════════════════════════════════════════════════════════
+#  COMPACTION
+# ══════════════════════════════════════════════════════════════════════════════
+
+class TestCompaction(unittest.TestCase):
+
+    def setUp(self):
+        """5 завершённых сессий по 4 раунда, ходы с ошибками и без."""
+        self.db  = make_db()
+        self.pid = PlayerRepo(self.db).create("Jack")
+        sr, rr, mr = SessionRepo(self.db), RoundRepo(self.db), MoveRepo(self.db)
+        for s in range(5):
+            sid = sr.start(self.pid)
+            for n in range(4):
+                rid = rr.start(sid, n + 1, ["10♠", "6♥"], "9♦", "7♣")
+                mr.record(rid, 1, 16, 9, False, False, 0, ["10♠", "6♥"], "hit", "hit", True)
+                mr.record(rid, 2, 18, 9, False, False, 0, ["10♠", "6♥", "2♦"],
+                          "hit" if n % 2 else "stand", "stand", not n % 2)
+                rr.finish(rid, ["10♠", "6♥", "2♦"], ["9♦", "7♣"], 18, 16, "win", 2, 2 - n % 2)
+            sr.end(sid)
+        self.analytics = AnalyticsRepo(self.db)
+
+    def _snapshot(self):
+        moves = MoveRepo(self.db).all_for_player(self.pid)
+        key   = lambda m: tuple(m[c] for c in ("player_total", "action_taken", "is_correct"))
+        return (
+            self.analytics.error_heatmap(self.pid),
+            self.analytics.action_breakdown(self.pid),
+            self.analytics.recent_mistakes(self.pid, limit=2),
+            self.analytics.overall_stats(self.pid),
+            sorted(map(key, moves)),
+        )
+
+    def _live_moves(self):
+        return self.db.get_conn().execute("SELECT COUNT(*) FROM moves").fetchone()[0]
+
+    def test_analytics_identical_after_compaction(self):
+        before = self._snapshot()
+        compact_history(self.db, keep_sessions=1, keep_mistakes=2)
+        self.assertEqual(self._snapshot(), before)
+
+    def test_old_moves_rolled_up(self):
+        stats = compact_history(self.db, keep_sessions=1, keep_mistakes=2)
+        self.assertGreater(stats["moves_compacted"], 0)
+        self.assertEqual(self._live_moves(), 40 - stats["moves_compacted"])
+        n = self.db.get_conn().execute("SELECT SUM(n) FROM move_summaries").fetchone()[0]
+        self.assertEqual(n, stats["moves_compacted"])
+
+    def test_recent_sessions_kept(self):
+        compact_history(self.db, keep_sessions=5)
+        self.assertEqual(self._live_moves(), 40)
+
+    def test_compaction_idempotent(self):
+        compact_history(self.db, keep_sessions=1, keep_mistakes=0)
+        before = self._snapshot()
+        stats  = compact_history(self.db, keep_sessions=1, keep_mistakes=0)
+        self.assertEqual(stats["moves_compacted"], 0)
+        self.assertEqual(self._snapshot(), before)
+
+    def test_legacy_json_rows_reencoded(self):
+        conn = self.db.get_conn()
+        conn.execute("UPDATE moves SET hand_cards = ?", (json.dumps(["10♠", "6♥"]),))
+        conn.commit()
+        stats = compact_history(self.db, keep_sessions=5)
+        self.assertEqual(stats["rows_reencoded"], 40)
+        kinds = {r[0] for r in conn.execute("SELECT typeof(hand_cards) FROM moves")}
+        self.assertEqual(kinds, {"blob"})
+
+    def test_runs_as_standalone_job(self):
+        """Компакция — отдельная задача над файлом БД, а не побочный эффект приложения."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bj.db")
+            db = Database(path)
+            pid = PlayerRepo(db).create("Jack")
+            sr, rr, mr = SessionRepo(db), RoundRepo(db), MoveRepo(db)
+            for s in range(3):
+                sid = sr.start(pid)
+                rid = rr.start(sid, 1, ["10♠", "6♥"], "9♦", "7♣")
+                mr.record(rid, 1, 16, 9, False, False, 0, ["10♠", "6♥"], "hit", "hit", True)
+                sr.end(sid)
+            db.close()
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                stats = compaction_main(["--db", path, "--keep-sessions", "1"])
+            self.assertEqual(stats["moves_compacted"], 2)
+            self.assertIn("moves_compacted=2", out.getvalue())
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 #  GAME SESSION — integration
 # ══════════════════════════════════════════════════════════════════════════════
@@ -545,5 +674,86 @@ class TestGameSession(unittest.TestCase):
         self.assertEqual(p["total_rounds"], 1)
 
 
+# ══════════════════════════════════════════════════════════════════════════════
+#  SESSION POOL
+# ══════════════════════════════════════════════════════════════════════════════
+
+class TestSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.db   = make_db()
+        self.now  = [0.0]
+        self.pool = SessionPool(self.db, ttl_seconds=60, max_sessions=3,
+                                clock=lambda: self.now[0])
+
+    def _ended(self, gs):
+        return SessionRepo(self.db).get(gs.session_id)["ended_at"] is not None
+
+    def test_same_token_same_session(self):
+        self.assertIs(self.pool.get("a"), self.pool.get("a"))
+
+    def test_tokens_share_models_per_player(self):
+        a, b = self.pool.get("a"), self.pool.get("b")
+        self.assertIsNot(a, b)
+        self.assertIs(a._trainer, b._trainer)
+        self.assertIs(a._predictor, b._predictor)
+        self.assertEqual(self.pool.n_models, 1)
+
+    def test_idle_session_evicted_and_ended(self):
+        gs = self.pool.get("a")
+        self.now[0] = 61
+        self.pool.get("b")
+        self.assertNotIn("a", self.pool)
+        self.assertTrue(self._ended(gs))
+
+    def test_touch_keeps_session_alive(self):
+        gs = self.pool.get("a")
+        self.now[0] = 50; self.pool.get("a")
+        self.now[0] = 100; self.pool.get("b")
+        self.assertIn("a", self.pool)
+        self.assertFalse(self._ended(gs))
+
+    def test_evicted_token_gets_new_session(self):
+        old = self.pool.get("a")
+        self.now[0] = 120
+        new = self.pool.get("a")
+        self.assertNotEqual(old.session_id, new.session_id)
+
+    def test_lru_cap(self):
+        first = self.pool.get("a")
+        self.pool.get("b"); self.pool.get("c")
+        self.pool.get("a")            # a is now most recent
+        self.pool.get("d")            # evicts b
+        self.assertEqual(len(self.pool), 3)
+        self.assertIn("a", self.pool)
+        self.assertNotIn("b", self.pool)
+        self.assertFalse(self._ended(first))
+
+    def test_models_dropped_with_last_session(self):
+        self.pool.get("a"); self.pool.get("b")
+        self.pool.close("a")
+        self.assertEqual(self.pool.n_models, 1)
+        self.pool.close("b")
+        self.assertEqual(self.pool.n_models, 0)
+
+    def test_close_all(self):
+        sessions = [self.pool.get(t) for t in "abc"]
+        self.pool.close_all()
+        self.assertEqual(len(self.pool), 0)
+        self.assertTrue(all(self._ended(gs) for gs in sessions))
+
+    def test_failed_end_is_logged_and_session_dropped(self):
+        gs = self.pool.get("a")
+
+        def end_session():
+            raise RuntimeError("db gone")
+        gs.end_session = end_session
+        with self.assertLogs("data.session_pool", level="ERROR") as logs:
+            self.pool.close("a")
+        self.assertNotIn("a", self.pool)
+        self.assertEqual(self.pool.n_models, 0)
+        self.assertIn(str(gs.session_id), logs.output[0])
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -51,6 +51,16 @@ class TestDeck(unittest.TestCase):
         self.assertEqual(ranks, {str(i) for i in range(2,11)} | {"J","Q","K","A"})
     def test_all_suits(self):
         self.assertEqual({c.suit for c in Deck(1)._cards}, set(Suit))
+    def test_running_count_full_deck_zero(self):
+        d = Deck(1)
+        for _ in range(40): d.deal()
+        rest = sum(1 if c.value <= 6 else -1 if c.value >= 10 else 0 for c in d._cards)
+        self.assertEqual(d.running_count, -rest)
+    def test_running_count_reset_on_reshuffle(self):
+        d = Deck(1)
+        for _ in range(10): d.deal()
+        d.reshuffle()
+        self.assertEqual(d.running_count, 0)
 
 
 class TestHandValue(unittest.TestCase):
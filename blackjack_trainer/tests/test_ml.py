@@ -14,6 +14,7 @@ from pathlib import Path
 from ml.features import (
     moves_to_dataframe, get_feature_matrix,
     extract_features_single, compute_cluster_features,
+    situation_ids, decode_situations, situation_feature_matrix,
     FEATURE_NAMES,
 )
 from ml.bootstrap import generate_synthetic_moves
@@ -163,6 +164,20 @@ class TestFeatureEngineering(unittest.TestCase):
         df = moves_to_dataframe([risky_move])
         self.assertEqual(df["is_risky"].iloc[0], 1)
 
+    def test_situation_features_match_full_matrix(self):
+        X, _ = get_feature_matrix(self.moves)
+        np.testing.assert_array_equal(situation_feature_matrix(situation_ids(self.moves)), X)
+
+    def test_situation_ids_roundtrip(self):
+        s = decode_situations(situation_ids(self.moves))
+        for i, m in enumerate(self.moves):
+            self.assertEqual(s["player_total"][i],      m["player_total"])
+            self.assertEqual(s["dealer_upcard_val"][i], m["dealer_upcard_val"])
+            self.assertEqual(s["pair_card_value"][i],   m["pair_card_value"])
+
+    def test_situation_ids_empty(self):
+        self.assertEqual(len(situation_ids([])), 0)
+
     def test_not_risky_for_safe_hand(self):
         safe_move = {
             "player_total": 17, "dealer_upcard_val": 6,
@@ -261,6 +276,47 @@ class TestMLTrainer(unittest.TestCase):
         for i in range(4):
             self.assertIn(i, CLUSTER_NAMES)
 
+    def _train_result(self, budget_s=2.0):
+        import ml.trainer as _t
+        orig = _t.MODELS_DIR
+        _t.MODELS_DIR = Path(self.tmpdir)
+        t = MLTrainer(player_id=996)
+        result = t.train(self.moves, budget_s=budget_s)
+        _t.MODELS_DIR = orig
+        return t, result
+
+    def test_rf_reports_oob_auc(self):
+        t, result = self._train_result()
+        self.assertTrue(hasattr(t._rf, "oob_decision_function_"))
+        self.assertGreater(result["rf"]["roc_auc"], 0.5)
+        self.assertLessEqual(result["rf"]["roc_auc"], 1.0)
+
+    def test_time_reported_per_model(self):
+        _, result = self._train_result()
+        for key in ("rf", "km", "lr"):
+            self.assertIn("seconds", result[key])
+            self.assertGreaterEqual(result[key]["seconds"], 0.0)
+        self.assertIn("seconds", result)
+
+    def test_tiny_budget_shrinks_models(self):
+        """Бюджет ~0: минимум деревьев и одна инициализация KMeans."""
+        from ml.trainer import RF_MIN_TREES
+        t, result = self._train_result(budget_s=1e-6)
+        self.assertEqual(result["rf"]["n_trees"], RF_MIN_TREES)
+        self.assertEqual(len(t._rf.estimators_), RF_MIN_TREES)
+        self.assertEqual(result["km"]["n_init"], 1)
+
+    def test_generous_budget_full_models(self):
+        from ml.trainer import RF_MAX_TREES, KM_MAX_INIT
+        _, result = self._train_result(budget_s=60)
+        self.assertEqual(result["rf"]["n_trees"], RF_MAX_TREES)
+        self.assertEqual(result["km"]["n_init"], KM_MAX_INIT)
+
+    def test_lr_and_km_share_scaler(self):
+        t, _ = self._train_result()
+        self.assertIsNotNone(t._scaler)
+        self.assertEqual(t._scaler.n_features_in_, len(FEATURE_NAMES))
+
 
 # ══════════════════════════════════════════════════════════════════════════════
 #  PREDICTOR
@@ -335,6 +391,31 @@ class TestMLPredictor(unittest.TestCase):
             probs = [r["error_prob"] for r in result]
             self.assertEqual(probs, sorted(probs, reverse=True))
 
+    def test_top_mistakes_exact_integer_situations(self):
+        seen = {(m["player_total"], m["dealer_upcard_val"], bool(m["is_soft"])) for m in self.moves}
+        for item in self.predictor.top_mistakes(self.moves, n=10):
+            self.assertIsInstance(item["player_total"], int)
+            self.assertIn((item["player_total"], item["dealer_upcard"], item["is_soft"]), seen)
+
+    def test_top_mistakes_matches_per_move_average(self):
+        """Взвешенное среднее по ситуациям == среднее по всем ходам."""
+        X, _ = get_feature_matrix(self.moves)
+        rf = self.trainer._rf
+        probs = rf.predict_proba(X)[:, list(rf.classes_).index(0)]
+        top = self.predictor.top_mistakes(self.moves, n=1)[0]
+        mask = [
+            (m["player_total"], m["dealer_upcard_val"], bool(m["is_soft"]))
+            == (top["player_total"], top["dealer_upcard"], top["is_soft"])
+            for m in self.moves
+        ]
+        self.assertAlmostEqual(top["error_prob"], round(float(probs[mask].mean()), 3), places=3)
+
+    def test_get_cluster_info_matches_full_matrix(self):
+        X, _ = get_feature_matrix(self.moves)
+        X_scaled = self.trainer._scaler.transform(X)
+        expected = int(self.trainer._km.predict(X_scaled.mean(axis=0).reshape(1, -1))[0])
+        self.assertEqual(self.predictor.get_cluster_info(self.moves)["cluster_id"], expected)
+
     def test_get_cluster_info_returns_dict(self):
         info = self.predictor.get_cluster_info(self.moves)
         if info is not None:
@@ -132,5 +132,77 @@ class TestSimulationLogic(unittest.TestCase):
         self.assertEqual(sum(r["counts"].values()), 100)
 
 
+class TestBankroll(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from ml.simulation import simulate_strategy, _basic_strategy
+        cls.sim = simulate_strategy(_basic_strategy, 2000, 6, 10)
+
+    def test_pnl_by_count_sums_to_n(self):
+        total = sum(n for d in self.sim["pnl_by_count"].values() for n in d.values())
+        self.assertEqual(total, 2000)
+
+    def test_distribution_probs_sum_to_one(self):
+        from ml.bankroll import pnl_distribution
+        _, pnls, probs = pnl_distribution(self.sim)
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertTrue(set(pnls.tolist()).issubset({-1.0, 0.0, 1.0, 1.5}))
+
+    def test_flat_result_fields(self):
+        from ml.bankroll import simulate_bankroll, FlatBet
+        r = simulate_bankroll(self.sim, FlatBet(10), bankroll=200, n_rounds=100,
+                              n_paths=3000, target=300, seed=1)
+        for field in ("risk_of_ruin", "drawdown_quantiles", "time_to_target", "mean_path"):
+            self.assertIn(field, r)
+        self.assertGreaterEqual(r["risk_of_ruin"], 0.0)
+        self.assertLessEqual(r["risk_of_ruin"], 1.0)
+        self.assertEqual(len(r["mean_path"]), 100)
+
+    def test_blocks_do_not_change_result(self):
+        """Одинаковый seed: один блок на весь набор и много маленьких блоков дают одну статистику."""
+        import numpy as np
+        from ml.bankroll import simulate_bankroll, FlatBet
+        one  = simulate_bankroll(self.sim, FlatBet(10), 100, 50, 1000, seed=3, block_size=1000)
+        many = simulate_bankroll(self.sim, FlatBet(10), 100, 50, 1000, seed=3, block_size=1)
+        self.assertEqual(many["risk_of_ruin"], one["risk_of_ruin"])
+        self.assertEqual(many["final_quantiles"], one["final_quantiles"])
+        self.assertEqual(many["drawdown_quantiles"], one["drawdown_quantiles"])
+        self.assertTrue((many["sample_paths"] == one["sample_paths"]).all())
+        self.assertTrue(np.allclose(many["mean_path"], one["mean_path"]))
+
+    def test_tiny_bankroll_ruins_more(self):
+        from ml.bankroll import simulate_bankroll, FlatBet
+        small = simulate_bankroll(self.sim, FlatBet(10), 20,   200, 2000, seed=5)
+        large = simulate_bankroll(self.sim, FlatBet(10), 5000, 200, 2000, seed=5)
+        self.assertGreater(small["risk_of_ruin"], large["risk_of_ruin"])
+        self.assertEqual(large["risk_of_ruin"], 0.0)
+
+    def test_ruined_paths_stay_ruined(self):
+        from ml.bankroll import simulate_bankroll, FlatBet
+        r = simulate_bankroll(self.sim, FlatBet(10), 20, 300, 50, seed=7)
+        for path in r["sample_paths"]:
+            hit = (path <= 0).nonzero()[0]
+            if len(hit):
+                self.assertTrue((path[hit[0]:] == 0).all())
+
+    def test_kelly_never_goes_negative(self):
+        from ml.bankroll import simulate_bankroll, KellyBet
+        r = simulate_bankroll(self.sim, KellyBet(1.0), 1000, 200, 2000, seed=2)
+        self.assertGreater(r["sample_paths"].min(), 0)
+
+    def test_count_spread_ramp(self):
+        from ml.bankroll import CountSpread
+        p = CountSpread(10, {2: 2.0, 4: 8.0})
+        self.assertEqual(p.units_for(-3), 1.0)
+        self.assertEqual(p.units_for(3),  2.0)
+        self.assertEqual(p.units_for(6),  8.0)
+
+    def test_unknown_policy_raises(self):
+        from ml.bankroll import simulate_bankroll
+        with self.assertRaises(TypeError):
+            simulate_bankroll(self.sim, object(), n_paths=10, n_rounds=10)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -43,7 +43,7 @@ def render_game(gs):
     if state["round_active"] or st.session_state.get("round_result"):
         _render_table(gs, state)
     else:
-        _render_new_round_prompt()
+        _render_new_round_prompt(gs)
 
 
 def _init_round_if_needed(gs):
@@ -59,7 +59,7 @@ def _handle_instant_blackjack(gs):
     st.session_state["round_result"]  = result_data
     st.session_state["round_started"] = False
     _show_result(gs, result_data, gs.state)
-    _render_next_button()
+    _render_next_button(gs)
 
 
 def _render_table(gs, state):
@@ -132,7 +132,7 @@ def _render_table(gs, state):
     result_data = st.session_state.get("round_result")
     if result_data:
         _show_result(gs, result_data, state)
-        _render_next_button()
+        _render_next_button(gs)
     elif state["round_active"]:
         _render_action_buttons(gs, state)
 
@@ -225,25 +225,23 @@ def _show_result(gs, result_data: dict, state: dict):
             )
 
 
-def _render_new_round_prompt():
+def _render_new_round_prompt(gs):
     col_l, col_c, col_r = st.columns([2, 1, 2])
     with col_c:
         if st.button("🃏 New Round", use_container_width=True, type="primary"):
-            _start_new_round()
+            _start_new_round(gs)
 
 
-def _render_next_button():
+def _render_next_button(gs):
     st.markdown("<br>", unsafe_allow_html=True)
     col_l, col_c, col_r = st.columns([2, 1, 2])
     with col_c:
         if st.button("▶ Next Round", use_container_width=True, type="primary"):
-            _start_new_round()
+            _start_new_round(gs)
 
 
-def _start_new_round():
-    gs = st.session_state.get("gs")
-    if gs:
-        gs.new_round()
+def _start_new_round(gs):
+    gs.new_round()
     st.session_state["round_result"]       = None
     st.session_state["dealer_final_cards"] = None
     st.session_state["dealer_final_value"] = None
@@ -5,6 +5,7 @@ BlackJack Trainer — Monte Carlo Simulation
 import streamlit as st
 from ui.styles import COLORS
 from ml.simulation import run_all_simulations
+from ml.bankroll import simulate_bankroll, FlatBet, KellyBet, CountSpread
 
 
 def render_simulation(gs):
@@ -46,6 +47,7 @@ def render_simulation(gs):
         else:
             results = st.session_state["sim_results"]
         _render_results(results)
+        _render_bankroll(results)
 
 
 def _render_results(results: dict):
@@ -149,3 +151,96 @@ def _plotly_results(results: dict, go):
         f'The house always wins — the goal is to <em>lose less</em>.</div>',
         unsafe_allow_html=True
     )
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _simulate_bankrolls(pnl_by_count: dict, policy_name: str, bet: float,
+                        bankroll: float, n_rounds: int) -> dict:
+    """Cached per input so widget reruns don't redo the 20,000 paths."""
+    policy = {
+        "Flat":             FlatBet(bet),
+        "Kelly ½":          KellyBet(0.5),
+        "Count spread 1-8": CountSpread(bet),
+    }[policy_name]
+    return simulate_bankroll(
+        {"pnl_by_count": pnl_by_count}, policy,
+        bankroll=bankroll, n_rounds=n_rounds, n_paths=20_000,
+        target=bankroll * 1.5,
+        ruin_level=0.0 if not isinstance(policy, KellyBet) else float(bet),
+    )
+
+
+def _render_bankroll(results: dict):
+    st.markdown('<div class="gold-divider" style="margin:20px 0"></div>', unsafe_allow_html=True)
+    st.markdown(
+        '<h3 style="text-align:center;letter-spacing:0.12em">💰 BANKROLL &amp; RISK OF RUIN</h3>',
+        unsafe_allow_html=True
+    )
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        key = st.selectbox(
+            "Strategy", ["basic", "player", "random"],
+            format_func={"basic": "Basic Strategy", "player": "Beginner", "random": "Random"}.get,
+        )
+    with col2:
+        policy_name = st.selectbox("Bet sizing", ["Flat", "Kelly ½", "Count spread 1-8"])
+    with col3:
+        bankroll = st.number_input("Bankroll ($)", min_value=10, max_value=1_000_000, value=1000, step=100)
+    with col4:
+        n_rounds = st.select_slider("Horizon (rounds)", options=[100, 250, 500, 1000, 2000], value=500)
+
+    target = bankroll * 1.5
+    with st.spinner("Simulating 20,000 bankrolls..."):
+        br = _simulate_bankrolls(
+            results[key]["pnl_by_count"], policy_name, results["bet"], float(bankroll), n_rounds,
+        )
+
+    ttt = br["time_to_target"]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Risk of ruin", f"{br['risk_of_ruin']*100:.2f}%")
+    c2.metric("Median max drawdown", f"${br['drawdown_quantiles'][0.5]:,.0f}")
+    c3.metric("99% max drawdown", f"${br['drawdown_quantiles'][0.99]:,.0f}")
+    c4.metric(
+        f"Reach ${target:,.0f}",
+        f"{ttt['hit_rate']*100:.1f}%",
+        f"median {ttt['median']:.0f} rounds" if ttt["median"] is not None else None,
+        delta_color="off",
+    )
+
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        return
+
+    x    = list(range(1, n_rounds + 1))
+    mean = br["mean_path"]
+    std  = br["std_path"]
+    fig  = go.Figure()
+    for path in br["sample_paths"]:
+        fig.add_trace(go.Scatter(
+            x=x, y=path, mode="lines", showlegend=False,
+            line=dict(color=COLORS["text_muted"], width=0.6), opacity=0.35,
+        ))
+    fig.add_trace(go.Scatter(
+        x=x + x[::-1], y=list(mean + std) + list((mean - std)[::-1]),
+        fill="toself", fillcolor="rgba(201,162,39,0.15)",
+        line=dict(width=0), name="±1σ",
+    ))
+    fig.add_trace(go.Scatter(
+        x=x, y=mean, mode="lines", name="Mean",
+        line=dict(color=COLORS["gold"], width=2),
+    ))
+    fig.update_layout(
+        xaxis=dict(title="Round", gridcolor=COLORS["border"], gridwidth=0.5,
+                   tickfont=dict(color=COLORS["text_muted"], family="Cinzel", size=10)),
+        yaxis=dict(title="Bankroll ($)", tickprefix="$", gridcolor=COLORS["border"], gridwidth=0.5,
+                   tickfont=dict(color=COLORS["text_muted"], family="Cinzel", size=10)),
+        legend=dict(font=dict(color=COLORS["text_muted"], family="Cinzel", size=11),
+                    bgcolor=COLORS["surface"], bordercolor=COLORS["border"]),
+        paper_bgcolor=COLORS["felt_dark"],
+        plot_bgcolor=COLORS["felt"],
+        margin=dict(l=70, r=40, t=30, b=60),
+        height=360,
+    )
+    st.plotly_chart(fig, use_container_width=True)
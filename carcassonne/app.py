@@ -1,8 +1,19 @@
-from flask import Flask, request, jsonify, send_from_directory
-from game.session import GameSession
+import json
+import os
+from flask import Flask, Response, request, jsonify, send_from_directory
+from game.store import GameStore
+from game.record import GameRecord
+from game.analytics import METRICS
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
-games = {}
+# every worker process opens the same SQLite file; see GameStore
+os.makedirs(app.instance_path, exist_ok=True)
+games = GameStore(os.environ.get("CARCASSONNE_DB",
+                                 os.path.join(app.instance_path, "carcassonne.db")))
+
+
+def _conflict():
+    return jsonify({"error": "Game was changed by another request, reload and retry"}), 409
 
 
 @app.route("/")
@@ -18,11 +29,14 @@ def create_game():
     num_players = data.get("num_players", 2)
     bot_opponent = data.get("bot_opponent")
     custom_rules = data.get("rules", {})
-    game = GameSession(num_players=num_players, custom_rules=custom_rules)
-    games[game.id] = game
+    seed = data.get("seed")
+    if seed is not None and not (isinstance(seed, int) and 0 <= seed < 2 ** 64):
+        return jsonify({"error": "seed must be an integer in [0, 2**64)"}), 400
+    game = games.create(num_players=num_players, custom_rules=custom_rules, seed=seed)
 
     if bot_opponent:
         game.add_player(f"Bot ({bot_opponent.title()})", is_bot=True, bot_type=bot_opponent)
+        games.save(game)
 
     return jsonify({"game_id": game.id, "rules": game.rules})
 
@@ -34,9 +48,12 @@ def join_game(game_id):
         return jsonify({"error": "Game not found"}), 404
     data = request.json or {}
     name = data.get("name", "Player")
-    if len(game.players) >= game.num_players:
-        return jsonify({"error": "Game is full"}), 400
-    player = game.add_player(name)
+    with game.lock:
+        if len(game.players) >= game.num_players:
+            return jsonify({"error": "Game is full"}), 400
+        player = game.add_player(name)
+    if not games.save(game):
+        return _conflict()
     return jsonify({"player_id": player.id, "name": player.name, "rules": game.rules})
 
 
@@ -46,7 +63,74 @@ def get_game(game_id):
     if not game:
         return jsonify({"error": "Game not found"}), 404
     player_id = request.args.get("player_id")
-    return jsonify(game.to_dict(for_player=player_id))
+    since = _since()
+    # the state only moves with game.version, so that (plus whose view and
+    # which delta) names the response; unchanged polls get a bodiless 304
+    etag = f"{game.id}.{game.version}.{player_id or ''}.{'' if since is None else since}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        with game.lock:
+            response = jsonify(game.to_dict(for_player=player_id, since=since))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _since():
+    """?since=<version>: the state version the client already holds, if any."""
+    return request.args.get("since", type=int)
+
+
+# ── Server Push ──
+
+KEEPALIVE_SECONDS = 15.0
+REFRESH_SECONDS = 1.0
+
+
+@app.route("/api/games/<game_id>/events", methods=["GET"])
+def game_events(game_id):
+    """
+    Server-Sent Events stream of `state` messages: the full state first (or
+    a delta when resuming via Last-Event-ID / ?since=), then one delta per
+    version as the game moves, until it is finished.
+    """
+    game = games.get(game_id)
+    if not game:
+        return jsonify({"error": "Game not found"}), 404
+    player_id = request.args.get("player_id")
+    since = request.headers.get("Last-Event-ID", type=int)
+    if since is None:
+        since = _since()
+    return Response(_event_stream(game, player_id, since), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def _event_stream(game, player_id, since):
+    idle = 0.0
+    while True:
+        if game.events.closed:
+            # the store unloaded this copy; follow the game to its reload
+            game = games.get(game.id)
+            if game is None:
+                return
+        if since != game.version:
+            with game.lock:
+                state = game.to_dict(for_player=player_id, since=since)
+            since = state["version"]
+            idle = 0.0
+            yield f"id: {since}\nevent: state\ndata: {json.dumps(state)}\n\n"
+        elif game.phase == "finished":
+            return
+        elif not game.events.wait(since, REFRESH_SECONDS):
+            # moves served by other worker processes only arrive via the
+            # store; a read-only look at the log says whether to load them
+            if games.behind(game):
+                game = games.get(game.id) or game
+            idle += REFRESH_SECONDS
+            if idle >= KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keepalive\n\n"
 
 
 # ── Tile Placement ──
@@ -57,7 +141,8 @@ def get_moves(game_id):
     if not game:
         return jsonify({"error": "Game not found"}), 404
     player_id = request.args.get("player_id")
-    return jsonify({"moves": game.get_valid_moves(player_id)})
+    with game.lock:
+        return jsonify({"moves": game.get_valid_moves(player_id)})
 
 
 @app.route("/api/games/<game_id>/place", methods=["POST"])
@@ -70,18 +155,22 @@ def place_tile(game_id):
     if not player_id:
         return jsonify({"error": "player_id required"}), 400
 
-    result = game.make_move(
-        player_id, data.get("tile_idx", 0),
-        data.get("x", 0), data.get("y", 0), data.get("rotation", 0),
-    )
-    if "error" in result:
-        return jsonify(result), 400
+    with game.lock:
+        result = game.make_move(
+            player_id, data.get("tile_idx", 0),
+            data.get("x", 0), data.get("y", 0), data.get("rotation", 0),
+        )
+        if "error" in result:
+            return jsonify(result), 400
+        state = game.to_dict(for_player=player_id, since=_since())
+    if not games.save(game):
+        return _conflict()
 
     return jsonify({
         "success": True,
         "move": result["move"],
         "meeple_options": result.get("meeple_options", []),
-        "game": game.to_dict(for_player=player_id),
+        "game": state,
     })
 
 
@@ -98,13 +187,17 @@ def place_meeple(game_id):
     if not player_id or not position:
         return jsonify({"error": "player_id and position required"}), 400
 
-    result = game.place_meeple(player_id, position)
-    if "error" in result:
-        return jsonify(result), 400
+    with game.lock:
+        result = game.place_meeple(player_id, position)
+        if "error" in result:
+            return jsonify(result), 400
+        state = game.to_dict(for_player=player_id, since=_since())
+    if not games.save(game):
+        return _conflict()
     return jsonify({
         "success": True,
         "score_events": result.get("score_events", []),
-        "game": game.to_dict(for_player=player_id),
+        "game": state,
     })
 
 
@@ -118,13 +211,17 @@ def skip_meeple(game_id):
     if not player_id:
         return jsonify({"error": "player_id required"}), 400
 
-    result = game.skip_meeple(player_id)
-    if "error" in result:
-        return jsonify(result), 400
+    with game.lock:
+        result = game.skip_meeple(player_id)
+        if "error" in result:
+            return jsonify(result), 400
+        state = game.to_dict(for_player=player_id, since=_since())
+    if not games.save(game):
+        return _conflict()
     return jsonify({
         "success": True,
         "score_events": result.get("score_events", []),
-        "game": game.to_dict(for_player=player_id),
+        "game": state,
     })
 
 
@@ -136,7 +233,8 @@ def get_meeple_options(game_id):
     player_id = request.args.get("player_id")
     if not player_id:
         return jsonify({"error": "player_id required"}), 400
-    return jsonify({"options": game.get_meeple_options(player_id)})
+    with game.lock:
+        return jsonify({"options": game.get_meeple_options(player_id)})
 
 
 # ── Engineer ──
@@ -153,14 +251,18 @@ def use_engineer(game_id):
     if not player_id:
         return jsonify({"error": "player_id required"}), 400
 
-    result = game.use_engineer(player_id, target_x, target_y)
-    if "error" in result:
-        return jsonify(result), 400
+    with game.lock:
+        result = game.use_engineer(player_id, target_x, target_y)
+        if "error" in result:
+            return jsonify(result), 400
+        state = game.to_dict(for_player=player_id, since=_since())
+    if not games.save(game):
+        return _conflict()
     return jsonify({
         "success": True,
         "rotated": result.get("rotated"),
         "score_events": result.get("score_events", []),
-        "game": game.to_dict(for_player=player_id),
+        "game": state,
     })
 
 
@@ -172,7 +274,8 @@ def engineer_targets(game_id):
     player_id = request.args.get("player_id")
     if not player_id:
         return jsonify({"error": "player_id required"}), 400
-    return jsonify({"targets": game.get_engineer_targets(player_id)})
+    with game.lock:
+        return jsonify({"targets": game.get_engineer_targets(player_id)})
 
 
 # ── Bot ──
@@ -182,26 +285,43 @@ def bot_turn(game_id):
     game = games.get(game_id)
     if not game:
         return jsonify({"error": "Game not found"}), 404
-    cp = game.current_player()
-    if not cp or not cp.is_bot:
-        return jsonify({"error": "Current player is not a bot"}), 400
-
-    results = []
-    for _ in range(5):
+    with game.lock:
         cp = game.current_player()
-        if not cp or not cp.is_bot or game.phase != "playing":
-            break
-        result = game.try_bot_turn()
-        if result:
-            results.append(result)
+        if not cp or not cp.is_bot:
+            return jsonify({"error": "Current player is not a bot"}), 400
+
+        results = []
+        for _ in range(5):
+            cp = game.current_player()
+            if not cp or not cp.is_bot or game.phase != "playing":
+                break
+            result = game.try_bot_turn()
+            if result:
+                results.append(result)
+        state = game.to_dict(since=_since())
+    if not games.save(game):
+        return _conflict()
 
     return jsonify({
         "success": True,
         "bot_actions": len(results),
-        "game": game.to_dict(),
+        "game": state,
     })
 
 
+# ── Records ──
+
+@app.route("/api/games/<game_id>/record", methods=["GET"])
+def game_record(game_id):
+    game = games.get(game_id)
+    if not game:
+        return jsonify({"error": "Game not found"}), 404
+    with game.lock:
+        record = GameRecord.from_session(game)
+    return Response(record.encode(), mimetype="application/octet-stream",
+                    headers={"Content-Disposition": f"attachment; filename={game_id}.crg"})
+
+
 # ── Analytics ──
 
 @app.route("/api/games/<game_id>/analytics", methods=["GET"])
@@ -209,7 +329,8 @@ def get_analytics(game_id):
     game = games.get(game_id)
     if not game:
         return jsonify({"error": "Game not found"}), 404
-    return jsonify(game.get_analytics())
+    with game.lock:
+        return jsonify(game.get_analytics())
 
 
 @app.route("/api/games/<game_id>/analytics/<metric>", methods=["GET"])
@@ -217,10 +338,10 @@ def get_metric(game_id, metric):
     game = games.get(game_id)
     if not game:
         return jsonify({"error": "Game not found"}), 404
-    analytics = game.get_analytics()
-    if metric not in analytics:
+    if metric not in METRICS:
         return jsonify({"error": f"Unknown metric: {metric}"}), 404
-    return jsonify({metric: analytics[metric]})
+    with game.lock:
+        return jsonify(game.get_analytics(metric))
 
 
 if __name__ == "__main__":
@@ -1,9 +1,16 @@
 from .tile import *
 from .board import Board
+from .planes import BoardPlanes
+from .features import Feature, FeatureIndex
 from .deck import Deck
 from .scoring import MeepleManager, Meeple, ScoringEngine, ScoreEvent
-from .bots import RandomBot, MinimaxBot, create_bot, BotMove
+from .bots import RandomBot, MinimaxBot, MCTSBot, ExpectimaxBot, create_bot, BotMove
+from .odds import TileOdds
+from .rollout import RolloutBoard
 from .analytics import AnalyticsEngine, compute_analytics
 from .objectives import ObjectiveManager, OBJECTIVES
 from .engineer import EngineerManager
+from .events import EventBus
 from .session import GameSession, Player
+from .store import GameStore
+from .record import GameRecord, Move, Replayer, encode_many, decode_many
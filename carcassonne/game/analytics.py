@@ -1,112 +1,161 @@
 import math
-import random
-import copy
-from typing import Dict, List, Set, Tuple, Optional
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Set, Tuple, Optional
 from collections import defaultdict
 
 import numpy as np
 import networkx as nx
-from scipy.spatial import Voronoi
+from scipy.spatial import cKDTree
 from scipy.stats import entropy as shannon_entropy
 
 from .board import Board
 from .tile import (
     TileDef, EdgeType, CenterType, TILE_DEFS,
-    SIDE_NAMES, NEIGHBOR_OFFSET, OPPOSITE, create_placed_tile,
+    SIDE_NAMES, NEIGHBOR_OFFSET, OPPOSITE, create_placed_tile, rotation_table,
 )
 from .scoring import MeepleManager, Meeple, ScoringEngine
+from .rollout import RolloutBoard, wilson_interval
+
+
+# metric -> (method computing it, game inputs it reads). A GameSession bumps
+# an input's version whenever that part of the game changes, so a memoized
+# metric stays valid until one of its own inputs moves.
+METRICS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "heatmap": ("heatmap_completion", ("board", "meeples")),
+    "luck_curve": ("luck_curve", ("history",)),
+    "entropy": ("field_entropy", ("board",)),
+    "greed_index": ("greed_index", ("board", "meeples", "scores", "players")),
+    "conflict_risk": ("conflict_risk", ("board", "meeples")),
+    "aggression_index": ("aggression_index", ("board", "meeples", "history", "players")),
+    "voronoi_control": ("voronoi_control", ("board", "meeples", "players")),
+    "nash_distance": ("nash_distance", ("board", "meeples", "history", "players")),
+    "parasitism": ("parasitism", ("board", "meeples", "players")),
+    "depth_score": ("depth_score", ("board", "meeples", "history", "players")),
+}
+
+# metrics slow enough to recompute off the request: method returning a
+# snapshot-bound callable, so the work itself never reads live game state
+BACKGROUND_JOBS: Dict[str, str] = {
+    "heatmap": "_heatmap_job",
+}
 
 
 class AnalyticsEngine:
+    """
+    Strategic metrics over a live game, computed one at a time on demand.
+
+    With versions (input name -> version it last changed at) each metric is
+    memoized on the versions of the inputs it reads; without, every call
+    recomputes. Given an executor, a metric listed in BACKGROUND_JOBS is
+    served stale-while-revalidate: once it has a value, a stale one is
+    returned at once while a fresh one is computed on the executor.
+    """
+
     def __init__(self, board: Board, meeple_mgr: MeepleManager,
-                 players: dict, history: list, deck_remaining: int):
+                 players: dict, history: list, deck_remaining: int,
+                 versions: Optional[Dict[str, int]] = None,
+                 executor: Optional[Executor] = None):
         self.board = board
         self.meeples = meeple_mgr
         self.players = players
         self.history = history
         self.deck_remaining = deck_remaining
+        self.versions = versions
+        self.executor = executor
+        self._cache: Dict[str, Tuple[tuple, dict]] = {}
+        self._refreshing: Dict[str, Tuple[tuple, Future]] = {}
+        self._lock = threading.Lock()
 
     def compute_all(self) -> dict:
-        return {
-            "heatmap": self.heatmap_completion(),
-            "luck_curve": self.luck_curve(),
-            "entropy": self.field_entropy(),
-            "greed_index": self.greed_index(),
-            "conflict_risk": self.conflict_risk(),
-            "aggression_index": self.aggression_index(),
-            "voronoi_control": self.voronoi_control(),
-            "nash_distance": self.nash_distance(),
-            "parasitism": self.parasitism(),
-            "depth_score": self.depth_score(),
-        }
+        return {name: self.metric(name) for name in METRICS}
+
+    def metric(self, name: str) -> dict:
+        """One metric by its METRICS name; KeyError for an unknown one."""
+        method, inputs = METRICS[name]
+        if self.versions is None:
+            return getattr(self, method)()
+
+        key = tuple(self.versions.get(i, 0) for i in inputs)
+        with self._lock:
+            cached = self._cache.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        if cached is not None and self.executor is not None and name in BACKGROUND_JOBS:
+            self._refresh(name, key)
+            return cached[1]
+
+        value = getattr(self, method)()
+        self._store(name, key, value)
+        return value
+
+    def is_fresh(self, name: str) -> bool:
+        """Whether metric() would return a value computed for the current state."""
+        if self.versions is None:
+            return False
+        key = tuple(self.versions.get(i, 0) for i in METRICS[name][1])
+        cached = self._cache.get(name)
+        return cached is not None and cached[0] == key
+
+    def refreshing(self, name: str) -> Optional[Future]:
+        """The background recomputation of name still running, if any."""
+        entry = self._refreshing.get(name)
+        return entry[1] if entry is not None and not entry[1].done() else None
+
+    def _refresh(self, name: str, key: tuple):
+        with self._lock:
+            running = self._refreshing.get(name)
+            if running is not None and not running[1].done():
+                return  # the first request after it lands refreshes again if need be
+            job = getattr(self, BACKGROUND_JOBS[name])()
+            self._refreshing[name] = (key, self.executor.submit(self._run_refresh, name, key, job))
+
+    def _run_refresh(self, name: str, key: tuple, job: Callable[[], dict]) -> dict:
+        # stored before the future resolves; on error the stale value stays
+        # and the next request retries
+        value = job()
+        self._store(name, key, value)
+        return value
+
+    def _store(self, name: str, key: tuple, value: dict):
+        with self._lock:
+            cached = self._cache.get(name)
+            # versions only grow, so never let a slow job overwrite a newer value
+            if cached is None or cached[0] <= key:
+                self._cache[name] = (key, value)
 
     # ── Metric 1: Heatmap Completion (Monte Carlo) ──
 
-    def heatmap_completion(self, n_simulations: int = 200) -> dict:
-        city_features = self.board.get_features(EdgeType.CITY)
-        incomplete_cities = []
-        for f in city_features:
-            if not self.board.is_feature_complete(f, EdgeType.CITY):
-                meeples = self.meeples.get_meeples_on_feature(f)
-                if meeples:
-                    incomplete_cities.append(f)
-
-        if not incomplete_cities:
-            return {"cells": {}, "max_prob": 0}
-
+    def heatmap_completion(self, n_simulations: int = 2000, seed: Optional[int] = None,
+                           workers: int = 1, z: float = 1.96) -> dict:
+        """
+        Per cell, the share of rollouts (8 random draws from the remaining
+        tiles, see rollout.RolloutBoard) that finish a claimed city covering
+        it, with a Wilson interval at z. max_half_width is the widest
+        interval's half width: how far the map as a whole can still move with
+        more simulations.
+        """
+        return self._heatmap_job(n_simulations, seed, workers, z)()
+
+    def _heatmap_job(self, n_simulations: int = 2000, seed: Optional[int] = None,
+                     workers: int = 1, z: float = 1.96) -> Callable[[], dict]:
+        """Snapshot what the heatmap needs; the returned callable does the rollouts."""
+        incomplete_cities = [
+            f for f in self.board.features.features(EdgeType.CITY)
+            if not f.complete and self.meeples.get_meeples_on_feature(f.nodes)
+        ]
+        placed = self.board.type_counts
         remaining_defs = []
         for td in TILE_DEFS:
-            if td.tile_type == "start":
-                continue
-            count = td.count
-            placed_of_type = sum(
-                1 for t in self.board.grid.values() if t.tile_type == td.tile_type
-            )
-            for _ in range(max(0, count - placed_of_type)):
-                remaining_defs.append(td)
+            if td.tile_type != "start":
+                remaining_defs.extend([td] * max(0, td.count - placed.get(td.tile_type, 0)))
 
-        if not remaining_defs:
-            return {"cells": {}, "max_prob": 0}
-
-        open_slots = list(self.board.open_slots)
-        completion_counts = defaultdict(int)
-
-        for _ in range(n_simulations):
-            sim_board = copy.deepcopy(self.board)
-            sim_deck = list(remaining_defs)
-            random.shuffle(sim_deck)
-
-            placed = 0
-            for td in sim_deck[:min(8, len(sim_deck))]:
-                sim_slots = list(sim_board.open_slots)
-                random.shuffle(sim_slots)
-                for coord in sim_slots[:10]:
-                    for rot in [0, 90, 180, 270]:
-                        if sim_board._is_placement_valid(td, coord, rot):
-                            sim_board.place_tile(td, coord, rot)
-                            placed += 1
-                            break
-                    else:
-                        continue
-                    break
-
-            for f_orig in incomplete_cities:
-                sample_node = next(iter(f_orig))
-                new_feature = sim_board.get_feature_containing(sample_node)
-                if new_feature and sim_board.is_feature_complete(new_feature, EdgeType.CITY):
-                    tiles = set((n[0], n[1]) for n in new_feature)
-                    for t in tiles:
-                        key = f"{t[0]},{t[1]}"
-                        completion_counts[key] += 1
-
-        cells = {}
-        max_prob = 0
-        for key, count in completion_counts.items():
-            prob = count / n_simulations
-            cells[key] = round(prob, 3)
-            max_prob = max(max_prob, prob)
-
-        return {"cells": cells, "max_prob": round(max_prob, 3)}
+        if not incomplete_cities or not remaining_defs:
+            return lambda: {"cells": {}, "max_prob": 0}
+        sim = RolloutBoard(self.board, incomplete_cities, depth=min(8, len(remaining_defs)))
+        return partial(_heatmap_from_rollouts, sim, remaining_defs, n_simulations,
+                       seed, workers, z)
 
     # ── Metric 2: Luck Curve ──
 
@@ -160,17 +209,9 @@ class AnalyticsEngine:
         if not open_slots:
             return {"entropy": 0, "max_entropy": 0, "normalized": 0}
 
-        compatibility_counts = []
-        for coord in open_slots:
-            count = 0
-            for td in TILE_DEFS:
-                if td.tile_type == "start":
-                    continue
-                for rot in [0, 90, 180, 270]:
-                    if self.board._is_placement_valid(td, coord, rot):
-                        count += 1
-                        break
-            compatibility_counts.append(count)
+        compatibility_counts = [
+            _compatible_tile_count(self.board.slot_patterns[coord]) for coord in open_slots
+        ]
 
         total = sum(compatibility_counts)
         if total == 0:
@@ -191,6 +232,8 @@ class AnalyticsEngine:
     # ── Metric 4: Greed Index ──
 
     def greed_index(self) -> dict:
+        planes = self.board.planes
+        filled = planes.neighbour_counts()
         result = {}
         for pid, player in self.players.items():
             current_score = player.score
@@ -198,17 +241,13 @@ class AnalyticsEngine:
             potential = 0
             player_meeples = self.meeples.get_player_meeples(pid)
             for m in player_meeples:
-                feature = self.board.get_feature_containing(m.node_id)
+                feature = self.board.live_feature_containing(m.node_id)
                 if feature is None:
                     if m.position == "CENTER":
-                        neighbors = sum(
-                            1 for dx in [-1, 0, 1] for dy in [-1, 0, 1]
-                            if (m.x + dx, m.y + dy) in self.board.grid
-                        )
-                        potential += neighbors
+                        potential += int(filled[planes.index(m.x, m.y)])
                     continue
                 tile_coords = set((n[0], n[1]) for n in feature)
-                edge_type = self.board.feature_graph.nodes[m.node_id].get("edge_type") if m.position != "CENTER" else -1
+                edge_type = self.board.node_edge_type(m.node_id) if m.position != "CENTER" else -1
                 if edge_type == EdgeType.CITY:
                     potential += len(tile_coords) * 2
                 elif edge_type == EdgeType.ROAD:
@@ -228,39 +267,26 @@ class AnalyticsEngine:
     # ── Metric 5: Conflict Risk ──
 
     def conflict_risk(self) -> dict:
-        city_features = self.board.get_features(EdgeType.CITY)
-        incomplete = []
-        for f in city_features:
-            if not self.board.is_feature_complete(f, EdgeType.CITY):
-                incomplete.append(f)
+        claimed = []  # (tiles, owners) of incomplete cities with meeples on them
+        for f in self.board.live_features(EdgeType.CITY):
+            if self.board.is_feature_complete(f, EdgeType.CITY):
+                continue
+            meeples = self.meeples.get_meeples_on_feature(f)
+            if meeples:
+                claimed.append(({(n[0], n[1]) for n in f}, {m.player_id for m in meeples}))
 
+        close = _close_pairs([tiles for tiles, _ in claimed], _CONFLICT_DISTANCE)
         risks = []
-        for i, f1 in enumerate(incomplete):
-            for j, f2 in enumerate(incomplete):
-                if j <= i:
-                    continue
-
-                m1 = self.meeples.get_meeples_on_feature(f1)
-                m2 = self.meeples.get_meeples_on_feature(f2)
-                if not m1 or not m2:
-                    continue
-
-                owners1 = set(m.player_id for m in m1)
-                owners2 = set(m.player_id for m in m2)
-                if owners1 == owners2:
-                    continue
-
-                tiles1 = set((n[0], n[1]) for n in f1)
-                tiles2 = set((n[0], n[1]) for n in f2)
-                min_dist = self._min_feature_distance(tiles1, tiles2)
-
-                if min_dist <= 2:
-                    risks.append({
-                        "feature1_size": len(tiles1),
-                        "feature2_size": len(tiles2),
-                        "distance": min_dist,
-                        "risk": round(1.0 / (min_dist + 1), 3),
-                    })
+        for (i, j), min_dist in sorted(close.items()):
+            (tiles1, owners1), (tiles2, owners2) = claimed[i], claimed[j]
+            if owners1 == owners2:
+                continue
+            risks.append({
+                "feature1_size": len(tiles1),
+                "feature2_size": len(tiles2),
+                "distance": min_dist,
+                "risk": round(1.0 / (min_dist + 1), 3),
+            })
 
         total_risk = sum(r["risk"] for r in risks)
         return {
@@ -269,14 +295,6 @@ class AnalyticsEngine:
             "count": len(risks),
         }
 
-    def _min_feature_distance(self, tiles1: set, tiles2: set) -> int:
-        min_d = 999
-        for t1 in tiles1:
-            for t2 in tiles2:
-                d = abs(t1[0] - t2[0]) + abs(t1[1] - t2[1])
-                min_d = min(min_d, d)
-        return min_d
-
     # ── Metric 6: Aggression Index ──
 
     def aggression_index(self) -> dict:
@@ -293,24 +311,19 @@ class AnalyticsEngine:
                 if (x, y) not in self.board.grid:
                     continue
                 tile = self.board.grid[(x, y)]
-                edges = tile.get_rotated_edges()
+                edges = tile.rotated_edges
 
                 for i, side in enumerate(SIDE_NAMES):
                     if edges[i] != EdgeType.CITY:
                         continue
-                    feature = self.board.get_feature_containing((x, y, side))
+                    feature = self.board.live_feature_containing((x, y, side))
                     if feature is None:
                         continue
                     on_feat = self.meeples.get_meeples_on_feature(feature)
                     opp_meeples = [m for m in on_feat if m.player_id != pid]
                     if opp_meeples:
                         if not self.board.is_feature_complete(feature, EdgeType.CITY):
-                            open_edges = sum(
-                                1 for n in feature
-                                if (n[0] + NEIGHBOR_OFFSET[n[2]][0],
-                                    n[1] + NEIGHBOR_OFFSET[n[2]][1],
-                                    OPPOSITE[n[2]]) not in feature
-                            )
+                            open_edges = self.board.get_feature((x, y, side)).open_edges
                             if open_edges >= len(feature) * 0.6:
                                 aggressive += 1
 
@@ -337,19 +350,13 @@ class AnalyticsEngine:
         control = defaultdict(int)
         total = len(open_slots)
 
-        for slot in open_slots:
-            sx, sy = slot
-            min_dist = 999
-            closest_pid = None
-
-            for m in all_meeples:
-                d = abs(sx - m.x) + abs(sy - m.y)
-                if d < min_dist:
-                    min_dist = d
-                    closest_pid = m.player_id
-
-            if closest_pid:
-                control[closest_pid] += 1
+        # nearest meeple per slot by Manhattan distance; on a tie the one
+        # placed first wins, so every meeple at that distance is fetched
+        tree = cKDTree(np.array([(m.x, m.y) for m in all_meeples]))
+        slots = np.array(open_slots)
+        nearest, _ = tree.query(slots, p=1)
+        for tied in tree.query_ball_point(slots, nearest, p=1):
+            control[all_meeples[min(tied)].player_id] += 1
 
         result = {}
         for pid in self.players:
@@ -408,10 +415,10 @@ class AnalyticsEngine:
             return 0
 
         tile = self.board.grid[(x, y)]
-        edges = tile.get_rotated_edges()
+        edges = tile.rotated_edges
         for i, side in enumerate(SIDE_NAMES):
             if edges[i] == EdgeType.CITY:
-                feature = self.board.get_feature_containing((x, y, side))
+                feature = self.board.live_feature_containing((x, y, side))
                 if feature:
                     my_m = [m for m in self.meeples.get_meeples_on_feature(feature)
                             if m.player_id == player_id]
@@ -419,7 +426,7 @@ class AnalyticsEngine:
                         tiles = set((n[0], n[1]) for n in feature)
                         score += len(tiles) * 2
             elif edges[i] == EdgeType.ROAD:
-                feature = self.board.get_feature_containing((x, y, side))
+                feature = self.board.live_feature_containing((x, y, side))
                 if feature:
                     my_m = [m for m in self.meeples.get_meeples_on_feature(feature)
                             if m.player_id == player_id]
@@ -452,7 +459,7 @@ class AnalyticsEngine:
             total_features = 0
 
             for m in player_meeples:
-                feature = self.board.get_feature_containing(m.node_id)
+                feature = self.board.live_feature_containing(m.node_id)
                 if feature is None:
                     continue
                 total_features += 1
@@ -496,10 +503,10 @@ class AnalyticsEngine:
                 extends_feature = False
                 if (x, y) in self.board.grid:
                     tile = self.board.grid[(x, y)]
-                    edges = tile.get_rotated_edges()
+                    edges = tile.rotated_edges
                     for si, side in enumerate(SIDE_NAMES):
                         if edges[si] in (EdgeType.CITY, EdgeType.ROAD):
-                            feat = self.board.get_feature_containing((x, y, side))
+                            feat = self.board.live_feature_containing((x, y, side))
                             if feat:
                                 my_m = [m for m in self.meeples.get_meeples_on_feature(feat)
                                          if m.player_id == pid]
@@ -527,6 +534,100 @@ class AnalyticsEngine:
         return result
 
 
+_COMPATIBLE_COUNTS: Dict[Tuple[int, ...], int] = {}
+
+
+def _compatible_tile_count(pattern) -> int:
+    """Number of tile types (start excluded) with at least one rotation fitting pattern."""
+    count = _COMPATIBLE_COUNTS.get(pattern)
+    if count is None:
+        count = sum(
+            1 for td in TILE_DEFS
+            if td.tile_type != "start" and rotation_table(td)[pattern]
+        )
+        _COMPATIBLE_COUNTS[pattern] = count
+    return count
+
+
+_CONFLICT_DISTANCE = 2  # claimed cities at most this far apart are reported
+
+
+def _close_pairs(tile_sets: List[Set[Tuple[int, int]]], limit: int) -> Dict[Tuple[int, int], int]:
+    """
+    (i, j) -> Manhattan distance, i < j, for every two tile sets at most
+    limit apart. A multi-source BFS grows each set by ceil(limit / 2) cells;
+    two sets that close meet at a cell between them, so only cells reached
+    from several sets are compared, never pairs of tiles.
+    """
+    radius = (limit + 1) // 2
+    reached: Dict[Tuple[int, int], Dict[int, int]] = defaultdict(dict)
+    for i, tiles in enumerate(tile_sets):
+        dist = dict.fromkeys(tiles, 0)
+        frontier = list(tiles)
+        for d in range(1, radius + 1):
+            grown = []
+            for x, y in frontier:
+                for dx, dy in NEIGHBOR_OFFSET.values():
+                    cell = (x + dx, y + dy)
+                    if cell not in dist:
+                        dist[cell] = d
+                        grown.append(cell)
+            frontier = grown
+        for cell, d in dist.items():
+            reached[cell][i] = d
+
+    best: Dict[Tuple[int, int], int] = {}
+    for sources in reached.values():
+        if len(sources) < 2:
+            continue
+        found = sorted(sources.items())
+        for a, (i, di) in enumerate(found):
+            for j, dj in found[a + 1:]:
+                d = di + dj
+                if d <= limit and d < best.get((i, j), limit + 1):
+                    best[(i, j)] = d
+    return best
+
+
+def _heatmap_from_rollouts(sim: RolloutBoard, deck: List[TileDef], n_simulations: int,
+                           seed: Optional[int], workers: int, z: float) -> dict:
+    completion_counts = sim.completion_counts(deck, n_simulations, seed, workers)
+
+    cells = {}
+    intervals = {}
+    max_prob = 0
+    max_half_width = 0
+    for (x, y), count in completion_counts.items():
+        key = f"{x},{y}"
+        prob = count / n_simulations
+        lo, hi = wilson_interval(count, n_simulations, z)
+        cells[key] = round(prob, 3)
+        intervals[key] = [round(lo, 3), round(hi, 3)]
+        max_prob = max(max_prob, prob)
+        max_half_width = max(max_half_width, (hi - lo) / 2)
+
+    return {
+        "cells": cells,
+        "max_prob": round(max_prob, 3),
+        "ci": intervals,
+        "n_simulations": n_simulations,
+        "max_half_width": round(max_half_width, 4),
+    }
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def background_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by every game's background metric refreshes."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="analytics")
+        return _EXECUTOR
+
+
 def compute_analytics(board, meeple_mgr, players, history, deck_remaining) -> dict:
     engine = AnalyticsEngine(board, meeple_mgr, players, history, deck_remaining)
     return engine.compute_all()
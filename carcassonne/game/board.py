@@ -1,12 +1,13 @@
-from typing import Dict, Tuple, List, Optional, Set
+from typing import Dict, FrozenSet, Tuple, List, Optional, Set
 import networkx as nx
 from .tile import (
     PlacedTile, TileDef, TILE_DEFS, EdgeType, CenterType,
-    SIDE_NAMES, SIDE_INDEX, OPPOSITE, NEIGHBOR_OFFSET,
-    create_placed_tile,
+    SIDE_NAMES, SIDE_INDEX, OPPOSITE, NEIGHBOR_OFFSET, NO_NEIGHBOR,
+    create_placed_tile, rotation_table,
 )
+from .features import Feature, FeatureIndex
+from .planes import BoardPlanes
 import random
-import copy
 
 
 Coord = Tuple[int, int]
@@ -15,81 +16,89 @@ Coord = Tuple[int, int]
 class Board:
     def __init__(self):
         self.grid: Dict[Coord, PlacedTile] = {}
-        self.feature_graph = nx.Graph()
+        self.type_counts: Dict[str, int] = {}  # tile type -> tiles of it on the board
+        self.features = FeatureIndex()
         self.open_slots: Set[Coord] = set()
+        # open slot -> edge types its neighbours require, N/E/S/W
+        self.slot_patterns: Dict[Coord, Tuple[int, int, int, int]] = {}
+        # NumPy mirror of grid for whole-board spatial queries
+        self.planes = BoardPlanes()
+        # one record per place_tile, popped by undo()
+        self._undo_stack: List[tuple] = []
+        self._undo_floor = 0  # placements that can no longer be undone
         self._place_start_tile()
 
     def _place_start_tile(self):
         start_def = next(d for d in TILE_DEFS if d.tile_type == "start")
         tile = create_placed_tile(start_def, rotation=0, x=0, y=0)
         self.grid[(0, 0)] = tile
-        self._add_to_graph(tile)
+        self.type_counts["start"] = 1
+        self.features.add_tile(tile, self.grid)
+        self.planes.set_tile(0, 0, tile.rotated_edges)
         self._update_open_slots((0, 0))
 
-    def _add_to_graph(self, tile: PlacedTile):
-        x, y = tile.x, tile.y
-        rotated_edges = tile.get_rotated_edges()
-        rotated_conns = tile.get_rotated_connections()
-
-        for i, side in enumerate(SIDE_NAMES):
-            node_id = (x, y, side)
-            self.feature_graph.add_node(node_id, edge_type=rotated_edges[i])
-
-        for a, b in rotated_conns:
-            side_a = SIDE_NAMES[a]
-            side_b = SIDE_NAMES[b]
-            node_a = (x, y, side_a)
-            node_b = (x, y, side_b)
-            self.feature_graph.add_edge(node_a, node_b, kind="internal")
-
-        if tile.center == CenterType.MONASTERY:
-            monastery_node = (x, y, "CENTER")
-            self.feature_graph.add_node(monastery_node, edge_type=-1, is_monastery=True)
-
-        for side in SIDE_NAMES:
-            dx, dy = NEIGHBOR_OFFSET[side]
-            nx_, ny_ = x + dx, y + dy
-            if (nx_, ny_) in self.grid:
-                opp = OPPOSITE[side]
-                node_here = (x, y, side)
-                node_there = (nx_, ny_, opp)
-                self.feature_graph.add_edge(node_here, node_there, kind="external")
-
-    def _update_open_slots(self, coord: Coord):
+    @property
+    def feature_graph(self) -> nx.Graph:
+        """
+        NetworkX view of the tile-side nodes, built on demand for debugging and
+        visualisation. The engine itself works off the FeatureIndex.
+        """
+        graph = nx.Graph()
+        for (x, y), tile in self.grid.items():
+            rotated_edges = tile.rotated_edges
+            for i, side in enumerate(SIDE_NAMES):
+                graph.add_node((x, y, side), edge_type=rotated_edges[i],
+                               feature_id=self.features.feature_of((x, y, side)).id)
+            for a, b in tile.rotated_connections:
+                graph.add_edge((x, y, SIDE_NAMES[a]), (x, y, SIDE_NAMES[b]), kind="internal")
+            if tile.center == CenterType.MONASTERY:
+                graph.add_node((x, y, "CENTER"), edge_type=-1, is_monastery=True)
+        for (x, y) in self.grid:
+            for side in ("E", "S"):
+                dx, dy = NEIGHBOR_OFFSET[side]
+                if (x + dx, y + dy) in self.grid:
+                    graph.add_edge((x, y, side), (x + dx, y + dy, OPPOSITE[side]),
+                                   kind="external")
+        return graph
+
+    def _update_open_slots(self, coord: Coord) -> tuple:
+        """Returns (coord's old pattern or None, {slot: old pattern or None}) for undo."""
         x, y = coord
         self.open_slots.discard(coord)
+        own_pattern = self.slot_patterns.pop(coord, None)
+        previous = {}
         for side in SIDE_NAMES:
             dx, dy = NEIGHBOR_OFFSET[side]
             neighbor = (x + dx, y + dy)
             if neighbor not in self.grid:
+                previous[neighbor] = self.slot_patterns.get(neighbor)
                 self.open_slots.add(neighbor)
+                self.slot_patterns[neighbor] = self._slot_pattern(neighbor)
+        return own_pattern, previous
+
+    def _slot_pattern(self, coord: Coord) -> Tuple[int, int, int, int]:
+        x, y = coord
+        pattern = []
+        for side in SIDE_NAMES:
+            dx, dy = NEIGHBOR_OFFSET[side]
+            neighbor = self.grid.get((x + dx, y + dy))
+            pattern.append(neighbor.get_edge(OPPOSITE[side]) if neighbor else NO_NEIGHBOR)
+        return tuple(pattern)
 
     def get_valid_placements(self, tile_def: TileDef) -> List[Tuple[Coord, int]]:
+        table = rotation_table(tile_def)
+        patterns = self.slot_patterns
         valid = []
         for coord in self.open_slots:
-            for rotation in [0, 90, 180, 270]:
-                if self._is_placement_valid(tile_def, coord, rotation):
-                    valid.append((coord, rotation))
+            for rotation in table[patterns[coord]]:
+                valid.append((coord, rotation))
         return valid
 
     def _is_placement_valid(self, tile_def: TileDef, coord: Coord, rotation: int) -> bool:
-        x, y = coord
-        temp = create_placed_tile(tile_def, rotation, x, y)
-        rotated_edges = temp.get_rotated_edges()
-        has_neighbor = False
-
-        for i, side in enumerate(SIDE_NAMES):
-            dx, dy = NEIGHBOR_OFFSET[side]
-            neighbor_coord = (x + dx, y + dy)
-            if neighbor_coord in self.grid:
-                has_neighbor = True
-                neighbor = self.grid[neighbor_coord]
-                opp = OPPOSITE[side]
-                neighbor_edge = neighbor.get_edge(opp)
-                if rotated_edges[i] != neighbor_edge:
-                    return False
-
-        return has_neighbor
+        pattern = self.slot_patterns.get(coord)
+        if pattern is None:
+            pattern = self._slot_pattern(coord)
+        return rotation in rotation_table(tile_def)[pattern]
 
     def place_tile(self, tile_def: TileDef, coord: Coord, rotation: int) -> Optional[PlacedTile]:
         if coord in self.grid:
@@ -99,26 +108,109 @@ class Board:
 
         tile = create_placed_tile(tile_def, rotation, coord[0], coord[1])
         self.grid[coord] = tile
-        self._add_to_graph(tile)
-        self._update_open_slots(coord)
+        self.type_counts[tile_def.tile_type] = self.type_counts.get(tile_def.tile_type, 0) + 1
+        feature_record = self.features.add_tile(tile, self.grid)
+        self.planes.set_tile(coord[0], coord[1], tile.rotated_edges)
+        own_pattern, previous = self._update_open_slots(coord)
+        self._undo_stack.append((coord, feature_record, own_pattern, previous))
         return tile
 
-    def get_features(self, feature_type: int) -> List[Set[Tuple]]:
-        subgraph_nodes = [
-            n for n in self.feature_graph.nodes
-            if len(n) == 3 and n[2] != "CENTER"
-            and self.feature_graph.nodes[n].get("edge_type") == feature_type
-        ]
-        subgraph = self.feature_graph.subgraph(subgraph_nodes)
-        return [set(c) for c in nx.connected_components(subgraph)]
+    # ── Make / unmake ──
+
+    def undo(self) -> Optional[PlacedTile]:
+        """Take back the most recent place_tile exactly; returns the removed tile."""
+        if not self._undo_stack:
+            return None
+        coord, feature_record, own_pattern, previous = self._undo_stack.pop()
+        tile = self.grid.pop(coord)
+        self.type_counts[tile.tile_type] -= 1
+        self.features.remove_tile(feature_record)
+        self.planes.clear_tile(*coord)
+
+        for slot, pattern in previous.items():
+            if pattern is None:
+                self.open_slots.discard(slot)
+                del self.slot_patterns[slot]
+            else:
+                self.slot_patterns[slot] = pattern
+        if own_pattern is not None:
+            self.open_slots.add(coord)
+            self.slot_patterns[coord] = own_pattern
+        return tile
+
+    def checkpoint(self) -> int:
+        return self._undo_floor + len(self._undo_stack)
+
+    def rollback(self, mark: int):
+        """Undo placements until the board is back at checkpoint mark."""
+        if mark < self._undo_floor:
+            raise ValueError("checkpoint predates a commit or tile rotation and cannot be restored")
+        while self._undo_floor + len(self._undo_stack) > mark:
+            self.undo()
+
+    def commit(self):
+        """Make the placements so far permanent, dropping their undo records."""
+        self._undo_floor += len(self._undo_stack)
+        self._undo_stack.clear()
+
+    def rotate_tile(self, coord: Coord, rotation: int) -> bool:
+        """Turn an already placed tile in place (engineer). Features may split, so re-index."""
+        tile = self.grid.get(coord)
+        if tile is None:
+            return False
+        tile.rotation = rotation
+        self.features.rebuild(self.grid)
+        self.planes.set_tile(coord[0], coord[1], tile.rotated_edges)
+        # undo records point at the features that were just replaced
+        self.commit()
+        x, y = coord
+        for dx, dy in NEIGHBOR_OFFSET.values():
+            if (x + dx, y + dy) in self.slot_patterns:
+                self.slot_patterns[(x + dx, y + dy)] = self._slot_pattern((x + dx, y + dy))
+        return True
+
+    def get_features(self, feature_type: int) -> List[FrozenSet[Tuple]]:
+        return [frozenset(f.nodes) for f in self.features.features(feature_type)]
+
+    def live_features(self, feature_type: int) -> List[Set[Tuple]]:
+        """
+        The index's own node sets, without copying: read-only, and only
+        valid until the next place_tile, undo or rotation.
+        """
+        return [f.nodes for f in self.features.features(feature_type)]
+
+    def get_feature(self, node: Tuple) -> Optional[Feature]:
+        return self.features.feature_of(node)
+
+    def node_edge_type(self, node: Tuple) -> Optional[int]:
+        """Edge type of a tile-side node, -1 for a monastery centre, None if absent."""
+        feature = self.features.feature_of(node)
+        if feature is not None:
+            return feature.edge_type
+        if len(node) == 3 and node[2] == "CENTER":
+            tile = self.grid.get((node[0], node[1]))
+            if tile and tile.center == CenterType.MONASTERY:
+                return -1
+        return None
 
     def is_feature_complete(self, feature_nodes: Set[Tuple], feature_type: int) -> bool:
+        if feature_nodes:
+            feature = self.features.feature_of(next(iter(feature_nodes)))
+            if feature is not None and (feature.nodes is feature_nodes
+                                        or feature.nodes == feature_nodes):
+                return feature.edge_type == feature_type and feature.complete
+        # a stale node set: fall back to walking it
         if feature_type == EdgeType.ROAD:
             return self._is_road_complete(feature_nodes)
         elif feature_type == EdgeType.CITY:
             return self._is_city_complete(feature_nodes)
         return False
 
+    def features_completed_by(self, coord: Coord) -> List[Feature]:
+        """Roads and cities that the tile at coord touches and that are now complete."""
+        return [f for f in self.features.features_at(*coord)
+                if f.edge_type in (EdgeType.ROAD, EdgeType.CITY) and f.complete]
+
     def _is_road_complete(self, nodes: Set[Tuple]) -> bool:
         for node in nodes:
             x, y, side = node
@@ -127,14 +219,12 @@ class Board:
             opp = OPPOSITE[side]
             neighbor_node = (neighbor_coord[0], neighbor_coord[1], opp)
 
-            has_internal = any(
-                (x, y, s) in nodes and self.feature_graph.has_edge(node, (x, y, s))
-                for s in SIDE_NAMES if s != side
-            )
+            tile = self.grid.get((x, y))
+            idx = SIDE_INDEX[side]
+            has_internal = tile is not None and tile.orientation.links[idx] != 0
             has_external = neighbor_node in nodes
 
             if not has_internal and not has_external:
-                tile = self.grid.get((x, y))
                 if tile and tile.center in (CenterType.CROSSROAD,):
                     continue
                 return False
@@ -154,62 +244,56 @@ class Board:
 
         return True
 
+    def tile_dict(self, coord: Tuple[int, int]) -> dict:
+        tile = self.grid[coord]
+        return {
+            "tile_type": tile.tile_type,
+            "edges": tile.get_rotated_edges(),
+            "rotation": tile.rotation,
+            "x": coord[0],
+            "y": coord[1],
+            "center": tile.center,
+            "shield": tile.shield,
+        }
+
     def to_dict(self) -> dict:
-        tiles = {}
-        for (x, y), tile in self.grid.items():
-            tiles[f"{x},{y}"] = {
-                "tile_type": tile.tile_type,
-                "edges": tile.get_rotated_edges(),
-                "rotation": tile.rotation,
-                "x": x,
-                "y": y,
-                "center": tile.center,
-                "shield": tile.shield,
-            }
+        tiles = {f"{x},{y}": self.tile_dict((x, y)) for (x, y) in self.grid}
         return {
             "tiles": tiles,
             "open_slots": [list(s) for s in self.open_slots],
         }
 
-    def get_feature_containing(self, node: Tuple) -> Optional[Set[Tuple]]:
-        if node not in self.feature_graph:
-            return None
-        edge_type = self.feature_graph.nodes[node].get("edge_type")
-        if edge_type is None:
-            return None
-        features = self.get_features(edge_type)
-        for f in features:
-            if node in f:
-                return f
-        return None
+    def get_feature_containing(self, node: Tuple) -> Optional[FrozenSet[Tuple]]:
+        feature = self.features.feature_of(node)
+        return frozenset(feature.nodes) if feature is not None else None
+
+    def live_feature_containing(self, node: Tuple) -> Optional[Set[Tuple]]:
+        """get_feature_containing as a live view, with live_features' caveats."""
+        feature = self.features.feature_of(node)
+        return feature.nodes if feature is not None else None
 
     def get_valid_meeple_positions(self, x: int, y: int, placed_meeple_nodes: set) -> List[dict]:
         tile = self.grid.get((x, y))
         if not tile:
             return []
 
-        rotated_edges = tile.get_rotated_edges()
+        rotated_edges = tile.rotated_edges
         positions = []
         seen_features = set()
 
         for i, side in enumerate(SIDE_NAMES):
-            node = (x, y, side)
-            feature = self.get_feature_containing(node)
-            if feature is None:
-                continue
-
-            feature_key = frozenset(feature)
-            if feature_key in seen_features:
+            feature = self.features.feature_of((x, y, side))
+            if feature is None or feature.id in seen_features:
                 continue
-            seen_features.add(feature_key)
+            seen_features.add(feature.id)
 
-            if feature_key & placed_meeple_nodes:
+            if not feature.nodes.isdisjoint(placed_meeple_nodes):
                 continue
 
             positions.append({
                 "position": side,
                 "feature_type": rotated_edges[i],
-                "feature_size": len(set((n[0], n[1]) for n in feature)),
+                "feature_size": feature.size,
             })
 
         if tile.center == CenterType.MONASTERY:
@@ -1,10 +1,17 @@
 import random
-import copy
 import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
 from typing import List, Optional, Tuple, Dict
 from .board import Board
-from .tile import TileDef, EdgeType, CenterType, SIDE_NAMES, NEIGHBOR_OFFSET, create_placed_tile
+from .tile import (
+    TileDef, TILE_DEFS, EdgeType, CenterType, SIDE_NAMES, NEIGHBOR_OFFSET, OPPOSITE,
+    create_placed_tile,
+)
 from .scoring import MeepleManager, Meeple, ScoringEngine, MEEPLES_PER_PLAYER
+from .odds import TileOdds
 
 
 class BotMove:
@@ -48,24 +55,80 @@ class RandomBot:
 
         meeple_pos = None
         if meeples_available > 0 and random.random() < 0.4:
-            temp_board = self._simulate_place(board, tile_def, x, y, rot)
-            if temp_board:
-                positions = temp_board.get_valid_meeple_positions(x, y, placed_meeple_nodes)
-                if positions:
-                    meeple_pos = random.choice(positions)["position"]
+            positions = self._simulate_place(board, tile_def, x, y, rot, placed_meeple_nodes)
+            if positions:
+                meeple_pos = random.choice(positions)["position"]
 
         return BotMove(idx, x, y, rot, meeple_pos)
 
-    def _simulate_place(self, board, tile_def, x, y, rot):
-        temp = copy.deepcopy(board)
-        result = temp.place_tile(tile_def, (x, y), rot)
-        return temp if result else None
+    def _simulate_place(self, board, tile_def, x, y, rot, placed_meeple_nodes):
+        """Meeple positions the tile would offer, placing it on board and taking it back."""
+        mark = board.checkpoint()
+        if not board.place_tile(tile_def, (x, y), rot):
+            return []
+        try:
+            return board.get_valid_meeple_positions(x, y, placed_meeple_nodes)
+        finally:
+            board.rollback(mark)
+
+
+def remaining_tile_counts(board, hand) -> Dict[str, int]:
+    """
+    Tiles still unseen by a player: TILE_DEFS counts minus what is on the
+    board and in their own hand. The opponents' hands are part of this pool.
+    """
+    counts = {td.tile_type: td.count - board.type_counts.get(td.tile_type, 0)
+              for td in TILE_DEFS if td.tile_type != "start"}
+    for td in hand:
+        if td.tile_type in counts:
+            counts[td.tile_type] -= 1
+    return {t: n for t, n in counts.items() if n > 0}
+
+
+_ZOBRIST_RNG = random.Random(0x5EED)
+_ZOBRIST: Dict[tuple, int] = {}
+
+
+def _zobrist(key: tuple) -> int:
+    """64-bit key per (placement) or (meeple) feature, drawn on first use."""
+    value = _ZOBRIST.get(key)
+    if value is None:
+        value = _ZOBRIST[key] = _ZOBRIST_RNG.getrandbits(64)
+    return value
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+_EXACT, _LOWER, _UPPER = 0, 1, 2
 
 
 class MinimaxBot:
-    def __init__(self, max_depth: int = 2, max_moves_sample: int = 15):
+    """
+    Depth-limited expectiminimax over the bot's hand and the opponent's reply.
+
+    Ply 1 is every move the bot can make (tile in hand x placement x meeple),
+    ranked by the move heuristic; with max_depth=1 that ranking is the answer.
+    Deeper plies alternate a chance node over the opponent's next tile (drawn
+    from the unseen-tile counts, the chance_samples most likely types), the
+    opponent's minimising reply, and the bot's next move from the rest of its
+    hand. Each ply keeps the max_moves_sample best-ordered children.
+
+    Search is iterative deepening under time_budget seconds with alpha-beta
+    at the min/max plies, Star2-style probing at chance nodes, and a
+    transposition table keyed by an incremental Zobrist hash of the
+    placements and meeples made below the root. Moves are played and taken
+    back on the live board (make/unmake), which is restored even on timeout.
+    """
+
+    def __init__(self, max_depth: int = 2, max_moves_sample: int = 15,
+                 time_budget: float = 0.3, chance_samples: int = 4):
         self.max_depth = max_depth
         self.max_moves_sample = max_moves_sample
+        self.time_budget = time_budget
+        self.chance_samples = chance_samples
+        self.last_search: dict = {}
 
     def choose_move(self, game_state) -> Optional[BotMove]:
         board = game_state["board"]
@@ -77,73 +140,100 @@ class MinimaxBot:
         meeple_mgr = game_state["meeple_mgr"]
         scores = game_state["scores"]
 
-        all_moves = []
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+
+        # ply 1: every move, ordered by the move heuristic
+        ranked = []
         for i, tile_def in enumerate(hand):
-            placements = board.get_valid_placements(tile_def)
-            for coord, rot in placements:
-                all_moves.append((i, coord[0], coord[1], rot, tile_def))
+            for coord, rot in board.get_valid_placements(tile_def):
+                x, y = coord
+                meeple_options = self._get_meeple_options(
+                    board, tile_def, x, y, rot, placed_meeple_nodes
+                )
+                options_to_try = [None] + meeple_options if meeples_available > 0 else [None]
+                for mpos in options_to_try:
+                    score = self._evaluate_move(
+                        board, tile_def, x, y, rot, mpos,
+                        player_id, opponent_id, meeple_mgr, scores
+                    )
+                    ranked.append((score, (i, x, y, rot, mpos)))
 
-        if not all_moves:
+        if not ranked:
             return None
 
-        best_move = None
-        best_score = -math.inf
+        ranked.sort(key=lambda r: r[0], reverse=True)
+        best_score, best = ranked[0]
+        depth_done = 1
 
-        sample = all_moves
-        if len(sample) > self.max_moves_sample:
-            sample = random.sample(all_moves, self.max_moves_sample)
+        if self.max_depth > 1 and time.perf_counter() < deadline:
+            search = _Search(self, board, meeple_mgr, hand, player_id, opponent_id, deadline)
+            candidates = ranked[:self.max_moves_sample]
+            for depth in range(2, self.max_depth + 1):
+                try:
+                    value, move = search.root(candidates, depth)
+                except _SearchTimeout:
+                    break
+                best_score, best, depth_done = value, move[1], depth
+                # principal variation first for the next iteration
+                candidates.remove(move)
+                candidates.insert(0, move)
 
-        for idx, x, y, rot, tile_def in sample:
-            meeple_options = self._get_meeple_options(
-                board, tile_def, x, y, rot, placed_meeple_nodes
-            )
-            options_to_try = [None] + meeple_options if meeples_available > 0 else [None]
+            self.last_search = {
+                "depth": depth_done,
+                "nodes": search.nodes,
+                "tt_hits": search.tt_hits,
+                "seconds": round(time.perf_counter() - started, 4),
+            }
+        else:
+            self.last_search = {"depth": 1, "nodes": len(ranked), "tt_hits": 0,
+                                "seconds": round(time.perf_counter() - started, 4)}
 
-            for mpos in options_to_try:
-                score = self._evaluate_move(
-                    board, tile_def, x, y, rot, mpos,
-                    player_id, opponent_id, meeple_mgr, scores
-                )
-                if score > best_score:
-                    best_score = score
-                    best_move = BotMove(idx, x, y, rot, mpos, score)
-
-        return best_move
+        idx, x, y, rot, mpos = best
+        return BotMove(idx, x, y, rot, mpos, best_score)
 
     def _get_meeple_options(self, board, tile_def, x, y, rot, placed_nodes):
-        temp = copy.deepcopy(board)
-        result = temp.place_tile(tile_def, (x, y), rot)
-        if not result:
+        mark = board.checkpoint()
+        if not board.place_tile(tile_def, (x, y), rot):
             return []
-        positions = temp.get_valid_meeple_positions(x, y, placed_nodes)
+        try:
+            positions = board.get_valid_meeple_positions(x, y, placed_nodes)
+        finally:
+            board.rollback(mark)
         return [p["position"] for p in positions]
 
     def _evaluate_move(self, board, tile_def, x, y, rot, meeple_pos,
                        player_id, opponent_id, meeple_mgr, scores):
-        temp_board = copy.deepcopy(board)
-        temp_meeples = copy.deepcopy(meeple_mgr)
+        # make the move on the live board and meeples, then unmake it
+        scoring = ScoringEngine(board, meeple_mgr)
+        board_mark = board.checkpoint()
+        scoring_mark = scoring.checkpoint()
 
-        result = temp_board.place_tile(tile_def, (x, y), rot)
-        if not result:
+        if not board.place_tile(tile_def, (x, y), rot):
             return -math.inf
+        try:
+            return self._score_placed_move(
+                board, meeple_mgr, scoring, x, y, meeple_pos, player_id, opponent_id
+            )
+        finally:
+            scoring.rollback(scoring_mark)
+            board.rollback(board_mark)
 
+    def _score_placed_move(self, board, meeples, scoring, x, y, meeple_pos,
+                           player_id, opponent_id):
         if meeple_pos:
-            m = Meeple(player_id, x, y, meeple_pos)
-            temp_meeples.place(m)
+            meeples.place(Meeple(player_id, x, y, meeple_pos))
 
-        temp_scoring = ScoringEngine(temp_board, temp_meeples)
-        events = temp_scoring.check_and_score_completed(0)
+        events = scoring.check_and_score_completed(0, [(x, y)])
 
         my_immediate = sum(e.points for e in events if e.player_id == player_id)
         opp_immediate = sum(e.points for e in events if e.player_id == opponent_id)
 
-        potential = self._evaluate_potential(
-            temp_board, temp_meeples, player_id, opponent_id
-        )
+        potential = self._evaluate_potential(board, meeples, player_id, opponent_id)
 
-        city_bonus = self._city_control_bonus(temp_board, temp_meeples, player_id, x, y)
-        aggression = self._aggression_score(temp_board, temp_meeples, opponent_id, x, y)
-        position_value = self._position_value(temp_board, x, y)
+        city_bonus = self._city_control_bonus(board, meeples, player_id, x, y)
+        aggression = self._aggression_score(board, meeples, opponent_id, x, y)
+        position_value = self._position_value(board, x, y)
 
         score = (
             my_immediate * 3.0
@@ -155,7 +245,7 @@ class MinimaxBot:
         )
 
         if meeple_pos:
-            meeples_left = temp_meeples.available(player_id)
+            meeples_left = meeples.available(player_id)
             if meeples_left <= 1:
                 score -= 3.0
             elif meeples_left <= 2:
@@ -167,7 +257,7 @@ class MinimaxBot:
         score = 0.0
 
         for feat_type in [EdgeType.ROAD, EdgeType.CITY]:
-            features = board.get_features(feat_type)
+            features = board.live_features(feat_type)
             for feature in features:
                 on_feature = meeples.get_meeples_on_feature(feature)
                 if not on_feature:
@@ -190,26 +280,19 @@ class MinimaxBot:
 
     def _feature_completeness(self, board, feature, feat_type):
         if feat_type == EdgeType.CITY:
-            total_edges = len(feature)
-            open_edges = 0
-            for node in feature:
-                x, y, side = node
-                dx, dy = NEIGHBOR_OFFSET[side]
-                opp_node = (x + dx, y + dy, {"N": "S", "E": "W", "S": "N", "W": "E"}[side])
-                if opp_node not in feature:
-                    open_edges += 1
-            if total_edges == 0:
+            if not feature:
                 return 0.0
-            return 1.0 - (open_edges / total_edges)
+            indexed = board.get_feature(next(iter(feature)))
+            return 1.0 - (indexed.open_edges / len(indexed.nodes))
         return 0.5
 
     def _city_control_bonus(self, board, meeples, player_id, x, y):
         bonus = 0.0
         for side in SIDE_NAMES:
-            feature = board.get_feature_containing((x, y, side))
+            feature = board.live_feature_containing((x, y, side))
             if feature is None:
                 continue
-            edge_type = board.feature_graph.nodes[(x, y, side)].get("edge_type")
+            edge_type = board.node_edge_type((x, y, side))
             if edge_type != EdgeType.CITY:
                 continue
 
@@ -226,13 +309,13 @@ class MinimaxBot:
     def _aggression_score(self, board, meeples, opponent_id, x, y):
         score = 0.0
         for side in SIDE_NAMES:
-            feature = board.get_feature_containing((x, y, side))
+            feature = board.live_feature_containing((x, y, side))
             if feature is None:
                 continue
             on_feat = meeples.get_meeples_on_feature(feature)
             opp_meeples = [m for m in on_feat if m.player_id == opponent_id]
             if opp_meeples:
-                edge_type = board.feature_graph.nodes[(x, y, side)].get("edge_type")
+                edge_type = board.node_edge_type((x, y, side))
                 if edge_type == EdgeType.CITY:
                     completeness = self._feature_completeness(board, feature, edge_type)
                     if completeness < 0.5:
@@ -248,7 +331,800 @@ class MinimaxBot:
         return neighbor_count * 0.5
 
 
+class _Search:
+    """State for one MinimaxBot.choose_move search below ply 1."""
+
+    def __init__(self, bot: MinimaxBot, board, meeples, hand, player_id, opponent_id, deadline):
+        self.bot = bot
+        self.board = board
+        self.meeples = meeples
+        self.scoring = ScoringEngine(board, meeples)
+        self.hand = list(hand)
+        self.me = player_id
+        self.opp = opponent_id
+        self.deadline = deadline
+        self.defs = {td.tile_type: td for td in TILE_DEFS}
+        self.tt: Dict[tuple, tuple] = {}
+        self.tt_best: Dict[tuple, tuple] = {}
+        self.nodes = 0
+        self.tt_hits = 0
+        # running search state, changed by _make and restored by _unmake
+        self.hash = 0
+        self.my_pts = 0
+        self.opp_pts = 0
+        self.used = set()  # hand indices already played on this line
+        self.unseen = remaining_tile_counts(board, hand)
+
+    # ── Make / unmake ──
+
+    def _make(self, tile_def, x, y, rot, mpos, player_id):
+        """Play a move; returns the undo token, or None if it was illegal."""
+        board_mark = self.board.checkpoint()
+        scoring_mark = self.scoring.checkpoint()
+        if not self.board.place_tile(tile_def, (x, y), rot):
+            return None
+        if mpos and not self.meeples.place(Meeple(player_id, x, y, mpos)):
+            mpos = None
+        gained_me = gained_opp = 0
+        for e in self.scoring.check_and_score_completed(0, [(x, y)]):
+            if e.player_id == self.me:
+                gained_me += e.points
+            elif e.player_id == self.opp:
+                gained_opp += e.points
+        delta = _zobrist(("tile", x, y, tile_def.tile_type, rot))
+        if mpos:
+            delta ^= _zobrist(("meeple", x, y, mpos, player_id == self.me))
+        self.hash ^= delta
+        self.my_pts += gained_me
+        self.opp_pts += gained_opp
+        return board_mark, scoring_mark, delta, gained_me, gained_opp
+
+    def _unmake(self, token):
+        board_mark, scoring_mark, delta, gained_me, gained_opp = token
+        self.hash ^= delta
+        self.my_pts -= gained_me
+        self.opp_pts -= gained_opp
+        self.scoring.rollback(scoring_mark)
+        self.board.rollback(board_mark)
+
+    # ── Evaluation and ordering ──
+
+    def _evaluate(self) -> float:
+        """Zero-sum leaf value: points and feature potential, mine minus the opponent's."""
+        score = (
+            (self.my_pts - self.opp_pts) * 3.0
+            + self.bot._evaluate_potential(self.board, self.meeples, self.me, self.opp)
+            - self.bot._evaluate_potential(self.board, self.meeples, self.opp, self.me)
+        )
+        meeples_left = self.meeples.available(self.me)
+        if meeples_left <= 1:
+            score -= 3.0
+        elif meeples_left <= 2:
+            score -= 1.0
+        return score
+
+    def _placement_key(self, x, y) -> float:
+        """Cheap ordering key: neighbours plus the size of claimed features it touches."""
+        key = 0.0
+        for side in SIDE_NAMES:
+            dx, dy = NEIGHBOR_OFFSET[side]
+            feature = self.board.get_feature((x + dx, y + dy, OPPOSITE[side]))
+            if feature is None:
+                continue
+            key += 0.5
+            if feature.edge_type != EdgeType.FIELD and \
+                    self.meeples.get_meeples_on_feature(feature.nodes):
+                key += feature.size
+        return key
+
+    def _children(self, tiles, player_id):
+        """Best-ordered (tile idx, x, y, rot) candidates, without meeples yet."""
+        placements = []
+        for idx, tile_def in tiles:
+            for (x, y), rot in self.board.get_valid_placements(tile_def):
+                placements.append((self._placement_key(x, y), idx, tile_def, x, y, rot))
+        placements.sort(key=lambda p: p[0], reverse=True)
+        return [p[1:] for p in placements[:self.bot.max_moves_sample]]
+
+    def _meeple_options(self, x, y, player_id):
+        if self.meeples.available(player_id) <= 0:
+            return [None]
+        return [None] + [p["position"] for p in
+                         self.board.get_valid_meeple_positions(x, y, self.meeples.node_ids)]
+
+    def _tick(self):
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.perf_counter() > self.deadline:
+            raise _SearchTimeout()
+
+    def _tt_probe(self, key, alpha, beta):
+        entry = self.tt.get(key)
+        if entry is None:
+            return None
+        value, flag = entry
+        if flag == _EXACT or (flag == _LOWER and value >= beta) or \
+                (flag == _UPPER and value <= alpha):
+            self.tt_hits += 1
+            return value
+        return None
+
+    def _tt_store(self, key, value, alpha, beta, best):
+        if value <= alpha:
+            flag = _UPPER
+        elif value >= beta:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        self.tt[key] = (value, flag)
+        if best is not None:
+            self.tt_best[key[:2]] = best
+
+    def _order_by_tt(self, children, kind):
+        best = self.tt_best.get((self.hash, kind))
+        if best in children:
+            children.remove(best)
+            children.insert(0, best)
+        return children
+
+    # ── Search ──
+
+    def root(self, candidates, depth):
+        """
+        candidates are (heuristic, move) pairs. A move is worth its heuristic
+        plus how much the best replies below it change the evaluation, so the
+        search corrects the ply-1 ranking instead of replacing it.
+        """
+        alpha = -math.inf
+        best = candidates[0]
+        for candidate in candidates:
+            self._tick()
+            heuristic, (idx, x, y, rot, mpos) = candidate
+            token = self._make(self.hand[idx], x, y, rot, mpos, self.me)
+            if token is None:
+                continue
+            self.used.add(idx)
+            try:
+                base = self._evaluate()
+                value = heuristic - base + self._chance(depth - 1, alpha - heuristic + base)
+            finally:
+                self.used.discard(idx)
+                self._unmake(token)
+            if value > alpha:
+                alpha, best = value, candidate
+        return alpha, best
+
+    def _chance(self, depth, alpha) -> float:
+        """Expected value over the opponent's next tile. Only fails low (alpha side)."""
+        outcomes = sorted(((t, n) for t, n in self.unseen.items() if n > 0),
+                          key=lambda kv: kv[1], reverse=True)
+        if depth <= 0 or not outcomes:
+            return self._evaluate()
+
+        outcomes = outcomes[:self.bot.chance_samples]
+        norm = sum(n for _, n in outcomes)
+        outcomes = [(self.defs[t], n / norm) for t, n in outcomes]
+
+        # Star2 probe: any one reply bounds its min node from above
+        probes = []
+        for tile_def, p in outcomes:
+            self.unseen[tile_def.tile_type] -= 1
+            try:
+                children = self._order_by_tt(self._children([(0, tile_def)], self.opp),
+                                             ("min", tile_def.tile_type))
+                upper = self._probe(tile_def, children[0], depth) if children \
+                    else self._evaluate()
+            finally:
+                self.unseen[tile_def.tile_type] += 1
+            probes.append((tile_def, p, children, upper))
+
+        expected = 0.0
+        upper_rest = sum(p * u for _, p, _, u in probes)
+        for tile_def, p, children, upper in probes:
+            upper_rest -= p * upper
+            if not children:
+                expected += p * upper
+                continue
+            threshold = (alpha - expected - upper_rest) / p
+            self.unseen[tile_def.tile_type] -= 1
+            try:
+                value = self._min(tile_def, children, depth, threshold, upper)
+            finally:
+                self.unseen[tile_def.tile_type] += 1
+            expected += p * value
+            if value <= threshold:
+                # this move cannot beat alpha whatever the other tiles do
+                return expected + upper_rest
+        return expected
+
+    def _probe(self, tile_def, child, depth) -> float:
+        _, _, x, y, rot = child
+        self._tick()
+        token = self._make(tile_def, x, y, rot, None, self.opp)
+        if token is None:
+            return self._evaluate()
+        try:
+            return self._max(depth - 1, -math.inf, math.inf)
+        finally:
+            self._unmake(token)
+
+    def _min(self, tile_def, children, depth, alpha, beta) -> float:
+        key = (self.hash, ("min", tile_def.tile_type), depth, self.my_pts, self.opp_pts)
+        hit = self._tt_probe(key, alpha, beta)
+        if hit is not None:
+            return hit
+
+        value = math.inf
+        best = None
+        alpha0, beta0 = alpha, beta
+        for child in children:
+            _, _, x, y, rot = child
+            for mpos in self._meeple_options_after(tile_def, x, y, rot, self.opp):
+                self._tick()
+                token = self._make(tile_def, x, y, rot, mpos, self.opp)
+                if token is None:
+                    continue
+                try:
+                    score = self._max(depth - 1, alpha, beta)
+                finally:
+                    self._unmake(token)
+                if score < value:
+                    value, best = score, child
+                beta = min(beta, value)
+                if value <= alpha:
+                    break
+            if value <= alpha:
+                break
+
+        if value == math.inf:
+            value = self._evaluate()
+        self._tt_store(key, value, alpha0, beta0, best)
+        return value
+
+    def _max(self, depth, alpha, beta) -> float:
+        tiles = [(i, td) for i, td in enumerate(self.hand) if i not in self.used]
+        if depth <= 0 or not tiles:
+            return self._evaluate()
+
+        key = (self.hash, "max", depth, self.my_pts, self.opp_pts)
+        hit = self._tt_probe(key, alpha, beta)
+        if hit is not None:
+            return hit
+
+        value = -math.inf
+        best = None
+        alpha0, beta0 = alpha, beta
+        children = self._order_by_tt(self._children(tiles, self.me), "max")
+        for child in children:
+            idx, tile_def, x, y, rot = child
+            for mpos in self._meeple_options_after(tile_def, x, y, rot, self.me):
+                self._tick()
+                token = self._make(tile_def, x, y, rot, mpos, self.me)
+                if token is None:
+                    continue
+                self.used.add(idx)
+                try:
+                    score = self._chance(depth - 1, alpha)
+                finally:
+                    self.used.discard(idx)
+                    self._unmake(token)
+                if score > value:
+                    value, best = score, child
+                alpha = max(alpha, value)
+                if value >= beta:
+                    break
+            if value >= beta:
+                break
+
+        if value == -math.inf:
+            value = self._evaluate()
+        self._tt_store(key, value, alpha0, beta0, best)
+        return value
+
+    def _meeple_options_after(self, tile_def, x, y, rot, player_id):
+        mark = self.board.checkpoint()
+        if not self.board.place_tile(tile_def, (x, y), rot):
+            return []
+        try:
+            return self._meeple_options(x, y, player_id)
+        finally:
+            self.board.rollback(mark)
+
+
+_MCTS_REWARD_SCALE = 10.0  # points of lead that make a rollout worth ~0.73
+
+
+class MCTSBot:
+    """
+    Monte-Carlo tree search (UCT) over (tile in hand, coord, rotation, meeple)
+    moves for the bot and its opponent.
+
+    The opponent's hand and the deck order are hidden, so every iteration
+    samples a determinization: the unseen tiles (remaining_tile_counts) are
+    shuffled into an opponent hand and a deck of deck_remaining tiles. The
+    tree is shared across determinizations; at each node only the moves
+    legal for the sampled hand compete, with UCB taken over the number of
+    iterations in which a child was available (information-set MCTS).
+
+    A placement's meeple options are listed when that placement is first
+    expanded, so a new node costs one get_valid_placements per tile type.
+    Below the tree, rollout_depth random turns are played and the position
+    is scored as if the game ended there. Everything is played and taken
+    back on the board with make/unmake.
+
+    With workers > 0 the search is root-parallel: each worker process grows
+    its own tree on a pickled copy of the board until the same wall-clock
+    deadline, and root visit counts are summed. The most visited move wins.
+    Workers come from one process pool shared by every MCTSBot (at most
+    MCTS_POOL_SIZE of them); the default of none keeps a bot that a web
+    session creates from starting processes.
+    """
+
+    def __init__(self, time_budget: float = 0.5, workers: int = 0,
+                 exploration: float = 0.7, rollout_depth: int = 4,
+                 rollout_meeple_rate: float = 0.3, seed: Optional[int] = None):
+        self.time_budget = time_budget
+        self.workers = max(0, min(workers, MCTS_POOL_SIZE))
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.rollout_meeple_rate = rollout_meeple_rate
+        self.rng = random.Random(seed)
+        self.last_search: dict = {}
+
+    def choose_move(self, game_state) -> Optional[BotMove]:
+        board = game_state["board"]
+        hand = game_state["hand"]
+        meeple_mgr = game_state["meeple_mgr"]
+
+        if not any(board.get_valid_placements(td) for td in hand):
+            return None
+
+        started = time.monotonic()
+        deadline = started + self.time_budget
+        state = {
+            "hand": [td.tile_type for td in hand],
+            "player_id": game_state["player_id"],
+            "opponent_id": game_state["opponent_id"],
+            "scores": dict(game_state.get("scores", {})),
+            "deck_remaining": game_state.get("deck_remaining", 0),
+        }
+        params = (self.exploration, self.rollout_depth, self.rollout_meeple_rate)
+
+        futures = []
+        if self.workers:
+            payload = (board, meeple_mgr, state, params)
+            try:
+                pool = _mcts_pool()
+                futures = [pool.submit(_mcts_worker, payload, self.rng.getrandbits(32), deadline)
+                           for _ in range(self.workers)]
+            except Exception:
+                # no usable process pool here: search in-process only
+                _shutdown_mcts_pool()
+                futures = []
+
+        tree = _MCTSTree(board, meeple_mgr, state, params, random.Random(self.rng.getrandbits(32)))
+        tree.run(deadline)
+        stats = tree.root_stats()
+        iterations = tree.iterations
+
+        if futures:
+            # workers stop at the same deadline; the grace covers unpickling the result
+            done, _ = wait(futures, timeout=max(0.0, deadline - time.monotonic()) + 0.25)
+            for future in done:
+                try:
+                    worker_stats, worker_iterations = future.result()
+                except Exception:
+                    continue
+                iterations += worker_iterations
+                for move, (visits, value) in worker_stats.items():
+                    total = stats.setdefault(move, [0, 0.0])
+                    total[0] += visits
+                    total[1] += value
+            for future in futures:
+                future.cancel()
+
+        elapsed = time.monotonic() - started
+        self.last_search = {
+            "iterations": iterations,
+            "workers": len(futures),
+            "seconds": round(elapsed, 4),
+            "iterations_per_sec": round(iterations / elapsed) if elapsed > 0 else 0,
+        }
+
+        if not stats:
+            return None
+        move, (visits, value) = max(stats.items(), key=lambda kv: (kv[1][0], kv[1][1]))
+        tile_type, x, y, rot, mpos = move
+        idx = next(i for i, td in enumerate(hand) if td.tile_type == tile_type)
+        return BotMove(idx, x, y, rot, mpos, value / visits if visits else 0.0)
+
+
+MCTS_POOL_SIZE = max(1, (os.cpu_count() or 1) - 1)
+_MCTS_POOL: Optional[ProcessPoolExecutor] = None
+_MCTS_POOL_LOCK = threading.Lock()
+
+
+def _mcts_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every MCTSBot, started on first use at its full
+    size and then kept, so no bot's searches are ever cut off by another's.
+    """
+    global _MCTS_POOL
+    with _MCTS_POOL_LOCK:
+        if _MCTS_POOL is None:
+            _MCTS_POOL = ProcessPoolExecutor(max_workers=MCTS_POOL_SIZE)
+        return _MCTS_POOL
+
+
+def _shutdown_mcts_pool():
+    """Drop a pool that turned out unusable (its futures fail regardless)."""
+    global _MCTS_POOL
+    with _MCTS_POOL_LOCK:
+        if _MCTS_POOL is not None:
+            _MCTS_POOL.shutdown(wait=False, cancel_futures=True)
+        _MCTS_POOL = None
+
+
+def _mcts_worker(payload, seed: int, deadline: float):
+    """Root-parallel worker: grow one tree on its own copy of the board."""
+    board, meeples, state, params = payload
+    tree = _MCTSTree(board, meeples, state, params, random.Random(seed))
+    tree.run(deadline)
+    return tree.root_stats(), tree.iterations
+
+
+class _MCTSNode:
+    __slots__ = ("move", "player", "parent", "children", "visits", "value", "avail",
+                 "placements", "meeple_options")
+
+    def __init__(self, move=None, player=None, parent=None):
+        self.move = move        # (tile_type, x, y, rot, meeple position or None)
+        self.player = player    # who made move; value is from their side
+        self.parent = parent
+        self.children: Dict[tuple, "_MCTSNode"] = {}
+        self.visits = 0
+        self.value = 0.0
+        self.avail = 0          # iterations in which move was legal
+        # the board at a node is fixed by its path, so these hold for every determinization
+        self.placements: Dict[str, list] = {}        # tile type -> [(x, y, rot)]
+        self.meeple_options: Dict[tuple, list] = {}  # (tile type, x, y, rot) -> [mpos]
+
+
+class _MCTSTree:
+    """One UCT tree grown on a board by make/unmake, in-process or in a worker."""
+
+    def __init__(self, board, meeples, state, params, rng: random.Random):
+        self.board = board
+        self.meeples = meeples
+        self.scoring = ScoringEngine(board, meeples)
+        self.me = state["player_id"]
+        self.opp = state["opponent_id"]
+        self.hand = list(state["hand"])
+        self.base = {self.me: state["scores"].get(self.me, 0),
+                     self.opp: state["scores"].get(self.opp, 0)}
+        self.exploration, self.rollout_depth, self.rollout_meeple_rate = params
+        self.rng = rng
+        self.defs = {td.tile_type: td for td in TILE_DEFS}
+        self.root = _MCTSNode(player=self.opp)
+        self.iterations = 0
+
+        self.unseen = []
+        counts = remaining_tile_counts(board, [self.defs[t] for t in self.hand])
+        for tile_type, n in counts.items():
+            self.unseen.extend([tile_type] * n)
+        self.deck_size = min(state["deck_remaining"], len(self.unseen))
+        self.opp_hand_size = len(self.unseen) - self.deck_size
+
+    def run(self, deadline: float):
+        while time.monotonic() < deadline:
+            self._iterate()
+
+    def root_stats(self) -> Dict[tuple, list]:
+        return {move: [child.visits, child.value] for move, child in self.root.children.items()}
+
+    def _iterate(self):
+        # determinize the hidden tiles
+        pool = self.unseen[:]
+        self.rng.shuffle(pool)
+        hands = {self.me: list(self.hand), self.opp: pool[:self.opp_hand_size]}
+        deck = pool[self.opp_hand_size:]
+        gained = {self.me: 0, self.opp: 0}
+
+        board_mark = self.board.checkpoint()
+        scoring_mark = self.scoring.checkpoint()
+        try:
+            node, player = self._descend(hands, deck, gained)
+            self._rollout(hands, deck, gained, player)
+            reward = self._reward(gained)
+        finally:
+            self.scoring.rollback(scoring_mark)
+            self.board.rollback(board_mark)
+
+        self.iterations += 1
+        while node is not None:
+            node.visits += 1
+            node.value += reward if node.player == self.me else 1.0 - reward
+            node = node.parent
+
+    def _other(self, player):
+        return self.opp if player == self.me else self.me
+
+    # ── Tree policy ──
+
+    def _descend(self, hands, deck, gained):
+        """Select by UCB down to the first untried move, play it and add its node."""
+        node, player = self.root, self.me
+        while True:
+            actions, unexpanded = self._legal(node, hands[player], player)
+            if not actions and not unexpanded:
+                return node, player
+
+            untried = []
+            for move in actions:
+                child = node.children.get(move)
+                if child is None:
+                    untried.append(move)
+                else:
+                    child.avail += 1
+
+            if unexpanded or untried:
+                pick = self.rng.randrange(len(unexpanded) + len(untried))
+                if pick < len(unexpanded):
+                    move = self._expand_placement(node, unexpanded[pick], hands, deck,
+                                                  gained, player)
+                else:
+                    move = untried[pick - len(unexpanded)]
+                    self._play(move, hands, deck, gained, player)
+                child = node.children[move] = _MCTSNode(move, player, node)
+                child.avail = 1
+                return child, self._other(player)
+
+            best, best_ucb = None, -math.inf
+            for move in actions:
+                child = node.children[move]
+                ucb = child.value / child.visits + \
+                    self.exploration * math.sqrt(math.log(child.avail) / child.visits)
+                if ucb > best_ucb:
+                    best, best_ucb = child, ucb
+            self._play(best.move, hands, deck, gained, player)
+            node, player = best, self._other(player)
+
+    def _legal(self, node, hand, player):
+        """Listed moves legal with this hand, plus placements whose meeples are not listed yet."""
+        actions, unexpanded = [], []
+        for tile_type in set(hand):
+            placements = node.placements.get(tile_type)
+            if placements is None:
+                placements = node.placements[tile_type] = [
+                    (x, y, rot) for (x, y), rot in
+                    self.board.get_valid_placements(self.defs[tile_type])
+                ]
+            for x, y, rot in placements:
+                options = node.meeple_options.get((tile_type, x, y, rot))
+                if options is None:
+                    unexpanded.append((tile_type, x, y, rot))
+                else:
+                    actions.extend((tile_type, x, y, rot, mpos) for mpos in options)
+        return actions, unexpanded
+
+    def _expand_placement(self, node, placement, hands, deck, gained, player):
+        """Play a placement, record its meeple options on node and pick one of them."""
+        tile_type, x, y, rot = placement
+        self._place(tile_type, x, y, rot, hands, deck, player)
+        options = [None]
+        if self.meeples.available(player) > 0:
+            options += [p["position"] for p in
+                        self.board.get_valid_meeple_positions(x, y, self.meeples.node_ids)]
+        node.meeple_options[placement] = options
+        mpos = self.rng.choice(options)
+        if mpos:
+            self.meeples.place(Meeple(player, x, y, mpos))
+        self._score(x, y, gained)
+        return tile_type, x, y, rot, mpos
+
+    # ── Make moves ──
+
+    def _place(self, tile_type, x, y, rot, hands, deck, player):
+        self.board.place_tile(self.defs[tile_type], (x, y), rot)
+        hands[player].remove(tile_type)
+        if deck:
+            hands[player].append(deck.pop())
+
+    def _play(self, move, hands, deck, gained, player):
+        tile_type, x, y, rot, mpos = move
+        self._place(tile_type, x, y, rot, hands, deck, player)
+        if mpos:
+            self.meeples.place(Meeple(player, x, y, mpos))
+        self._score(x, y, gained)
+
+    def _score(self, x, y, gained):
+        for e in self.scoring.check_and_score_completed(0, [(x, y)]):
+            if e.player_id in gained:
+                gained[e.player_id] += e.points
+
+    # ── Rollout ──
+
+    def _rollout(self, hands, deck, gained, player):
+        """rollout_depth random turns: random tile, random placement, sometimes a meeple."""
+        for _ in range(self.rollout_depth):
+            tiles = hands[player][:]
+            if not tiles and not hands[self._other(player)]:
+                break
+            self.rng.shuffle(tiles)
+            for tile_type in tiles:
+                placements = self.board.get_valid_placements(self.defs[tile_type])
+                if not placements:
+                    continue
+                (x, y), rot = self.rng.choice(placements)
+                self._place(tile_type, x, y, rot, hands, deck, player)
+                if self.meeples.available(player) > 0 and \
+                        self.rng.random() < self.rollout_meeple_rate:
+                    positions = self.board.get_valid_meeple_positions(
+                        x, y, self.meeples.node_ids)
+                    if positions:
+                        mpos = self.rng.choice(positions)["position"]
+                        self.meeples.place(Meeple(player, x, y, mpos))
+                self._score(x, y, gained)
+                break
+            player = self._other(player)
+
+    def _reward(self, gained) -> float:
+        """Squashed final-score lead for the bot if the game ended now, in (0, 1)."""
+        final = dict(gained)
+        for e in self.scoring.score_end_game(0):
+            if e.player_id in final:
+                final[e.player_id] += e.points
+        lead = (self.base[self.me] + final[self.me]) - (self.base[self.opp] + final[self.opp])
+        return 1.0 / (1.0 + math.exp(-lead / _MCTS_REWARD_SCALE))
+
+
+class ExpectimaxBot:
+    """
+    Picks the move with the highest expected value over the tiles still to
+    be drawn.
+
+    Every move (tile in hand x placement x meeple) is played on the board and
+    the position is valued feature by feature: each road, city, monastery
+    and field with meeples on it is worth its completed score times the
+    chance it gets completed, plus its end-of-game score otherwise. That
+    chance comes from a TileOdds table over the remaining-tile multiset
+    (TILE_DEFS minus the board and the bot's hand): every empty slot a
+    feature waits on needs a tile matching its edge pattern that closes it,
+    within the bot's next draws (at most horizon). Meeples stuck on features
+    that will not finish cost meeple_value each. Features held by the
+    opponent count against the move.
+
+    The odds table lives on the bot and is brought up to date with
+    TileOdds.sync each turn from the board's per-type tile counts, so only
+    the tiles drawn since the last call are applied and each candidate move
+    costs table lookups, not recounts.
+    """
+
+    def __init__(self, horizon: int = 6, meeple_value: float = 2.0):
+        self.horizon = horizon
+        self.meeple_value = meeple_value
+        self.odds: Optional[TileOdds] = None
+
+    def choose_move(self, game_state) -> Optional[BotMove]:
+        board = game_state["board"]
+        hand = game_state["hand"]
+        player_id = game_state["player_id"]
+        opponent_id = game_state["opponent_id"]
+        meeple_mgr = game_state["meeple_mgr"]
+        deck_remaining = game_state.get("deck_remaining", 0)
+
+        counts = remaining_tile_counts(board, hand)
+        if self.odds is None:
+            self.odds = TileOdds(counts)
+        else:
+            self.odds.sync(counts)
+        # tiles this player will still draw, about half of the deck
+        draws = min(self.horizon, (deck_remaining + 1) // 2)
+
+        scoring = ScoringEngine(board, meeple_mgr)
+        best = None
+        best_value = -math.inf
+        for i, tile_def in enumerate(hand):
+            rest = hand[:i] + hand[i + 1:]
+            for (x, y), rot in board.get_valid_placements(tile_def):
+                board_mark = board.checkpoint()
+                if not board.place_tile(tile_def, (x, y), rot):
+                    continue
+                try:
+                    options = [None]
+                    if meeple_mgr.available(player_id) > 0:
+                        options += [p["position"] for p in board.get_valid_meeple_positions(
+                            x, y, meeple_mgr.node_ids)]
+                    for mpos in options:
+                        value = self._move_value(board, meeple_mgr, scoring, x, y, mpos,
+                                                 player_id, opponent_id, draws, rest)
+                        if value > best_value:
+                            best_value, best = value, (i, x, y, rot, mpos)
+                finally:
+                    board.rollback(board_mark)
+
+        if best is None:
+            return None
+        idx, x, y, rot, mpos = best
+        return BotMove(idx, x, y, rot, mpos, best_value)
+
+    def _move_value(self, board, meeples, scoring, x, y, mpos, player_id, opponent_id,
+                    draws, hand) -> float:
+        mark = scoring.checkpoint()
+        try:
+            if mpos:
+                meeples.place(Meeple(player_id, x, y, mpos))
+            value = 0.0
+            for e in scoring.check_and_score_completed(0, [(x, y)]):
+                if e.player_id == player_id:
+                    value += e.points
+                elif e.player_id == opponent_id:
+                    value -= e.points
+            return value + self._expected_value(board, meeples, player_id, opponent_id,
+                                                draws, hand)
+        finally:
+            scoring.rollback(mark)
+
+    def _expected_value(self, board, meeples, player_id, opponent_id, draws, hand) -> float:
+        """Expected final points of the meeples on the board, the bot's minus the opponent's."""
+        value = 0.0
+        chances: Dict[int, float] = {}
+        seen = set()
+        for m in meeples.placed:
+            sign = 1.0 if m.player_id == player_id else -1.0 if m.player_id == opponent_id else 0.0
+            if m.position == "CENTER":
+                p = self.odds.monastery_probability(board, m.x, m.y, draws)
+                filled = sum(1 for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                             if (m.x + dx, m.y + dy) in board.grid)
+                value += sign * (p * 9 + (1 - p) * filled - self.meeple_value * (1 - p))
+                continue
+
+            feature = board.get_feature(m.node_id)
+            if feature is None or feature.id in seen:
+                continue
+            seen.add(feature.id)
+            on_feature = meeples.get_meeples_on_feature(feature.nodes)
+            mine = sum(1 for o in on_feature if o.player_id == player_id)
+            theirs = sum(1 for o in on_feature if o.player_id == opponent_id)
+
+            if feature.edge_type == EdgeType.FIELD:
+                p = 0.0
+                points = self._field_value(board, feature, draws, hand, chances)
+            else:
+                p = self._chance(board, feature, draws, hand, chances)
+                if feature.edge_type == EdgeType.CITY:
+                    points = p * 2 * (feature.size + feature.shields) + \
+                        (1 - p) * (feature.size + feature.shields)
+                else:
+                    points = feature.size
+
+            if mine >= theirs and mine:
+                value += points
+            if theirs >= mine and theirs:
+                value -= points
+            value -= (mine - theirs) * self.meeple_value * (1 - p)
+        return value
+
+    def _chance(self, board, feature, draws, hand, chances) -> float:
+        p = chances.get(feature.id)
+        if p is None:
+            p = chances[feature.id] = self.odds.completion_probability(board, feature, draws, hand)
+        return p
+
+    def _field_value(self, board, feature, draws, hand, chances) -> float:
+        """3 points per city the field touches, weighted by the chance the city completes."""
+        cities = {}
+        for x, y in feature.tiles:
+            for f in board.features.features_at(x, y):
+                if f.edge_type == EdgeType.CITY:
+                    cities[f.id] = f
+        return 3.0 * sum(self._chance(board, f, draws, hand, chances) for f in cities.values())
+
+
 def create_bot(bot_type: str = "random", **kwargs):
     if bot_type == "minimax":
         return MinimaxBot(**kwargs)
+    if bot_type == "mcts":
+        return MCTSBot(**kwargs)
+    if bot_type == "expectimax":
+        return ExpectimaxBot(**kwargs)
     return RandomBot()
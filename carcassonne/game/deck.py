@@ -4,7 +4,9 @@ from .tile import TileDef, TILE_DEFS
 
 
 class Deck:
-    def __init__(self, shuffle: bool = True):
+    def __init__(self, shuffle: bool = True, rng: Optional[random.Random] = None,
+                 seed: Optional[int] = None):
+        """Shuffled with rng, else a fresh Random(seed) when seed is given, else the global one."""
         self.tiles: List[TileDef] = []
         for td in TILE_DEFS:
             if td.tile_type == "start":
@@ -12,7 +14,9 @@ class Deck:
             for _ in range(td.count):
                 self.tiles.append(td)
         if shuffle:
-            random.shuffle(self.tiles)
+            if rng is None and seed is not None:
+                rng = random.Random(seed)
+            (rng or random).shuffle(self.tiles)
 
     def draw(self) -> Optional[TileDef]:
         if not self.tiles:
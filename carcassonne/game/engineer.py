@@ -3,7 +3,7 @@ from .board import Board
 from .tile import (
     PlacedTile, TileDef, EdgeType, CenterType,
     SIDE_NAMES, SIDE_INDEX, OPPOSITE, NEIGHBOR_OFFSET,
-    create_placed_tile,
+    create_placed_tile, orientation,
 )
 import copy
 import networkx as nx
@@ -40,22 +40,23 @@ class EngineerManager:
 
 def get_valid_engineer_targets(board: Board, meeple_placed: list,
                                player_id: str) -> List[dict]:
+    meeples_by_coord: Dict[Tuple[int, int], list] = {}
+    for m in meeple_placed:
+        meeples_by_coord.setdefault((m.x, m.y), []).append(m)
+
     targets = []
     for (x, y), tile in board.grid.items():
         if x == 0 and y == 0:
             continue
 
-        has_own_meeple = any(m.x == x and m.y == y and m.player_id == player_id
-                            for m in meeple_placed)
-        has_opponent_meeple = any(m.x == x and m.y == y and m.player_id != player_id
-                                 for m in meeple_placed)
-        if has_opponent_meeple:
+        meeples_on_tile = meeples_by_coord.get((x, y), [])
+        if any(m.player_id != player_id for m in meeples_on_tile):
             continue
 
         current_rot = tile.rotation
         new_rot = (current_rot + 90) % 360
 
-        if _is_rotation_legal(board, x, y, tile, new_rot, meeple_placed):
+        if _is_rotation_legal(board, x, y, tile, new_rot, meeples_on_tile):
             targets.append({
                 "x": x, "y": y,
                 "tile_type": tile.tile_type,
@@ -67,17 +68,8 @@ def get_valid_engineer_targets(board: Board, meeple_placed: list,
 
 
 def _is_rotation_legal(board: Board, x: int, y: int, tile: PlacedTile,
-                       new_rotation: int, meeple_placed: list) -> bool:
-    temp_tile = PlacedTile(
-        tile_type=tile.tile_type,
-        edges=list(tile.edges),
-        internal_connections=list(tile.internal_connections),
-        center=tile.center,
-        shield=tile.shield,
-        rotation=new_rotation,
-        x=x, y=y,
-    )
-    new_edges = temp_tile.get_rotated_edges()
+                       new_rotation: int, meeples_on_tile: list) -> bool:
+    new_edges = orientation(tile.tile_def, new_rotation).edges
 
     for i, side in enumerate(SIDE_NAMES):
         dx, dy = NEIGHBOR_OFFSET[side]
@@ -89,9 +81,8 @@ def _is_rotation_legal(board: Board, x: int, y: int, tile: PlacedTile,
             if new_edges[i] != neighbor_edge:
                 return False
 
-    meeples_on_tile = [m for m in meeple_placed if m.x == x and m.y == y]
     if meeples_on_tile:
-        old_edges = tile.get_rotated_edges()
+        old_edges = tile.rotated_edges
         for m in meeples_on_tile:
             if m.position in SIDE_NAMES:
                 si = SIDE_INDEX[m.position]
@@ -107,19 +98,4 @@ def apply_engineer_rotation(board: Board, x: int, y: int) -> bool:
 
     tile = board.grid[(x, y)]
     new_rotation = (tile.rotation + 90) % 360
-
-    for i, side in enumerate(SIDE_NAMES):
-        node = (x, y, side)
-        neighbors_to_remove = list(board.feature_graph.neighbors(node))
-        for nb in neighbors_to_remove:
-            board.feature_graph.remove_edge(node, nb)
-        board.feature_graph.remove_node(node)
-
-    center_node = (x, y, "CENTER")
-    if center_node in board.feature_graph:
-        board.feature_graph.remove_node(center_node)
-
-    tile.rotation = new_rotation
-    board._add_to_graph(tile)
-
-    return True
+    return board.rotate_tile((x, y), new_rotation)
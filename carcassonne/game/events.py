@@ -0,0 +1,64 @@
+import threading
+from collections import deque
+from typing import Deque, List, Optional
+
+
+class EventBus:
+    """
+    Per-game change log for delta states and server push: board, meeple and
+    score changes tagged with the game version they were made at, kept for
+    the last `size` changes, plus the latest published version that waiting
+    readers block on. In-process only — readers are threads of this server.
+    """
+
+    def __init__(self, size: int = 512, version: int = 0):
+        self.changes: Deque[dict] = deque(maxlen=size)
+        self.version = version
+        # newest version whose changes are no longer all kept; a bus started
+        # at a later version (a reloaded game) has none from before it
+        self._floor = version
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def append(self, change: dict):
+        with self._cond:
+            if len(self.changes) == self.changes.maxlen:
+                self._floor = self.changes[0]["version"]
+            self.changes.append(change)
+
+    def close(self):
+        """Retire the bus (its game was unloaded), releasing every waiter."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def publish(self, version: int):
+        """Announce that the game has reached version, waking every waiter."""
+        with self._cond:
+            if version > self.version:
+                self.version = version
+                self._cond.notify_all()
+
+    def since(self, version: int) -> Optional[List[dict]]:
+        """
+        Changes made after version, oldest first, or None when the log no
+        longer reaches back that far.
+        """
+        with self._cond:
+            if version < self._floor:
+                return None
+            newer = []
+            for change in reversed(self.changes):
+                if change["version"] <= version:
+                    break
+                newer.append(change)
+        newer.reverse()
+        return newer
+
+    def wait(self, version: int, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a version newer than version is published or the bus is
+        closed; False on timeout.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self.closed or self.version > version, timeout)
@@ -0,0 +1,221 @@
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .tile import (
+    PlacedTile, EdgeType, SIDE_NAMES, SIDE_INDEX, OPPOSITE, NEIGHBOR_OFFSET,
+)
+
+
+Coord = Tuple[int, int]
+Node = Tuple[int, int, str]
+
+
+class Feature:
+    """
+    One connected road, city or field: the tile-side nodes it is made of plus
+    aggregates that are kept up to date as tiles are added, so callers never
+    have to walk the nodes to size or score it.
+    """
+
+    __slots__ = ("id", "edge_type", "nodes", "tiles", "open_edges", "open_stubs", "shields")
+
+    def __init__(self, feature_id: int, edge_type: int):
+        self.id = feature_id
+        self.edge_type = edge_type
+        self.nodes: Set[Node] = set()
+        self.tiles: Set[Coord] = set()
+        self.open_edges = 0  # sides whose neighbouring slot is still empty
+        self.open_stubs = 0  # open road sides that dead-end on their own tile (see is_stub)
+        self.shields = 0     # tiles in the feature that carry a shield
+
+    @property
+    def size(self) -> int:
+        return len(self.tiles)
+
+    @property
+    def complete(self) -> bool:
+        """
+        A city is complete once no side faces an empty slot. A road only
+        counts as open while one of its stubs does: sides that continue across
+        their tile or end at a crossroad are terminated already.
+        """
+        if self.edge_type == EdgeType.CITY:
+            return self.open_edges == 0
+        if self.edge_type == EdgeType.ROAD:
+            return self.open_stubs == 0
+        return False
+
+    def __repr__(self):
+        return (f"Feature(id={self.id}, type={self.edge_type}, "
+                f"tiles={len(self.tiles)}, open={self.open_edges})")
+
+
+def is_stub(tile: PlacedTile, side_idx: int) -> bool:
+    """Road side with no internal connection on a tile that is not a crossroad."""
+    return bool(tile.orientation.stub_mask >> side_idx & 1)
+
+
+class FeatureIndex:
+    """
+    Disjoint-set index over tile-side nodes. Every node maps straight to its
+    Feature; joining two features relabels the nodes of the smaller one, so a
+    lookup is one dict access and a placement costs O(smaller side) per merge.
+
+    Observers (e.g. a MeepleManager keyed by feature id) are told about every
+    merge, split and rebuild through features_merged(kept, absorbed),
+    features_split(kept, absorbed) and features_rebuilt().
+    """
+
+    def __init__(self):
+        self._by_node: Dict[Node, Feature] = {}
+        self._by_type: Dict[int, Dict[int, Feature]] = {}
+        self._next_id = 0
+        self.observers: list = []
+
+    def __len__(self) -> int:
+        return sum(len(fs) for fs in self._by_type.values())
+
+    def __contains__(self, node) -> bool:
+        return node in self._by_node
+
+    def feature_of(self, node) -> Optional[Feature]:
+        return self._by_node.get(node)
+
+    def features(self, edge_type: int) -> Iterator[Feature]:
+        return iter(self._by_type.get(edge_type, {}).values())
+
+    def features_at(self, x: int, y: int) -> List[Feature]:
+        """Distinct features with a side on tile (x, y), in N/E/S/W order."""
+        found = []
+        for side in SIDE_NAMES:
+            feature = self._by_node.get((x, y, side))
+            if feature is not None and all(f is not feature for f in found):
+                found.append(feature)
+        return found
+
+    def clear(self):
+        self._by_node.clear()
+        self._by_type.clear()
+        self._next_id = 0
+
+    def add_tile(self, tile: PlacedTile, grid: Dict[Coord, PlacedTile]) -> tuple:
+        """
+        Index a tile that has just been put into grid. Returns an undo record
+        for remove_tile: the features created, the neighbouring features whose
+        facing side was closed, and every merge in the order it happened.
+        """
+        x, y = tile.x, tile.y
+        rotated_edges = tile.rotated_edges
+        created: List[Feature] = []
+        closed: List[Tuple[Feature, bool]] = []
+        merges: list = []
+
+        for i, side in enumerate(SIDE_NAMES):
+            feature = self._new_feature(rotated_edges[i])
+            feature.nodes.add((x, y, side))
+            feature.tiles.add((x, y))
+            if tile.shield:
+                feature.shields = 1
+            self._by_node[(x, y, side)] = feature
+            created.append(feature)
+
+            dx, dy = NEIGHBOR_OFFSET[side]
+            neighbor = grid.get((x + dx, y + dy))
+            if neighbor is not None:
+                # the neighbour's facing side stops being open as well
+                opp = OPPOSITE[side]
+                facing = self._by_node[(x + dx, y + dy, opp)]
+                stub = is_stub(neighbor, SIDE_INDEX[opp])
+                facing.open_edges -= 1
+                if stub:
+                    facing.open_stubs -= 1
+                closed.append((facing, stub))
+            else:
+                feature.open_edges = 1
+                if tile.orientation.stub_mask >> i & 1:
+                    feature.open_stubs = 1
+
+        for a, b in tile.rotated_connections:
+            if rotated_edges[a] == rotated_edges[b]:
+                self._union((x, y, SIDE_NAMES[a]), (x, y, SIDE_NAMES[b]), grid, merges)
+
+        for side in SIDE_NAMES:
+            dx, dy = NEIGHBOR_OFFSET[side]
+            there = (x + dx, y + dy, OPPOSITE[side])
+            if there in self._by_node:
+                self._union((x, y, side), there, grid, merges)
+
+        return created, closed, merges
+
+    def remove_tile(self, record: tuple):
+        """Exact inverse of the add_tile call that returned record (most recent first)."""
+        created, closed, merges = record
+
+        for kept, absorbed, added_tiles, added_shields in reversed(merges):
+            kept.nodes -= absorbed.nodes
+            for node in absorbed.nodes:
+                self._by_node[node] = absorbed
+            kept.open_edges -= absorbed.open_edges
+            kept.open_stubs -= absorbed.open_stubs
+            kept.tiles.difference_update(added_tiles)
+            kept.shields -= added_shields
+            self._by_type[absorbed.edge_type][absorbed.id] = absorbed
+            for observer in self.observers:
+                observer.features_split(kept, absorbed)
+
+        for feature, stub in closed:
+            feature.open_edges += 1
+            if stub:
+                feature.open_stubs += 1
+
+        for feature in created:
+            del self._by_type[feature.edge_type][feature.id]
+            for node in feature.nodes:
+                del self._by_node[node]
+        self._next_id -= len(created)
+
+    def rebuild(self, grid: Dict[Coord, PlacedTile]):
+        """Re-index every tile, e.g. after a placed tile was rotated."""
+        observers, self.observers = self.observers, []
+        self.clear()
+        partial: Dict[Coord, PlacedTile] = {}
+        for coord, tile in grid.items():
+            partial[coord] = tile
+            self.add_tile(tile, partial)
+        self.observers = observers
+        for observer in observers:
+            observer.features_rebuilt()
+
+    def _new_feature(self, edge_type: int) -> Feature:
+        feature = Feature(self._next_id, edge_type)
+        self._next_id += 1
+        self._by_type.setdefault(edge_type, {})[feature.id] = feature
+        return feature
+
+    def _union(self, node_a: Node, node_b: Node, grid: Dict[Coord, PlacedTile], merges: list):
+        fa = self._by_node[node_a]
+        fb = self._by_node[node_b]
+        if fa is fb:
+            return
+        if len(fa.nodes) < len(fb.nodes):
+            fa, fb = fb, fa
+
+        for node in fb.nodes:
+            self._by_node[node] = fa
+        fa.nodes |= fb.nodes
+        fa.open_edges += fb.open_edges
+        fa.open_stubs += fb.open_stubs
+        added_tiles = []
+        added_shields = 0
+        for coord in fb.tiles:
+            if coord not in fa.tiles:
+                fa.tiles.add(coord)
+                added_tiles.append(coord)
+                if grid[coord].shield:
+                    added_shields += 1
+        fa.shields += added_shields
+
+        # fb is left untouched so remove_tile can split it back out
+        del self._by_type[fb.edge_type][fb.id]
+        merges.append((fa, fb, added_tiles, added_shields))
+        for observer in self.observers:
+            observer.features_merged(fa, fb)
@@ -43,9 +43,10 @@ class ObjectiveManager:
         self.player_objectives: Dict[str, List[Objective]] = {}
         self.completed: Dict[str, List[str]] = {}  # player_id -> [obj_id]
 
-    def deal_objectives(self, player_ids: List[str], count: int = 2):
+    def deal_objectives(self, player_ids: List[str], count: int = 2,
+                        rng: Optional[random.Random] = None):
         available = list(OBJECTIVES)
-        random.shuffle(available)
+        (rng or random).shuffle(available)
         for pid in player_ids:
             self.player_objectives[pid] = available[:count]
             available = available[count:]
@@ -113,7 +114,7 @@ class ObjectiveChecker:
 
     def check_longest_road(self) -> bool:
         from .tile import EdgeType
-        road_features = self.board.get_features(EdgeType.ROAD)
+        road_features = self.board.live_features(EdgeType.ROAD)
         max_len = 0
         for f in road_features:
             if self.board.is_feature_complete(f, EdgeType.ROAD):
@@ -126,7 +127,7 @@ class ObjectiveChecker:
 
     def check_largest_city(self) -> bool:
         from .tile import EdgeType
-        city_features = self.board.get_features(EdgeType.CITY)
+        city_features = self.board.live_features(EdgeType.CITY)
         max_size = 0
         for f in city_features:
             if self.board.is_feature_complete(f, EdgeType.CITY):
@@ -150,12 +151,12 @@ class ObjectiveChecker:
         my_field_meeples = [
             m for m in self.meeples.get_player_meeples(self.pid)
             if m.position in ("N", "E", "S", "W")
-            and self.board.feature_graph.nodes.get(m.node_id, {}).get("edge_type") == EdgeType.FIELD
+            and self.board.node_edge_type(m.node_id) == EdgeType.FIELD
         ]
         if not my_field_meeples:
             return False
         completed_cities = []
-        for f in self.board.get_features(EdgeType.CITY):
+        for f in self.board.live_features(EdgeType.CITY):
             if self.board.is_feature_complete(f, EdgeType.CITY):
                 completed_cities.append(set((n[0], n[1]) for n in f))
 
@@ -228,11 +229,11 @@ class ObjectiveChecker:
             for side in SIDE_NAMES:
                 dx, dy = NEIGHBOR_OFFSET[side]
                 nx, ny = x + dx, y + dy
-                opp_at = [m for m in self.meeples.placed
-                          if m.x == nx and m.y == ny and m.player_id != self.pid]
+                opp_at = [m for m in self.meeples.get_meeples_at(nx, ny)
+                          if m.player_id != self.pid]
                 if opp_at:
-                    my_at = [m for m in self.meeples.placed
-                             if m.x == x and m.y == y and m.player_id == self.pid]
+                    my_at = [m for m in self.meeples.get_meeples_at(x, y)
+                             if m.player_id == self.pid]
                     if not my_at:
                         block_count += 1
                         break
@@ -0,0 +1,160 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .tile import (
+    TileDef, TILE_DEFS, EdgeType, SIDE_INDEX, OPPOSITE, NEIGHBOR_OFFSET, NO_NEIGHBOR,
+    Pattern, orientation, rotation_table,
+)
+from .features import Feature, is_stub
+
+
+# (slot pattern, sides of the slot facing the feature as a bitmask, edge type);
+# edge type None asks for any tile that fits the slot at all
+CloseKey = Tuple[Pattern, int, Optional[int]]
+
+_DEFS: Dict[str, TileDef] = {td.tile_type: td for td in TILE_DEFS if td.tile_type != "start"}
+_CLOSERS: Dict[CloseKey, Tuple[str, ...]] = {}
+
+
+def closer_types(key: CloseKey) -> Tuple[str, ...]:
+    """
+    Tile types that can go in a slot with the given pattern without leaving
+    the feature it touches open on another side. Depends only on TILE_DEFS,
+    so it is computed once per key.
+    """
+    types = _CLOSERS.get(key)
+    if types is None:
+        types = _CLOSERS[key] = tuple(
+            t for t, td in _DEFS.items()
+            if any(_closes(td, rot, key) for rot in rotation_table(td)[key[0]])
+        )
+    return types
+
+
+def _closes(td: TileDef, rotation: int, key: CloseKey) -> bool:
+    pattern, entry_mask, edge_type = key
+    if edge_type != EdgeType.CITY:
+        # any fitting tile closes a road stub: the side it turns into is joined
+        # to the stub's tile and its other road sides continue across the tile
+        # (see features.is_stub), so no new stub opens
+        return True
+
+    turned = orientation(td, rotation)
+    city = turned.type_masks[EdgeType.CITY]
+    reached = entry_mask
+    frontier = entry_mask
+    while frontier:
+        side = (frontier & -frontier).bit_length() - 1
+        frontier &= frontier - 1
+        new = turned.links[side] & city & ~reached
+        reached |= new
+        frontier |= new
+    return all(pattern[i] != NO_NEIGHBOR for i in range(4) if reached >> i & 1)
+
+
+class TileOdds:
+    """
+    Draw odds over the multiset of tiles still to come.
+
+    For every (pattern, entry sides, edge type) key that has been asked
+    about, it keeps how many remaining tiles would close it. Those counts
+    are decremented when a tile is drawn (draw or sync), so the per-draw
+    probability of closing a slot is a dict lookup and a division, whatever
+    the number of candidate moves being compared.
+    """
+
+    def __init__(self, counts: Dict[str, int]):
+        self.reset(counts)
+
+    def reset(self, counts: Dict[str, int]):
+        self.counts: Dict[str, int] = {t: n for t, n in counts.items() if n > 0}
+        self.total = sum(self.counts.values())
+        self._closers: Dict[CloseKey, int] = {}
+        self._keys_by_type: Dict[str, List[CloseKey]] = {}
+
+    def draw(self, tile_type: str, n: int = 1):
+        """Take n tiles of tile_type out of the remaining multiset."""
+        n = min(n, self.counts.get(tile_type, 0))
+        if n <= 0:
+            return
+        self.counts[tile_type] -= n
+        self.total -= n
+        for key in self._keys_by_type.get(tile_type, ()):
+            self._closers[key] -= n
+
+    def sync(self, counts: Dict[str, int]):
+        """Catch up with freshly counted remaining tiles; rebuilds if any count went up."""
+        if any(n > self.counts.get(t, 0) for t, n in counts.items()):
+            self.reset(counts)
+            return
+        for tile_type, n in list(self.counts.items()):
+            self.draw(tile_type, n - counts.get(tile_type, 0))
+
+    def closers(self, key: CloseKey) -> int:
+        count = self._closers.get(key)
+        if count is None:
+            types = closer_types(key)
+            count = self._closers[key] = sum(self.counts.get(t, 0) for t in types)
+            for t in types:
+                self._keys_by_type.setdefault(t, []).append(key)
+        return count
+
+    def close_chance(self, key: CloseKey) -> float:
+        """Probability that one draw closes key."""
+        if self.total <= 0:
+            return 0.0
+        return self.closers(key) / self.total
+
+    # ── Feature odds ──
+
+    def open_slots(self, board, feature: Feature) -> Dict[Tuple[int, int], int]:
+        """Empty slots a feature is still waiting on -> sides of the slot facing it."""
+        slots: Dict[Tuple[int, int], int] = {}
+        city = feature.edge_type == EdgeType.CITY
+        for x, y, side in feature.nodes:
+            dx, dy = NEIGHBOR_OFFSET[side]
+            coord = (x + dx, y + dy)
+            if coord in board.grid:
+                continue
+            if not city and not is_stub(board.grid[(x, y)], SIDE_INDEX[side]):
+                continue
+            slots[coord] = slots.get(coord, 0) | 1 << SIDE_INDEX[OPPOSITE[side]]
+        return slots
+
+    def completion_probability(self, board, feature: Feature, draws: int,
+                               hand: Iterable[TileDef] = ()) -> float:
+        """
+        Chance that a road or city is finished within the next draws unknown
+        tiles. Every slot it waits on needs its own closing tile and slots are
+        treated as independent; a slot that a tile already in hand closes is
+        taken as settled.
+        """
+        if feature.complete:
+            return 1.0
+        hand_types = {td.tile_type for td in hand}
+        chances = []
+        for coord, mask in self.open_slots(board, feature).items():
+            key = (board.slot_patterns[coord], mask, feature.edge_type)
+            if not hand_types.intersection(closer_types(key)):
+                chances.append(self.close_chance(key))
+        if len(chances) > draws:
+            return 0.0
+        p = 1.0
+        for q in chances:
+            p *= 1.0 - (1.0 - q) ** draws
+        return p
+
+    def monastery_probability(self, board, x: int, y: int, draws: int) -> float:
+        """Chance that the 3x3 around a monastery fills up within the given draws."""
+        empty = [(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                 if (x + dx, y + dy) not in board.grid]
+        if not empty:
+            return 1.0
+        if len(empty) > draws:
+            return 0.0
+        p = 1.0
+        for coord in empty:
+            pattern = board.slot_patterns.get(coord)
+            if pattern is None:
+                continue  # not reachable yet; nearly any tile will do once it is
+            p *= 1.0 - (1.0 - self.close_chance((pattern, 0, None))) ** draws
+        return p
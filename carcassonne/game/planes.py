@@ -0,0 +1,101 @@
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+from scipy import ndimage
+
+from .tile import NO_NEIGHBOR
+
+
+Coord = Tuple[int, int]
+
+_SQUARE = np.ones((3, 3), dtype=bool)
+
+
+class BoardPlanes:
+    """
+    NumPy view of a board kept next to Board.grid: an occupancy mask and one
+    edge-type plane per side (N/E/S/W, NO_NEIGHBOR where empty), indexed
+    [row, col] with (x, y) at row y - y0, col x - x0.
+
+    The arrays grow (doubling) whenever a tile lands within one cell of
+    their border, so every open slot and every 3x3 window around a tile is
+    inside them. Board updates them on every place, undo and rotation;
+    the neighbour-count plane derived from them is cached on version, which
+    moves with each of those updates. Feature ids and meeples are not
+    mirrored: they live in the FeatureIndex and MeepleManager.
+    """
+
+    def __init__(self, radius: int = 8):
+        size = 2 * radius + 1
+        self.x0 = self.y0 = -radius
+        self.occupied = np.zeros((size, size), dtype=bool)
+        self.edges = np.full((4, size, size), NO_NEIGHBOR, dtype=np.int8)
+        self.version = 0
+        self._derived: Dict[str, Tuple[int, np.ndarray]] = {}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.occupied.shape
+
+    def index(self, x: int, y: int) -> Tuple[int, int]:
+        return y - self.y0, x - self.x0
+
+    def coord(self, row: int, col: int) -> Coord:
+        return int(col) + self.x0, int(row) + self.y0
+
+    def set_tile(self, x: int, y: int, edges: Sequence[int]):
+        self._reserve(x, y)
+        row, col = self.index(x, y)
+        self.occupied[row, col] = True
+        self.edges[:, row, col] = edges
+        self.version += 1
+
+    def clear_tile(self, x: int, y: int):
+        row, col = self.index(x, y)
+        self.occupied[row, col] = False
+        self.edges[:, row, col] = NO_NEIGHBOR
+        self.version += 1
+
+    def _reserve(self, x: int, y: int):
+        """Grow so that (x, y) and its eight neighbours are inside the planes."""
+        while True:
+            height, width = self.shape
+            row, col = self.index(x, y)
+            if 1 <= row < height - 1 and 1 <= col < width - 1:
+                return
+            # double in every direction that ran out, keeping the old data in place
+            top = height if row < 1 else 0
+            bottom = height if row >= height - 1 else 0
+            left = width if col < 1 else 0
+            right = width if col >= width - 1 else 0
+            pad = ((top, bottom), (left, right))
+            self.occupied = np.pad(self.occupied, pad)
+            self.edges = np.pad(self.edges, ((0, 0),) + pad, constant_values=NO_NEIGHBOR)
+            self.y0 -= top
+            self.x0 -= left
+            self._derived.clear()
+
+    # ── Masks ──
+
+    def mask(self, coords: Iterable[Coord]) -> np.ndarray:
+        """Boolean plane that is True on the given cells (which must be inside)."""
+        plane = np.zeros(self.shape, dtype=bool)
+        cells = np.array(list(coords), dtype=np.int64).reshape(-1, 2)
+        if len(cells):
+            plane[cells[:, 1] - self.y0, cells[:, 0] - self.x0] = True
+        return plane
+
+    def neighbour_counts(self) -> np.ndarray:
+        """Occupied cells in each cell's 3x3 square, the cell itself included."""
+        cached = self._derived.get("neighbours")
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        counts = ndimage.convolve(self.occupied.astype(np.int8), _SQUARE.astype(np.int8),
+                                  mode="constant")
+        self._derived["neighbours"] = (self.version, counts)
+        return counts
+
+    def around(self, mask: np.ndarray) -> np.ndarray:
+        """mask grown by one cell in all eight directions (its 3x3 halo)."""
+        return ndimage.binary_dilation(mask, structure=_SQUARE)
+
@@ -0,0 +1,252 @@
+import struct
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from .board import Board
+from .engineer import apply_engineer_rotation
+from .tile import TILE_DEFS, SIDE_NAMES
+
+
+# Binary game record, little-endian:
+#
+#   header  "CRG", format version (u8), seed (u64), players (u8),
+#           rule flags (u8: 1 engineer, 2 objectives), hand size (u8),
+#           move count (varint)
+#   move    head (u16): kind (2 bits), tile def index (5), rotation / 90 (2),
+#           meeple position (3: 0 none, then N, E, S, W, CENTER)
+#           place and engineer moves follow with the x and y delta from the
+#           previous move's cell as zigzag varints, usually a byte each
+#
+# so a turn takes about four bytes. Tiles are stored by type rather than as
+# draws from the seeded deck, which lets a board be rebuilt without a deck.
+
+MAGIC = b"CRG"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<3sBQBBB")
+_HEAD = struct.Struct("<H")
+
+_KINDS = ("place", "engineer", "pass")
+_KIND_CODE = {kind: i for i, kind in enumerate(_KINDS)}
+_TILE_CODE = {td.tile_type: i for i, td in enumerate(TILE_DEFS)}
+_MEEPLES = (None,) + tuple(SIDE_NAMES) + ("CENTER",)
+_MEEPLE_CODE = {pos: i for i, pos in enumerate(_MEEPLES)}
+
+
+@dataclass
+class Move:
+    kind: str  # place, engineer (rotate the tile at x, y), pass
+    x: int = 0
+    y: int = 0
+    tile_type: Optional[str] = None
+    rotation: int = 0
+    meeple: Optional[str] = None
+
+
+@dataclass
+class GameRecord:
+    seed: int
+    num_players: int = 2
+    rules: dict = field(default_factory=lambda: {"engineer": True, "objectives": True, "hand_size": 2})
+    moves: List[Move] = field(default_factory=list)
+
+    @classmethod
+    def from_session(cls, game) -> "GameRecord":
+        """The record of a GameSession's journaled actions so far."""
+        moves = []
+        for action in game.actions:
+            kind = action["action"]
+            if kind == "place":
+                moves.append(Move("place", action["x"], action["y"], action["tile_type"],
+                                  action["rotation"]))
+            elif kind == "meeple":
+                moves[-1].meeple = action["position"]
+            elif kind == "engineer":
+                moves.append(Move("engineer", action["x"], action["y"]))
+            elif kind == "pass":
+                moves.append(Move("pass"))
+        return cls(game.seed, game.num_players, dict(game.rules), moves)
+
+    # ── Binary form ──
+
+    def encode(self) -> bytes:
+        if not 0 <= self.seed < 2 ** 64:
+            raise ValueError(f"seed {self.seed} does not fit the record's u64")
+        flags = (1 if self.rules.get("engineer", True) else 0) | \
+                (2 if self.rules.get("objectives", True) else 0)
+        out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, self.seed, self.num_players,
+                                     flags, self.rules.get("hand_size", 2)))
+        _put_varint(out, len(self.moves))
+        px = py = 0
+        for move in self.moves:
+            head = _KIND_CODE[move.kind]
+            if move.kind == "place":
+                head |= (_TILE_CODE[move.tile_type] << 2 | (move.rotation // 90) << 7
+                         | _MEEPLE_CODE[move.meeple] << 9)
+            out += _HEAD.pack(head)
+            if move.kind != "pass":
+                _put_varint(out, _zigzag(move.x - px))
+                _put_varint(out, _zigzag(move.y - py))
+                px, py = move.x, move.y
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "GameRecord":
+        record, end = _decode(data, 0)
+        if end != len(data):
+            raise ValueError(f"{len(data) - end} trailing bytes after the game record")
+        return record
+
+    # ── Replay ──
+
+    def board(self, turn: Optional[int] = None) -> Board:
+        """The board after the first turn moves (all of them by default)."""
+        return Replayer(self).seek(len(self.moves) if turn is None else turn)
+
+    def to_session(self):
+        """
+        Rebuild the full GameSession (scores, meeples, objectives) by playing
+        the moves through its rules, with placeholder player names.
+        """
+        from .session import GameSession
+        game = GameSession(num_players=self.num_players, custom_rules=self.rules, seed=self.seed)
+        for i in range(self.num_players):
+            game.add_player(f"Player {i + 1}")
+        for turn, move in enumerate(self.moves):
+            cp = game.current_player()
+            if cp is None:
+                raise ValueError(f"move {turn} comes after the game ended")
+            if move.kind == "place":
+                hand = [t.tile_type for t in cp.hand]
+                if move.tile_type not in hand:
+                    raise ValueError(f"move {turn}: {move.tile_type} is not in the hand")
+                result = game.make_move(cp.id, hand.index(move.tile_type), move.x, move.y,
+                                        move.rotation)
+                if "error" not in result and game.turn_phase == "place_meeple":
+                    result = (game.place_meeple(cp.id, move.meeple) if move.meeple
+                              else game.skip_meeple(cp.id))
+                elif move.meeple:
+                    raise ValueError(f"move {turn}: no meeple can be placed")
+            elif move.kind == "engineer":
+                result = game.use_engineer(cp.id, move.x, move.y)
+            else:
+                result = game.apply({"action": "pass", "player_id": cp.id})
+            if "error" in result:
+                raise ValueError(f"move {turn}: {result['error']}")
+        return game
+
+
+class Replayer:
+    """
+    Board positions of a record by turn. Stepping forward places (or, for the
+    engineer, rotates) tiles; stepping back takes placements back with the
+    board's make/unmake, or replays from the start across a rotation, which
+    cannot be taken back.
+    """
+
+    def __init__(self, record: GameRecord):
+        self.moves = record.moves
+        self._restart()
+
+    def _restart(self):
+        self.board = Board()
+        self.turn = 0
+        self._marks = [self.board.checkpoint()]
+        self._rotated = 0  # turn count just after the latest rotation
+
+    def seek(self, turn: int) -> Board:
+        if not 0 <= turn <= len(self.moves):
+            raise IndexError(f"turn {turn} outside 0..{len(self.moves)}")
+        if turn < self._rotated:
+            self._restart()
+        elif turn < self.turn:
+            self.board.rollback(self._marks[turn])
+            del self._marks[turn + 1:]
+            self.turn = turn
+        for move in self.moves[self.turn:turn]:
+            if move.kind == "place":
+                ok = self.board.place_tile(TILE_DEFS[_TILE_CODE[move.tile_type]],
+                                           (move.x, move.y), move.rotation) is not None
+            elif move.kind == "engineer":
+                ok = apply_engineer_rotation(self.board, move.x, move.y)
+                self._rotated = self.turn + 1
+            else:
+                ok = True
+            if not ok:
+                raise ValueError(f"move {self.turn} is not legal on the replayed board")
+            self.turn += 1
+            self._marks.append(self.board.checkpoint())
+        return self.board
+
+
+def encode_many(records: List[GameRecord]) -> bytes:
+    return b"".join(r.encode() for r in records)
+
+
+def decode_many(data: bytes) -> List[GameRecord]:
+    """Records written back to back (as by encode_many), e.g. a training set."""
+    records, offset = [], 0
+    while offset < len(data):
+        record, offset = _decode(data, offset)
+        records.append(record)
+    return records
+
+
+# ── Codec internals ──
+
+def _zigzag(n: int) -> int:
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _put_varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, offset
+        shift += 7
+
+
+def _decode(data: bytes, offset: int) -> Tuple[GameRecord, int]:
+    try:
+        magic, version, seed, players, flags, hand_size = _HEADER.unpack_from(data, offset)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"not a version {FORMAT_VERSION} game record at byte {offset}")
+        count, offset = _get_varint(data, offset + _HEADER.size)
+        moves = []
+        px = py = 0
+        for _ in range(count):
+            head = data[offset] | data[offset + 1] << 8
+            offset += 2
+            if (head & 3 >= len(_KINDS) or head >> 2 & 31 >= len(TILE_DEFS)
+                    or head >> 9 & 7 >= len(_MEEPLES) or head >> 12):
+                raise ValueError(f"bad move {len(moves)} in game record")
+            kind = _KINDS[head & 3]
+            if kind == "pass":
+                moves.append(Move("pass"))
+                continue
+            dx, offset = _get_varint(data, offset)
+            dy, offset = _get_varint(data, offset)
+            px += _unzigzag(dx)
+            py += _unzigzag(dy)
+            if kind == "place":
+                moves.append(Move("place", px, py, TILE_DEFS[head >> 2 & 31].tile_type,
+                                  (head >> 7 & 3) * 90, _MEEPLES[head >> 9 & 7]))
+            else:
+                moves.append(Move("engineer", px, py))
+    except (IndexError, struct.error):
+        raise ValueError("truncated game record") from None
+    rules = {"engineer": bool(flags & 1), "objectives": bool(flags & 2), "hand_size": hand_size}
+    return GameRecord(seed, players, rules, moves), offset
@@ -0,0 +1,344 @@
+import math
+import os
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .tile import (
+    TileDef, EdgeType, SIDE_NAMES, NEIGHBOR_OFFSET, NO_NEIGHBOR, Pattern, orientation, rotation_table,
+)
+from .features import Feature
+
+
+Coord = Tuple[int, int]
+
+_OPPOSITE_IDX = (2, 3, 0, 1)
+
+
+class RolloutBoard:
+    """
+    Array-backed copy of a board for throwaway Monte-Carlo rollouts.
+
+    Cells of a fixed window around the placed tiles are numbered row by row;
+    edge types live in one flat list (cell * 4 + side) and city sides are
+    joined by a small union-find with an open-side count per root. Only what
+    a rollout needs is kept: no roads, fields, meeples or undo records.
+    Every write a rollout makes is logged, so reset() puts the board back at
+    the snapshot in time proportional to the tiles placed since, not to the
+    size of the board.
+
+    tracked lists the cities whose completion is reported by
+    completed_cells(). The window leaves room for depth placements in any
+    direction.
+    """
+
+    def __init__(self, board, tracked: Iterable[Feature], depth: int = 8):
+        xs = [x for x, _ in board.grid]
+        ys = [y for _, y in board.grid]
+        margin = depth + 2
+        self.x0 = min(xs) - margin
+        self.y0 = min(ys) - margin
+        self.width = max(xs) - self.x0 + margin + 1
+        height = max(ys) - self.y0 + margin + 1
+        size = self.width * height
+        self.delta = tuple(NEIGHBOR_OFFSET[s][1] * self.width + NEIGHBOR_OFFSET[s][0]
+                           for s in SIDE_NAMES)
+
+        self.edges: List[int] = [NO_NEIGHBOR] * (4 * size)
+        self.filled = bytearray(size)
+        self.parent: List[int] = list(range(4 * size))
+        self.open: List[int] = [0] * (4 * size)
+        for (x, y), tile in board.grid.items():
+            cell = self.cell(x, y)
+            self.filled[cell] = 1
+            self.edges[4 * cell:4 * cell + 4] = tile.rotated_edges
+
+        # every incomplete city becomes one flat tree rooted at one of its nodes
+        self._cities: List[Tuple[int, Tuple[int, ...]]] = []
+        for feature in board.features.features(EdgeType.CITY):
+            if feature.open_edges == 0:
+                continue  # nothing can attach to a finished city
+            nodes = [self.node(n) for n in feature.nodes]
+            root = nodes[0]
+            for n in nodes:
+                self.parent[n] = root
+            self.open[root] = feature.open_edges
+            self._cities.append((root, tuple(self.cell(*c) for c in feature.tiles)))
+        self.tracked: Tuple[int, ...] = tuple(self.node(next(iter(f.nodes))) for f in tracked)
+
+        # node offsets, from a cell's first node, of the sides its neighbours turn to it
+        self._facing = tuple(4 * d + _OPPOSITE_IDX[i] for i, d in enumerate(self.delta))
+        self._base_slots = tuple(self.cell(x, y) for x, y in board.open_slots)
+        self.is_slot = bytearray(size)
+        self._log: List[tuple] = []
+        self._placed: List[int] = []
+        self._reset_slots()
+
+    def cell(self, x: int, y: int) -> int:
+        return (y - self.y0) * self.width + (x - self.x0)
+
+    def coord(self, cell: int) -> Coord:
+        y, x = divmod(cell, self.width)
+        return x + self.x0, y + self.y0
+
+    def node(self, node) -> int:
+        x, y, side = node
+        return 4 * self.cell(x, y) + SIDE_NAMES.index(side)
+
+    def _reset_slots(self):
+        self.slots: List[int] = list(self._base_slots)
+        for cell in self.slots:
+            self.is_slot[cell] = 1
+
+    def reset(self):
+        """Back to the snapshot the board was built from."""
+        parent, open_ = self.parent, self.open
+        for n, old_parent, old_open in reversed(self._log):
+            parent[n] = old_parent
+            open_[n] = old_open
+        self._log.clear()
+        empty = (NO_NEIGHBOR,) * 4
+        for cell in self._placed:
+            self.filled[cell] = 0
+            self.edges[4 * cell:4 * cell + 4] = empty
+        self._placed.clear()
+        for cell in self.slots:
+            self.is_slot[cell] = 0
+        self._reset_slots()
+
+    # ── Placement ──
+
+    def try_place(self, tile_def: TileDef, random: Callable[[], float], tries: int = 10) -> bool:
+        """
+        Put tile_def in the first of up to tries random open slots it fits,
+        in its first legal rotation; random is a uniform [0, 1) source.
+        Returns False if none of them took it.
+        """
+        fits = first_fits(tile_def)
+        slots, edges = self.slots, self.edges
+        fn, fe, fs, fw = self._facing
+        n = len(slots)
+        for j in range(min(tries, n)):
+            # partial Fisher-Yates over the slot list: slots[:j] were tried
+            i = j + int(random() * (n - j))
+            cell = slots[i]
+            slots[i] = slots[j]
+            slots[j] = cell
+            base = 4 * cell
+            play = fits.get((edges[base + fn], edges[base + fe], edges[base + fs], edges[base + fw]))
+            if play is not None:
+                # take the slot out of the list
+                last = slots.pop()
+                if j < n - 1:
+                    slots[j] = last
+                self.is_slot[cell] = 0
+                self._place(cell, play)
+                return True
+        return False
+
+    def place(self, cell: int, tile_def: TileDef, rotation: int):
+        """Put tile_def at an open slot; the caller checks that it fits."""
+        self.slots.remove(cell)
+        self.is_slot[cell] = 0
+        self._place(cell, _play(orientation(tile_def, rotation)))
+
+    def _place(self, cell: int, play: tuple):
+        edges, city_sides, city_links = play
+        base = 4 * cell
+        filled, is_slot = self.filled, self.is_slot
+        filled[cell] = 1
+        self.edges[base:base + 4] = edges
+        self._placed.append(cell)
+        for d in self.delta:
+            neighbour = cell + d
+            if not filled[neighbour] and not is_slot[neighbour]:
+                is_slot[neighbour] = 1
+                self.slots.append(neighbour)
+
+        if not city_sides:
+            return
+        # the new cell's nodes start out as their own roots with nothing open
+        for a, b in city_links:
+            self._union(base + a, base + b)
+        open_ = self.open
+        for side in city_sides:
+            neighbour = cell + self.delta[side]
+            if filled[neighbour]:
+                facing = 4 * neighbour + _OPPOSITE_IDX[side]
+                root = self.find(facing)
+                self._write(root, root, open_[root] - 1)
+                self._union(facing, base + side)
+            else:
+                root = self.find(base + side)
+                self._write(root, root, open_[root] + 1)
+
+    def _write(self, n: int, parent: int, open_count: int):
+        self._log.append((n, self.parent[n], self.open[n]))
+        self.parent[n] = parent
+        self.open[n] = open_count
+
+    def find(self, n: int) -> int:
+        parent = self.parent
+        while parent[n] != n:
+            n = parent[n]
+        return n
+
+    def _union(self, kept: int, joined: int):
+        # no path compression: trees stay a few placements deep and every
+        # write would otherwise have to be logged for reset()
+        a, b = self.find(kept), self.find(joined)
+        if a != b:
+            self._write(a, a, self.open[a] + self.open[b])
+            self._write(b, a, self.open[b])
+
+    # ── Results ──
+
+    def completed_cells(self) -> set:
+        """Cells of every tracked city that is complete right now."""
+        roots = {r for r in map(self.find, self.tracked) if self.open[r] == 0}
+        if not roots:
+            return set()
+        cells = set()
+        for root, tiles in self._cities:
+            if self.find(root) in roots:
+                cells.update(tiles)
+        for cell in self._placed:
+            for n in range(4 * cell, 4 * cell + 4):
+                if self.edges[n] == EdgeType.CITY and self.find(n) in roots:
+                    cells.add(cell)
+                    break
+        return cells
+
+    def run(self, deck: Sequence[TileDef], seeds: Iterable[int],
+            draws: int = 8, tries: int = 10) -> List[int]:
+        """
+        One rollout per seed: draw up to draws tiles from deck without
+        replacement and play each one with try_place. Returns how many
+        rollouts finished each cell's tracked city, indexed by cell.
+        """
+        counts = [0] * len(self.filled)
+        draws = min(draws, len(deck))
+        for seed in seeds:
+            random_ = random.Random(seed).random
+            drawn = list(deck)
+            for j in range(draws):
+                i = j + int(random_() * (len(drawn) - j))
+                drawn[i], drawn[j] = drawn[j], drawn[i]
+                self.try_place(drawn[j], random_, tries)
+            for cell in self.completed_cells():
+                counts[cell] += 1
+            self.reset()
+        return counts
+
+    def completion_counts(self, deck: Sequence[TileDef], n_simulations: int,
+                          seed: Optional[int] = None, workers: int = 1,
+                          draws: int = 8, tries: int = 10) -> Dict[Coord, int]:
+        """
+        run() over n_simulations seeds spawned from seed, keyed by coordinate.
+        With workers > 1 the seeds are split across a shared process pool
+        (at most ROLLOUT_POOL_SIZE ways); the counts do not depend on it.
+        """
+        seeds = simulation_seeds(n_simulations, seed)
+        deck = list(deck)
+        totals = None
+        workers = min(workers, ROLLOUT_POOL_SIZE)
+        if workers > 1 and n_simulations >= 2 * workers:
+            chunk = -(-n_simulations // workers)
+            pool = None
+            try:
+                pool = _rollout_pool()
+                futures = [pool.submit(self.run, deck, seeds[i:i + chunk], draws, tries)
+                           for i in range(0, n_simulations, chunk)]
+                totals = [sum(c) for c in zip(*(f.result() for f in futures))]
+            except Exception:
+                # no usable process pool here: run in-process instead
+                _shutdown_rollout_pool(pool)
+        if totals is None:
+            totals = self.run(deck, seeds, draws, tries)
+        return {self.coord(cell): n for cell, n in enumerate(totals) if n}
+
+
+_FIRST_FITS: Dict[str, Dict[Pattern, tuple]] = {}
+
+
+def _play(turned) -> tuple:
+    """(edges, city sides, linked city side pairs) of one orientation."""
+    city = turned.type_masks[EdgeType.CITY]
+    sides = tuple(i for i in range(4) if city >> i & 1)
+    links = tuple((a, b) for a in sides for b in sides if a < b and turned.links[a] >> b & 1)
+    return turned.edges, sides, links
+
+
+def first_fits(tile_def: TileDef) -> Dict[Pattern, tuple]:
+    """slot pattern -> _play of tile_def's first rotation that fits it, for fitting patterns only."""
+    fits = _FIRST_FITS.get(tile_def.tile_type)
+    if fits is None:
+        fits = _FIRST_FITS[tile_def.tile_type] = {
+            pattern: _play(orientation(tile_def, rotations[0]))
+            for pattern, rotations in rotation_table(tile_def).items() if rotations
+        }
+    return fits
+
+
+def simulation_seeds(n: int, seed: Optional[int] = None) -> List[int]:
+    """
+    Independent per-simulation seeds spawned from one root seed, so a
+    simulation draws the same stream however the batch is split up.
+    """
+    return np.random.SeedSequence(seed).generate_state(n, np.uint64).tolist()
+
+
+def wilson_interval(hits: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if n <= 0:
+        return 0.0, 1.0
+    p = hits / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def completion_rollouts(board, tracked: Sequence[Feature], deck: Sequence[TileDef],
+                        n_simulations: int, seed: Optional[int] = None, workers: int = 1,
+                        draws: int = 8, tries: int = 10) -> Dict[Coord, int]:
+    """
+    Run n_simulations rollouts from board and count, per cell, how many of
+    them complete a tracked city covering it.
+    """
+    if not tracked or not deck or n_simulations <= 0:
+        return {}
+    sim = RolloutBoard(board, tracked, depth=min(draws, len(deck)))
+    return sim.completion_counts(deck, n_simulations, seed, workers, draws, tries)
+
+
+ROLLOUT_POOL_SIZE = max(1, (os.cpu_count() or 1) - 1)
+_ROLLOUT_POOL: Optional[ProcessPoolExecutor] = None
+_ROLLOUT_POOL_LOCK = threading.Lock()
+
+
+def _rollout_pool() -> ProcessPoolExecutor:
+    """
+    Process pool shared by every rollout batch, started on first use at its
+    full size and then kept, so no caller's rollouts are cut off by another's.
+    """
+    global _ROLLOUT_POOL
+    with _ROLLOUT_POOL_LOCK:
+        if _ROLLOUT_POOL is None:
+            _ROLLOUT_POOL = ProcessPoolExecutor(max_workers=ROLLOUT_POOL_SIZE)
+        return _ROLLOUT_POOL
+
+
+def _shutdown_rollout_pool(pool: Optional[ProcessPoolExecutor]):
+    """
+    Drop pool once it turned out unusable (its futures fail regardless),
+    unless another caller already replaced it.
+    """
+    global _ROLLOUT_POOL
+    with _ROLLOUT_POOL_LOCK:
+        if pool is not None and pool is _ROLLOUT_POOL:
+            pool.shutdown(wait=False, cancel_futures=True)
+            _ROLLOUT_POOL = None
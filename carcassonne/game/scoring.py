@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from .tile import EdgeType, CenterType, SIDE_NAMES, NEIGHBOR_OFFSET, OPPOSITE
 
@@ -24,9 +24,43 @@ MEEPLES_PER_PLAYER = 7
 
 
 class MeepleManager:
-    def __init__(self):
-        self.placed: List[Meeple] = []
+    """
+    Meeples on the board, indexed by node, by tile and by player. When bound
+    to a board's FeatureIndex it also keeps feature id -> meeples, which the
+    index updates as features merge and split, so every lookup costs the size
+    of its answer rather than a scan of all placed meeples.
+    """
+
+    def __init__(self, features=None):
+        # node -> meeple, in placement order
+        self._by_node: Dict[Tuple, Meeple] = {}
+        self._by_coord: Dict[Tuple[int, int], List[Meeple]] = {}
+        self._by_player: Dict[str, List[Meeple]] = {}
+        self._by_feature: Dict[int, List[Meeple]] = {}
+        self._serial: Dict[Tuple, int] = {}  # node -> placement number, to restore order on undo
+        self._next_serial = 0
+        self.features = None
         self.meeple_counts: Dict[str, int] = {}
+        # ("place", meeple) or ("return", [meeple, ...])
+        self._undo_stack: List[tuple] = []
+        self._undo_floor = 0  # records dropped by commit()
+        if features is not None:
+            self.bind(features)
+
+    def bind(self, features):
+        """Follow a FeatureIndex so meeples can be looked up by feature."""
+        self.features = features
+        features.observers.append(self)
+        self.features_rebuilt()
+
+    @property
+    def placed(self) -> List[Meeple]:
+        return list(self._by_node.values())
+
+    @property
+    def node_ids(self):
+        """Live view of occupied nodes."""
+        return self._by_node.keys()
 
     def init_player(self, player_id: str):
         self.meeple_counts[player_id] = MEEPLES_PER_PLAYER
@@ -35,25 +69,123 @@ class MeepleManager:
         return self.meeple_counts.get(player_id, 0)
 
     def place(self, meeple: Meeple) -> bool:
-        if self.available(meeple.player_id) <= 0:
+        if self.available(meeple.player_id) <= 0 or meeple.node_id in self._by_node:
             return False
-        self.placed.append(meeple)
+        self._serial[meeple.node_id] = self._next_serial
+        self._next_serial += 1
+        self._add(meeple)
         self.meeple_counts[meeple.player_id] -= 1
+        self._undo_stack.append(("place", meeple))
         return True
 
     def return_meeples(self, meeples: List[Meeple]):
+        removed = []
         for m in meeples:
-            self.placed.remove(m)
+            m = self._remove(m.node_id)
+            removed.append(m)
             self.meeple_counts[m.player_id] += 1
+        self._undo_stack.append(("return", removed))
+
+    def undo(self):
+        """Take back the most recent place or return_meeples exactly."""
+        if not self._undo_stack:
+            return
+        kind, payload = self._undo_stack.pop()
+        if kind == "place":
+            self._remove(payload.node_id)
+            del self._serial[payload.node_id]
+            self._next_serial -= 1
+            self.meeple_counts[payload.player_id] += 1
+        else:
+            for m in reversed(payload):
+                self._add(m)
+                self.meeple_counts[m.player_id] -= 1
+            # returned meeples went back in at the end; put them in placement order
+            self._by_node = dict(sorted(self._by_node.items(), key=lambda kv: self._serial[kv[0]]))
+
+    def checkpoint(self) -> int:
+        return self._undo_floor + len(self._undo_stack)
+
+    def rollback(self, mark: int):
+        if mark < self._undo_floor:
+            raise ValueError("checkpoint predates a commit and cannot be restored")
+        while self._undo_floor + len(self._undo_stack) > mark:
+            self.undo()
+
+    def commit(self):
+        """Make the placements and returns so far permanent, dropping their undo records."""
+        self._undo_floor += len(self._undo_stack)
+        self._undo_stack.clear()
+
+    def _add(self, m: Meeple):
+        node = m.node_id
+        self._by_node[node] = m
+        self._by_coord.setdefault((m.x, m.y), []).append(m)
+        self._by_player.setdefault(m.player_id, []).append(m)
+        feature = self.features.feature_of(node) if self.features is not None else None
+        if feature is not None:
+            self._by_feature.setdefault(feature.id, []).append(m)
+
+    def _remove(self, node: Tuple) -> Meeple:
+        m = self._by_node.pop(node)
+        _discard(self._by_coord, (m.x, m.y), m)
+        _discard(self._by_player, m.player_id, m)
+        feature = self.features.feature_of(node) if self.features is not None else None
+        if feature is not None:
+            _discard(self._by_feature, feature.id, m)
+        return m
+
+    # ── FeatureIndex notifications ──
+
+    def features_merged(self, kept, absorbed):
+        moved = self._by_feature.pop(absorbed.id, None)
+        if moved:
+            self._by_feature.setdefault(kept.id, []).extend(moved)
+
+    def features_split(self, kept, absorbed):
+        on_kept = self._by_feature.get(kept.id)
+        if not on_kept:
+            return
+        back = [m for m in on_kept if m.node_id in absorbed.nodes]
+        if back:
+            self._by_feature[absorbed.id] = back
+            on_kept[:] = [m for m in on_kept if m.node_id not in absorbed.nodes]
+            if not on_kept:
+                del self._by_feature[kept.id]
+
+    def features_rebuilt(self):
+        self._by_feature = {}
+        for node, m in self._by_node.items():
+            feature = self.features.feature_of(node)
+            if feature is not None:
+                self._by_feature.setdefault(feature.id, []).append(m)
+
+    # ── Lookups ──
 
     def get_meeples_on_feature(self, feature_nodes: Set[Tuple]) -> List[Meeple]:
-        return [m for m in self.placed if m.node_id in feature_nodes]
+        if not feature_nodes:
+            return []
+        if self.features is not None:
+            feature = self.features.feature_of(next(iter(feature_nodes)))
+            if feature is not None and (feature.nodes is feature_nodes
+                                        or feature.nodes == feature_nodes):
+                return self._in_placement_order(self._by_feature.get(feature.id, ()))
+        # a stale node set or no bound index: probe whichever side is smaller
+        if len(feature_nodes) < len(self._by_node):
+            return self._in_placement_order(
+                [self._by_node[n] for n in feature_nodes if n in self._by_node])
+        return [m for n, m in self._by_node.items() if n in feature_nodes]
 
     def get_meeples_at(self, x: int, y: int) -> List[Meeple]:
-        return [m for m in self.placed if m.x == x and m.y == y]
+        return self._in_placement_order(self._by_coord.get((x, y), ()))
 
     def get_player_meeples(self, player_id: str) -> List[Meeple]:
-        return [m for m in self.placed if m.player_id == player_id]
+        return self._in_placement_order(self._by_player.get(player_id, ()))
+
+    def _in_placement_order(self, meeples) -> List[Meeple]:
+        if len(meeples) < 2:
+            return list(meeples)
+        return sorted(meeples, key=lambda m: self._serial[m.node_id])
 
     def to_dict(self) -> dict:
         return {
@@ -66,6 +198,18 @@ class MeepleManager:
         }
 
 
+def _discard(index: dict, key, meeple: Meeple):
+    bucket = index.get(key)
+    if bucket is None:
+        return
+    for i, m in enumerate(bucket):
+        if m is meeple:
+            del bucket[i]
+            break
+    if not bucket:
+        del index[key]
+
+
 @dataclass
 class ScoreEvent:
     player_id: str
@@ -82,16 +226,62 @@ class ScoringEngine:
         self.meeples = meeple_mgr
         self.score_log: List[ScoreEvent] = []
 
-    def check_and_score_completed(self, turn: int) -> List[ScoreEvent]:
+    def checkpoint(self) -> Tuple[int, int]:
+        """Mark covering the score log and the meeples that scoring hands back."""
+        return len(self.score_log), self.meeples.checkpoint()
+
+    def rollback(self, mark: Tuple[int, int]):
+        log_len, meeple_mark = mark
+        del self.score_log[log_len:]
+        self.meeples.rollback(meeple_mark)
+
+    def check_and_score_completed(self, turn: int,
+                                  coords: Optional[Iterable[Tuple[int, int]]] = None
+                                  ) -> List[ScoreEvent]:
+        """
+        Score completed roads, cities and monasteries that hold meeples, and
+        hand the meeples back. coords are the tiles placed or rotated this
+        turn: only features running through them and monasteries in their
+        3x3 windows can have just been completed, so only those are checked.
+        Without coords the whole board is scanned.
+        """
+        if coords is None:
+            roads = self.board.live_features(EdgeType.ROAD)
+            cities = self.board.live_features(EdgeType.CITY)
+            monasteries = [m for m in self.meeples.placed if m.position == "CENTER"]
+        else:
+            coords = list(coords)
+            roads, cities = [], []
+            seen = set()
+            for x, y in coords:
+                for feature in self.board.features.features_at(x, y):
+                    if feature.id in seen:
+                        continue
+                    seen.add(feature.id)
+                    if feature.edge_type == EdgeType.ROAD:
+                        roads.append(feature.nodes)
+                    elif feature.edge_type == EdgeType.CITY:
+                        cities.append(feature.nodes)
+            monasteries = self._monastery_meeples_around(coords)
+
         events = []
-        events.extend(self._score_completed_roads(turn))
-        events.extend(self._score_completed_cities(turn))
-        events.extend(self._score_completed_monasteries(turn))
+        events.extend(self._score_completed_roads(turn, roads))
+        events.extend(self._score_completed_cities(turn, cities))
+        events.extend(self._score_completed_monasteries(turn, monasteries))
         return events
 
-    def _score_completed_roads(self, turn: int) -> List[ScoreEvent]:
+    def _monastery_meeples_around(self, coords) -> List[Meeple]:
+        found = {}
+        for x, y in coords:
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for m in self.meeples.get_meeples_at(x + dx, y + dy):
+                        if m.position == "CENTER":
+                            found[m.node_id] = m
+        return list(found.values())
+
+    def _score_completed_roads(self, turn: int, road_features) -> List[ScoreEvent]:
         events = []
-        road_features = self.board.get_features(EdgeType.ROAD)
 
         for feature in road_features:
             if not self.board.is_feature_complete(feature, EdgeType.ROAD):
@@ -115,9 +305,8 @@ class ScoringEngine:
 
         return events
 
-    def _score_completed_cities(self, turn: int) -> List[ScoreEvent]:
+    def _score_completed_cities(self, turn: int, city_features) -> List[ScoreEvent]:
         events = []
-        city_features = self.board.get_features(EdgeType.CITY)
 
         for feature in city_features:
             if not self.board.is_feature_complete(feature, EdgeType.CITY):
@@ -147,10 +336,9 @@ class ScoringEngine:
 
         return events
 
-    def _score_completed_monasteries(self, turn: int) -> List[ScoreEvent]:
+    def _score_completed_monasteries(self, turn: int, monastery_meeples) -> List[ScoreEvent]:
         events = []
 
-        monastery_meeples = [m for m in self.meeples.placed if m.position == "CENTER"]
         for m in monastery_meeples:
             if self._is_monastery_complete(m.x, m.y):
                 points = 9
@@ -179,7 +367,7 @@ class ScoringEngine:
 
     def _score_incomplete_roads(self, turn: int) -> List[ScoreEvent]:
         events = []
-        road_features = self.board.get_features(EdgeType.ROAD)
+        road_features = self.board.live_features(EdgeType.ROAD)
 
         for feature in road_features:
             if self.board.is_feature_complete(feature, EdgeType.ROAD):
@@ -204,7 +392,7 @@ class ScoringEngine:
 
     def _score_incomplete_cities(self, turn: int) -> List[ScoreEvent]:
         events = []
-        city_features = self.board.get_features(EdgeType.CITY)
+        city_features = self.board.live_features(EdgeType.CITY)
 
         for feature in city_features:
             if self.board.is_feature_complete(feature, EdgeType.CITY):
@@ -236,12 +424,10 @@ class ScoringEngine:
         events = []
         monastery_meeples = [m for m in self.meeples.placed if m.position == "CENTER"]
 
+        planes = self.board.planes
+        filled = planes.neighbour_counts()
         for m in list(monastery_meeples):
-            count = 0
-            for dx in [-1, 0, 1]:
-                for dy in [-1, 0, 1]:
-                    if (m.x + dx, m.y + dy) in self.board.grid:
-                        count += 1
+            count = int(filled[planes.index(m.x, m.y)])
             event = ScoreEvent(m.player_id, count, "incomplete_monastery",
                                "monastery", [(m.x, m.y)], turn)
             events.append(event)
@@ -252,13 +438,15 @@ class ScoringEngine:
 
     def _score_fields(self, turn: int) -> List[ScoreEvent]:
         events = []
-        field_features = self.board.get_features(EdgeType.FIELD)
+        field_features = self.board.live_features(EdgeType.FIELD)
 
-        completed_cities = set()
-        city_features = self.board.get_features(EdgeType.CITY)
-        for cf in city_features:
-            if self.board.is_feature_complete(cf, EdgeType.CITY):
-                completed_cities.add(frozenset(cf))
+        planes = self.board.planes
+        # 3x3 halo of each completed city: a field touches it if they overlap
+        completed_cities = [
+            planes.around(planes.mask({(n[0], n[1]) for n in cf}))
+            for cf in self.board.live_features(EdgeType.CITY)
+            if self.board.is_feature_complete(cf, EdgeType.CITY)
+        ]
 
         for feature in field_features:
             meeples = self.meeples.get_meeples_on_feature(feature)
@@ -266,12 +454,10 @@ class ScoringEngine:
                 continue
 
             field_tiles = set((n[0], n[1]) for n in feature)
-            adjacent_completed = 0
-
-            for city_set in completed_cities:
-                city_tiles = set((n[0], n[1]) for n in city_set)
-                if self._field_touches_city(field_tiles, city_tiles):
-                    adjacent_completed += 1
+            field_mask = planes.mask(field_tiles)
+            adjacent_completed = sum(
+                1 for halo in completed_cities if (halo & field_mask).any()
+            )
 
             if adjacent_completed == 0:
                 self.meeples.return_meeples(meeples)
@@ -290,15 +476,6 @@ class ScoringEngine:
 
         return events
 
-    def _field_touches_city(self, field_tiles: Set[Tuple], city_tiles: Set[Tuple]) -> bool:
-        for ft in field_tiles:
-            for ct in city_tiles:
-                dx = abs(ft[0] - ct[0])
-                dy = abs(ft[1] - ct[1])
-                if dx <= 1 and dy <= 1:
-                    return True
-        return False
-
     def _get_majority_owners(self, meeples: List) -> List[str]:
         counts: Dict[str, int] = {}
         for m in meeples:
@@ -1,16 +1,50 @@
+import functools
+import random
+import threading
 from typing import Dict, List, Optional, Tuple
 from .board import Board
 from .deck import Deck
-from .tile import TileDef, TILE_DEFS, EdgeType
+from .tile import TileDef, TILE_DEFS, EdgeType, SIDE_NAMES, NEIGHBOR_OFFSET
 from .scoring import MeepleManager, Meeple, ScoringEngine, ScoreEvent, MEEPLES_PER_PLAYER
 from .bots import create_bot, BotMove
-from .analytics import compute_analytics
+from .analytics import AnalyticsEngine, background_executor
+from .events import EventBus
 from .objectives import ObjectiveManager
 from .engineer import (
     EngineerManager, get_valid_engineer_targets, apply_engineer_rotation,
 )
 import uuid
 
+# changes kept for delta states and stream resumption; a client further
+# behind than this gets the full state instead
+CHANGE_LOG_SIZE = 512
+
+
+def _action(method):
+    """
+    Run a state-changing action under the session lock, then publish the
+    version it reached so pushed streams wake up to a consistent state.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            result = method(self, *args, **kwargs)
+        self.events.publish(self.version)
+        return result
+    return locked
+
+
+def _query(method):
+    """
+    Read state under the session lock: bot turns search by playing moves on
+    the live board and taking them back, and must not be seen half-made.
+    """
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
 
 class Player:
     def __init__(self, player_id: str, name: str, is_bot: bool = False, bot_type: str = "random"):
@@ -40,14 +74,21 @@ class GameSession:
       - engineer: bool (default True) — each player gets 1 engineer token
       - objectives: bool (default True) — deal 2 hidden objectives
       - hand_size: int (default 2) — strategic reserve tiles in hand
+
+    All chance (deck order, objective deal) comes from one RNG seeded with
+    seed, and every successful action is journaled in actions, so a game is
+    rebuilt exactly by replaying its actions onto a session with the same
+    id, players, rules and seed (see apply).
     """
 
     def __init__(self, game_id: Optional[str] = None, num_players: int = 2,
-                 custom_rules: Optional[dict] = None):
+                 custom_rules: Optional[dict] = None, seed: Optional[int] = None):
         self.id = game_id or str(uuid.uuid4())[:8]
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
         self.board = Board()
-        self.deck = Deck()
-        self.meeples = MeepleManager()
+        self.deck = Deck(rng=self.rng)
+        self.meeples = MeepleManager(self.board.features)
         self.scoring = ScoringEngine(self.board, self.meeples)
         self.players: Dict[str, Player] = {}
         self.turn_order: List[str] = []
@@ -58,6 +99,22 @@ class GameSession:
         self.num_players = num_players
         self.history: List[dict] = []
         self.score_events: List[dict] = []
+        self.actions: List[dict] = []
+        # bumped on every action; versions records, per analytics input, the
+        # version it last changed at, so metrics are only recomputed when a
+        # part of the game they read has moved
+        self.version = 0
+        self.versions: Dict[str, int] = {
+            "board": 0, "meeples": 0, "scores": 0, "history": 0, "players": 0,
+        }
+        # board, meeple and score changes tagged with the version they were
+        # made at, for delta states and pushed event streams
+        self.events = EventBus(CHANGE_LOG_SIZE)
+        self.lock = threading.RLock()
+        self.analytics = AnalyticsEngine(
+            self.board, self.meeples, self.players, self.history, self.deck.remaining(),
+            versions=self.versions, executor=background_executor(),
+        )
 
         # Custom rules
         rules = custom_rules or {}
@@ -73,17 +130,21 @@ class GameSession:
 
     # ── Player Management ──
 
-    def add_player(self, name: str, is_bot: bool = False, bot_type: str = "random") -> Player:
-        pid = str(uuid.uuid4())[:8]
+    @_action
+    def add_player(self, name: str, is_bot: bool = False, bot_type: str = "random",
+                   player_id: Optional[str] = None) -> Player:
+        pid = player_id or str(uuid.uuid4())[:8]
         player = Player(pid, name, is_bot, bot_type)
         self.players[pid] = player
         self.turn_order.append(pid)
+        self._record("join", name=name, is_bot=is_bot, bot_type=bot_type, player_id=pid)
         self.meeples.init_player(pid)
         if self.engineer:
             self.engineer.init_player(pid)
 
         if len(self.players) >= self.num_players:
             self._start_game()
+        self._touch("players")
         return player
 
     def _start_game(self):
@@ -98,7 +159,7 @@ class GameSession:
                     p.hand.append(tile)
 
         if self.objectives:
-            self.objectives.deal_objectives(list(self.players.keys()), count=2)
+            self.objectives.deal_objectives(list(self.players.keys()), count=2, rng=self.rng)
 
     def current_player(self) -> Optional[Player]:
         if self.phase != "playing" or not self.turn_order:
@@ -107,6 +168,7 @@ class GameSession:
 
     # ── Core Turn Actions ──
 
+    @_action
     def make_move(self, player_id: str, tile_idx: int, x: int, y: int, rotation: int) -> dict:
         if self.phase != "playing":
             return {"error": "Game is not in playing phase"}
@@ -120,10 +182,21 @@ class GameSession:
             return {"error": "Invalid tile index"}
 
         tile_def = cp.hand[tile_idx]
+        new_slots = []
+        for side in SIDE_NAMES:
+            dx, dy = NEIGHBOR_OFFSET[side]
+            n = (x + dx, y + dy)
+            if n not in self.board.grid and n not in self.board.open_slots:
+                new_slots.append([n[0], n[1]])
         placed = self.board.place_tile(tile_def, (x, y), rotation)
         if not placed:
             return {"error": "Invalid placement"}
 
+        self._touch("board")
+        self._record("place", player_id=player_id, tile_idx=tile_idx,
+                     tile_type=tile_def.tile_type, x=x, y=y, rotation=rotation)
+        self._log("tile", tile=self.board.tile_dict((x, y)))
+        self._log("slots", added=new_slots, removed=[[x, y]])
         cp.hand.pop(tile_idx)
         new_tile = self.deck.draw()
         if new_tile:
@@ -131,7 +204,7 @@ class GameSession:
 
         self.last_placed_coord = (x, y)
 
-        meeple_nodes = set(m.node_id for m in self.meeples.placed)
+        meeple_nodes = self.meeples.node_ids
         meeple_positions = self.board.get_valid_meeple_positions(x, y, meeple_nodes)
         has_meeple_options = (
             len(meeple_positions) > 0
@@ -151,6 +224,7 @@ class GameSession:
             "turn": len(self.history),
         }
         self.history.append(move_record)
+        self._touch("history")
 
         return {
             "success": True,
@@ -158,6 +232,7 @@ class GameSession:
             "meeple_options": meeple_positions if has_meeple_options else [],
         }
 
+    @_action
     def place_meeple(self, player_id: str, position: str) -> dict:
         if self.phase != "playing":
             return {"error": "Game is not in playing phase"}
@@ -170,7 +245,7 @@ class GameSession:
             return {"error": "No tile placed this turn"}
 
         x, y = self.last_placed_coord
-        meeple_nodes = set(m.node_id for m in self.meeples.placed)
+        meeple_nodes = self.meeples.node_ids
         valid = self.board.get_valid_meeple_positions(x, y, meeple_nodes)
         valid_positions = {v["position"] for v in valid}
 
@@ -180,6 +255,10 @@ class GameSession:
         meeple = Meeple(player_id, x, y, position)
         if not self.meeples.place(meeple):
             return {"error": "No meeples available"}
+        self._touch("meeples")
+        self._record("meeple", player_id=player_id, position=position)
+        self._log("meeple", meeple={"player_id": player_id, "x": x, "y": y,
+                                    "position": position, "type": meeple.meeple_type})
 
         events = self._finish_turn()
         return {
@@ -188,6 +267,7 @@ class GameSession:
             "score_events": [self._event_to_dict(e) for e in events],
         }
 
+    @_action
     def skip_meeple(self, player_id: str) -> dict:
         if self.phase != "playing":
             return {"error": "Game is not in playing phase"}
@@ -197,6 +277,7 @@ class GameSession:
         if not cp or cp.id != player_id:
             return {"error": "Not your turn"}
 
+        self._record("skip", player_id=player_id)
         events = self._finish_turn()
         return {
             "success": True,
@@ -205,6 +286,7 @@ class GameSession:
 
     # ── Engineer Action ──
 
+    @_action
     def use_engineer(self, player_id: str, target_x: int, target_y: int) -> dict:
         if not self.engineer:
             return {"error": "Engineer not enabled"}
@@ -230,6 +312,9 @@ class GameSession:
             return {"error": "Rotation failed"}
 
         self.engineer.use_engineer(player_id)
+        self._touch("board")
+        self._record("engineer", player_id=player_id, x=target_x, y=target_y)
+        self._log("tile", tile=self.board.tile_dict((target_x, target_y)))
 
         self.history.append({
             "player_id": player_id,
@@ -237,11 +322,18 @@ class GameSession:
             "x": target_x, "y": target_y,
             "turn": len(self.history),
         })
+        self._touch("history")
 
-        events = self.scoring.check_and_score_completed(len(self.history))
+        scored, standing = len(self.score_events), set(self.meeples.node_ids)
+        events = self.scoring.check_and_score_completed(
+            len(self.history), [(target_x, target_y)]
+        )
         for e in events:
             self.players[e.player_id].score += e.points
             self.score_events.append(self._event_to_dict(e))
+        if events:
+            self._touch("scores", "meeples")
+            self._log_scoring(scored, standing)
 
         return {
             "success": True,
@@ -250,6 +342,7 @@ class GameSession:
             "score_events": [self._event_to_dict(e) for e in events],
         }
 
+    @_query
     def get_engineer_targets(self, player_id: str) -> List[dict]:
         if not self.engineer or not self.engineer.has_engineer(player_id):
             return []
@@ -261,22 +354,34 @@ class GameSession:
 
     def _finish_turn(self) -> List[ScoreEvent]:
         turn = len(self.history)
-        events = self.scoring.check_and_score_completed(turn)
+        coords = [self.last_placed_coord] if self.last_placed_coord else None
+        scored, standing = len(self.score_events), set(self.meeples.node_ids)
+        events = self.scoring.check_and_score_completed(turn, coords)
 
         for e in events:
             self.players[e.player_id].score += e.points
             self.score_events.append(self._event_to_dict(e))
+        if events:
+            self._touch("scores", "meeples")
+            self._log_scoring(scored, standing)
 
         self.last_placed_coord = None
         self.turn_phase = "place_tile"
         self.current_turn_idx = (self.current_turn_idx + 1) % len(self.turn_order)
+        self._touch()
 
         if self.deck.remaining() == 0 and all(len(p.hand) == 0 for p in self.players.values()):
             self._end_game()
 
+        # the turn is final; drop its undo records rather than keep (and
+        # snapshot) them for the rest of the game
+        self.board.commit()
+        self.meeples.commit()
         return events
 
     def _end_game(self):
+        self._touch("scores", "meeples")
+        scored, standing = len(self.score_events), set(self.meeples.node_ids)
         turn = len(self.history)
         end_events = self.scoring.score_end_game(turn)
         for e in end_events:
@@ -296,10 +401,12 @@ class GameSession:
                         "tiles": [], "turn": turn,
                     })
 
+        self._log_scoring(scored, standing)
         self.phase = "finished"
 
     # ── Query Methods ──
 
+    @_query
     def get_valid_moves(self, player_id: str) -> List[dict]:
         cp = self.current_player()
         if not cp or cp.id != player_id:
@@ -316,6 +423,7 @@ class GameSession:
                 })
         return moves
 
+    @_query
     def get_meeple_options(self, player_id: str) -> List[dict]:
         if self.turn_phase != "place_meeple":
             return []
@@ -325,11 +433,12 @@ class GameSession:
         if not self.last_placed_coord:
             return []
         x, y = self.last_placed_coord
-        meeple_nodes = set(m.node_id for m in self.meeples.placed)
+        meeple_nodes = self.meeples.node_ids
         return self.board.get_valid_meeple_positions(x, y, meeple_nodes)
 
     # ── Bot Support ──
 
+    @_action
     def try_bot_turn(self) -> Optional[dict]:
         cp = self.current_player()
         if not cp or not cp.is_bot or self.phase != "playing":
@@ -347,8 +456,7 @@ class GameSession:
         bot_state = self._build_bot_state(cp)
         move = cp.bot.choose_move(bot_state)
         if not move:
-            self.turn_phase = "place_tile"
-            self.current_turn_idx = (self.current_turn_idx + 1) % len(self.turn_order)
+            self._pass_turn(cp.id)
             return {"skipped": True}
 
         result = self.make_move(cp.id, move.tile_idx, move.x, move.y, move.rotation)
@@ -364,6 +472,13 @@ class GameSession:
 
         return result
 
+    def _pass_turn(self, player_id: str):
+        """The bot to move found no legal placement: hand the turn on."""
+        self._record("pass", player_id=player_id)
+        self.turn_phase = "place_tile"
+        self.current_turn_idx = (self.current_turn_idx + 1) % len(self.turn_order)
+        self._touch()
+
     def _build_bot_state(self, player: Player) -> dict:
         placed_nodes = set(m.node_id for m in self.meeples.placed)
         opponent_ids = [pid for pid in self.turn_order if pid != player.id]
@@ -381,12 +496,89 @@ class GameSession:
             "deck_remaining": self.deck.remaining(),
         }
 
-    def get_analytics(self) -> dict:
-        return compute_analytics(
-            self.board, self.meeples, self.players,
-            self.history, self.deck.remaining()
+    def _touch(self, *inputs: str):
+        self.version += 1
+        for name in inputs:
+            self.versions[name] = self.version
+
+    # ── Action Journal ──
+
+    def _record(self, action: str, **args):
+        args["action"] = action
+        self.actions.append(args)
+
+    @_action
+    def apply(self, action: dict) -> dict:
+        """
+        Redo one journaled action (as recorded in actions). Bot moves come
+        back as the placements they made, so replays never run a bot.
+        """
+        args = dict(action)
+        kind = args.pop("action")
+        if kind == "join":
+            return {"player": self.add_player(**args).id}
+        if kind == "place":
+            return self.make_move(args["player_id"], args["tile_idx"],
+                                  args["x"], args["y"], args["rotation"])
+        if kind == "meeple":
+            return self.place_meeple(args["player_id"], args["position"])
+        if kind == "skip":
+            return self.skip_meeple(args["player_id"])
+        if kind == "engineer":
+            return self.use_engineer(args["player_id"], args["x"], args["y"])
+        if kind == "pass":
+            self._pass_turn(args["player_id"])
+            return {"skipped": True}
+        return {"error": f"Unknown action: {kind}"}
+
+    def __getstate__(self):
+        # the lock, event bus and analytics engine (executor, futures) are
+        # per-process; they are rebuilt on load, with the change log empty
+        state = self.__dict__.copy()
+        for name in ("lock", "events", "analytics"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+        self.events = EventBus(CHANGE_LOG_SIZE, version=self.version)
+        self.analytics = AnalyticsEngine(
+            self.board, self.meeples, self.players, self.history, self.deck.remaining(),
+            versions=self.versions, executor=background_executor(),
         )
 
+    # ── Change Log ──
+
+    def _log(self, kind: str, **change):
+        change["version"] = self.version
+        change["type"] = kind
+        self.events.append(change)
+
+    def _log_scoring(self, scored: int, standing: set):
+        """Log score events after index scored and meeples gone since standing."""
+        for event in self.score_events[scored:]:
+            self._log("score", event=event)
+        for x, y, position in standing - self.meeples.node_ids:
+            self._log("meeple_removed", meeple={"x": x, "y": y, "position": position})
+
+    def changes_since(self, version: int) -> Optional[List[dict]]:
+        """
+        Changes made after version, oldest first, or None when the log no
+        longer reaches back that far (or version is from the future).
+        """
+        if version > self.version:
+            return None
+        return self.events.since(version)
+
+    @_query
+    def get_analytics(self, metric: Optional[str] = None) -> dict:
+        """Every metric, or just {metric: value}; KeyError for an unknown metric."""
+        self.analytics.deck_remaining = self.deck.remaining()
+        if metric is not None:
+            return {metric: self.analytics.metric(metric)}
+        return self.analytics.compute_all()
+
     # ── Serialization ──
 
     def _event_to_dict(self, e) -> dict:
@@ -401,7 +593,12 @@ class GameSession:
             "turn": e.turn,
         }
 
-    def to_dict(self, for_player: Optional[str] = None) -> dict:
+    def to_dict(self, for_player: Optional[str] = None, since: Optional[int] = None) -> dict:
+        """
+        Full state, or with since a delta: the same status fields, but the
+        board and meeples replaced by the changes made after that version.
+        Falls back to the full state when since is out of the log's reach.
+        """
         players_data = {}
         for pid, p in self.players.items():
             pd = p.to_dict()
@@ -414,10 +611,9 @@ class GameSession:
 
         result = {
             "id": self.id,
+            "version": self.version,
             "phase": self.phase,
             "turn_phase": self.turn_phase,
-            "board": self.board.to_dict(),
-            "meeples": self.meeples.to_dict(),
             "players": players_data,
             "current_player": self.current_player().id if self.current_player() else None,
             "deck_remaining": self.deck.remaining(),
@@ -435,4 +631,11 @@ class GameSession:
         elif self.objectives:
             result["objectives"] = self.objectives.to_dict()
 
+        changes = self.changes_since(since) if since is not None else None
+        if changes is None:
+            result["board"] = self.board.to_dict()
+            result["meeples"] = self.meeples.to_dict()
+        else:
+            result["since"] = since
+            result["changes"] = changes
         return result
@@ -0,0 +1,210 @@
+import json
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .session import GameSession
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id TEXT PRIMARY KEY,
+    num_players INTEGER NOT NULL,
+    rules TEXT NOT NULL,
+    seed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    PRIMARY KEY (game_id, seq)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    game_id TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    state BLOB NOT NULL
+);
+"""
+
+
+class GameStore:
+    """
+    Event-sourced game storage: each game is a row of creation parameters
+    (id, players, rules, seed) plus its journaled actions (see
+    GameSession.actions) appended to a SQLite log, with a pickled session
+    snapshot every snapshot_every actions. Loading a game replays the
+    actions after its latest snapshot.
+
+    The `capacity` most recently used sessions stay in memory; older ones
+    are snapshotted and dropped. Several processes may share one database:
+    before handing out a cached game the store replays any actions another
+    process appended, and save() refuses (returns False) to append after
+    an action it had not seen.
+    """
+
+    def __init__(self, path: str = ":memory:", capacity: int = 128, snapshot_every: int = 25):
+        self.capacity = capacity
+        self.snapshot_every = snapshot_every
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._hot: "OrderedDict[str, GameSession]" = OrderedDict()
+        self._saved: Dict[str, int] = {}     # actions of each hot game on disk
+        self._snapshot: Dict[str, int] = {}  # actions covered by its latest snapshot
+
+    def create(self, num_players: int = 2, custom_rules: Optional[dict] = None,
+               seed: Optional[int] = None) -> GameSession:
+        game = GameSession(num_players=num_players, custom_rules=custom_rules, seed=seed)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO games (id, num_players, rules, seed) VALUES (?, ?, ?, ?)",
+                (game.id, num_players, json.dumps(custom_rules or {}), game.seed),
+            )
+            self._saved[game.id] = self._snapshot[game.id] = 0
+            self._cache(game)
+        return game
+
+    def get(self, game_id: str) -> Optional[GameSession]:
+        """The live session for game_id, loaded or brought up to date as needed."""
+        with self._lock:
+            game = self._hot.get(game_id)
+            if game is None:
+                game = self._load(game_id)
+                if game is None:
+                    return None
+                self._cache(game)
+            else:
+                self._hot.move_to_end(game_id)
+                self._catch_up(game)
+            return game
+
+    def save(self, game: GameSession) -> bool:
+        """
+        Append the actions game made since it was last saved. False if an
+        action was appended first elsewhere (another process, or the reloaded
+        copy of a game evicted while this one was in use); the game is then
+        dropped from memory so the next get() reloads the logged truth.
+        """
+        with self._lock, game.lock:
+            hot = self._hot.get(game.id) is game
+            if hot:
+                saved = self._saved[game.id]
+            else:
+                saved = self._db.execute(
+                    "SELECT COUNT(*) FROM events WHERE game_id = ?", (game.id,)).fetchone()[0]
+            new = game.actions[saved:]
+            if not new:
+                return True
+            try:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO events (game_id, seq, action) VALUES (?, ?, ?)",
+                        [(game.id, saved + i, json.dumps(a)) for i, a in enumerate(new)],
+                    )
+            except sqlite3.IntegrityError:
+                if hot:
+                    self._drop(game.id)
+                return False
+            if hot:
+                self._saved[game.id] = len(game.actions)
+                if len(game.actions) - self._snapshot[game.id] >= self.snapshot_every:
+                    self._write_snapshot(game)
+            return True
+
+    def __contains__(self, game_id: str) -> bool:
+        with self._lock:
+            return game_id in self._hot or self._db.execute(
+                "SELECT 1 FROM games WHERE id = ?", (game_id,)).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            for game_id in list(self._hot):
+                self._evict(game_id)
+            self._db.close()
+
+    # ── Loading ──
+
+    def _load(self, game_id: str) -> Optional[GameSession]:
+        row = self._db.execute(
+            "SELECT seq, state FROM snapshots WHERE game_id = ?", (game_id,)).fetchone()
+        if row is not None:
+            seq, state = row
+            game = pickle.loads(state)
+        else:
+            params = self._db.execute(
+                "SELECT num_players, rules, seed FROM games WHERE id = ?", (game_id,)).fetchone()
+            if params is None:
+                return None
+            num_players, rules, seed = params
+            seq = 0
+            game = GameSession(game_id, num_players, json.loads(rules), seed=seed)
+        self._saved[game_id] = self._snapshot[game_id] = seq
+        self._catch_up(game)
+        return game
+
+    def _catch_up(self, game: GameSession):
+        """Replay actions other processes appended after the ones game has."""
+        with game.lock:
+            if len(game.actions) > self._saved[game.id]:
+                return  # actions not yet saved: save() appends them or finds the conflict
+            rows = self._db.execute(
+                "SELECT seq, action FROM events WHERE game_id = ? AND seq >= ? ORDER BY seq",
+                (game.id, len(game.actions)),
+            ).fetchall()
+            for _, action in rows:
+                game.apply(json.loads(action))
+            if rows:
+                # _saved counts rows on disk, whatever the game holds beyond them
+                self._saved[game.id] = rows[-1][0] + 1
+
+    def behind(self, game: GameSession) -> bool:
+        """
+        Whether another process logged actions this copy of game lacks: one
+        indexed lookup, leaving the cache and the game alone, for watchers
+        that only need to know when to get() it again.
+        """
+        with self._lock:
+            last = self._db.execute(
+                "SELECT MAX(seq) FROM events WHERE game_id = ?", (game.id,)).fetchone()[0]
+        return last is not None and last >= len(game.actions)
+
+    # ── Memory ──
+
+    def _cache(self, game: GameSession):
+        self._hot[game.id] = game
+        while len(self._hot) > self.capacity:
+            self._evict(next(iter(self._hot)))
+
+    def _evict(self, game_id: str):
+        game = self._hot[game_id]
+        if self.save(game) and self._snapshot[game_id] < len(game.actions):
+            self._write_snapshot(game)
+        self._drop(game_id)
+
+    def _drop(self, game_id: str):
+        game = self._hot.pop(game_id, None)
+        self._saved.pop(game_id, None)
+        self._snapshot.pop(game_id, None)
+        if game is not None:
+            game.events.close()
+
+    def _write_snapshot(self, game: GameSession):
+        with game.lock:
+            state = pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+            seq = len(game.actions)
+        with self._db:
+            # another process may have snapshotted further already; keep the newest
+            self._db.execute(
+                "INSERT INTO snapshots (game_id, seq, state) VALUES (?, ?, ?) "
+                "ON CONFLICT (game_id) DO UPDATE SET seq = excluded.seq, state = excluded.state "
+                "WHERE excluded.seq > snapshots.seq",
+                (game.id, seq, state),
+            )
+        self._snapshot[game.id] = seq
@@ -1,7 +1,8 @@
 from enum import IntEnum
 from dataclasses import dataclass, field
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import copy
+import itertools
 
 
 class EdgeType(IntEnum):
@@ -22,6 +23,8 @@ SIDE_NAMES = ["N", "E", "S", "W"]
 OPPOSITE = {"N": "S", "E": "W", "S": "N", "W": "E"}
 SIDE_INDEX = {"N": 0, "E": 1, "S": 2, "W": 3}
 NEIGHBOR_OFFSET = {"N": (0, -1), "E": (1, 0), "S": (0, 1), "W": (-1, 0)}
+ROTATIONS = (0, 90, 180, 270)
+NO_NEIGHBOR = -1  # wildcard side in a slot's required edge pattern
 
 
 @dataclass
@@ -32,32 +35,130 @@ class TileDef:
     center: int = CenterType.NONE
     shield: bool = False
     count: int = 1
+    # the four Orientations, built on first use by orientations()
+    _orientations: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_orientations"] = None  # rebuilt on demand after unpickling
+        return state
+
+
+class Orientation:
+    """
+    One TileDef turned to one rotation, precomputed once and shared by every
+    tile placed that way: rotated edges and connections as tuples, plus
+    per-side bitmasks (bit i = side i in N/E/S/W order).
+    """
+
+    __slots__ = ("tile_def", "tile_type", "rotation", "center", "shield",
+                 "edges", "connections", "links", "type_masks", "stub_mask")
+
+    def __init__(self, tile_def: TileDef, rotation: int):
+        steps = rotation // 90
+        self.tile_def = tile_def
+        self.tile_type = tile_def.tile_type
+        self.rotation = rotation
+        self.center = tile_def.center
+        self.shield = tile_def.shield
+        self.edges: Tuple[int, ...] = rotate_edges(tile_def.edges, rotation)
+        self.connections: Tuple[Tuple[int, int], ...] = tuple(
+            ((a + steps) % 4, (b + steps) % 4) for a, b in tile_def.internal_connections
+        )
+        links = [0, 0, 0, 0]
+        for a, b in self.connections:
+            links[a] |= 1 << b
+            links[b] |= 1 << a
+        self.links: Tuple[int, ...] = tuple(links)  # sides each side connects to
+        self.type_masks: Tuple[int, ...] = tuple(  # sides showing FIELD, ROAD, CITY
+            sum(1 << i for i, e in enumerate(self.edges) if e == t) for t in EdgeType
+        )
+        # road sides that end on this tile (no connection, not a crossroad)
+        self.stub_mask = 0 if self.center == CenterType.CROSSROAD else sum(
+            1 << i for i, e in enumerate(self.edges) if e == EdgeType.ROAD and not links[i]
+        )
+
+    def __repr__(self):
+        return f"Orientation({self.tile_type!r}, {self.rotation})"
+
+
+def orientations(tile_def: TileDef) -> tuple:
+    """The catalog entries of tile_def for rotations 0, 90, 180 and 270."""
+    cached = tile_def._orientations
+    if cached is None:
+        cached = tile_def._orientations = tuple(Orientation(tile_def, r) for r in ROTATIONS)
+    return cached
+
+
+def orientation(tile_def: TileDef, rotation: int) -> Orientation:
+    return orientations(tile_def)[(rotation // 90) % 4]
 
 
-@dataclass
 class PlacedTile:
-    tile_type: str
-    edges: List[int]
-    internal_connections: List[Tuple[int, int]]
-    center: int
-    shield: bool
-    rotation: int  # 0, 90, 180, 270
-    x: int = 0
-    y: int = 0
+    """A tile on the board: its catalog Orientation plus where it lies."""
+
+    __slots__ = ("orientation", "x", "y")
+
+    def __init__(self, orientation: Orientation, x: int = 0, y: int = 0):
+        self.orientation = orientation
+        self.x = x
+        self.y = y
+
+    @property
+    def tile_def(self) -> TileDef:
+        return self.orientation.tile_def
+
+    @property
+    def tile_type(self) -> str:
+        return self.orientation.tile_type
+
+    @property
+    def edges(self) -> List[int]:
+        """Unrotated edges, as in the TileDef."""
+        return self.orientation.tile_def.edges
+
+    @property
+    def internal_connections(self) -> List[Tuple[int, int]]:
+        return self.orientation.tile_def.internal_connections
+
+    @property
+    def center(self) -> int:
+        return self.orientation.center
+
+    @property
+    def shield(self) -> bool:
+        return self.orientation.shield
+
+    @property
+    def rotation(self) -> int:
+        return self.orientation.rotation
+
+    @rotation.setter
+    def rotation(self, rotation: int):
+        self.orientation = orientation(self.orientation.tile_def, rotation)
+
+    @property
+    def rotated_edges(self) -> Tuple[int, ...]:
+        return self.orientation.edges
+
+    @property
+    def rotated_connections(self) -> Tuple[Tuple[int, int], ...]:
+        return self.orientation.connections
+
+    def __reduce__(self):
+        return create_placed_tile, (self.orientation.tile_def, self.rotation, self.x, self.y)
 
     def get_edge(self, side: str) -> int:
-        idx = SIDE_INDEX[side]
-        steps = self.rotation // 90
-        original_idx = (idx - steps) % 4
-        return self.edges[original_idx]
+        return self.orientation.edges[SIDE_INDEX[side]]
 
     def get_rotated_edges(self) -> List[int]:
-        steps = self.rotation // 90
-        return self.edges[-steps:] + self.edges[:-steps] if steps else list(self.edges)
+        return list(self.orientation.edges)
 
     def get_rotated_connections(self) -> List[Tuple[int, int]]:
-        steps = self.rotation // 90
-        return [((a + steps) % 4, (b + steps) % 4) for a, b in self.internal_connections]
+        return list(self.orientation.connections)
+
+    def __repr__(self):
+        return f"PlacedTile({self.tile_type!r}, rotation={self.rotation}, x={self.x}, y={self.y})"
 
 
 TILE_DEFS: List[TileDef] = [
@@ -99,13 +200,42 @@ TILE_DEFS: List[TileDef] = [
 
 
 def create_placed_tile(tile_def: TileDef, rotation: int = 0, x: int = 0, y: int = 0) -> PlacedTile:
-    return PlacedTile(
-        tile_type=tile_def.tile_type,
-        edges=list(tile_def.edges),
-        internal_connections=list(tile_def.internal_connections),
-        center=tile_def.center,
-        shield=tile_def.shield,
-        rotation=rotation,
-        x=x,
-        y=y,
-    )
+    return PlacedTile(orientation(tile_def, rotation), x, y)
+
+
+# ── Edge-pattern compatibility index ──
+#
+# A slot's required pattern holds, per side, the edge type its neighbour
+# shows across that side (NO_NEIGHBOR if empty). Legal rotations for a tile
+# depend only on its edge signature and that pattern, so they are tabulated
+# once per signature and move generation becomes a dict lookup.
+
+Pattern = Tuple[int, int, int, int]
+
+_ROTATION_TABLES: Dict[Tuple[int, ...], Dict[Pattern, Tuple[int, ...]]] = {}
+
+
+def rotate_edges(edges, rotation: int) -> Tuple[int, ...]:
+    steps = rotation // 90
+    edges = tuple(edges)
+    return edges[-steps:] + edges[:-steps] if steps else edges
+
+
+def rotation_table(tile_def: TileDef) -> Dict[Pattern, Tuple[int, ...]]:
+    """pattern -> rotations of tile_def that match it (empty for no neighbours)."""
+    signature = tuple(tile_def.edges)
+    table = _ROTATION_TABLES.get(signature)
+    if table is None:
+        rotated = [(rot, rotate_edges(signature, rot)) for rot in ROTATIONS]
+        values = (NO_NEIGHBOR, EdgeType.FIELD, EdgeType.ROAD, EdgeType.CITY)
+        table = {}
+        for pattern in itertools.product(values, repeat=4):
+            if all(p == NO_NEIGHBOR for p in pattern):
+                table[pattern] = ()
+                continue
+            table[pattern] = tuple(
+                rot for rot, edges in rotated
+                if all(p == NO_NEIGHBOR or p == e for p, e in zip(pattern, edges))
+            )
+        _ROTATION_TABLES[signature] = table
+    return table
@@ -0,0 +1,264 @@
+"""
+Headless bot tournaments:
+
+    python -m game.tournament random expectimax "mcts:time_budget=0.1" \\
+        --games 500 --workers 8 --seed 1 --out results.jsonl
+
+Every pair of bots plays --games games, half with each seat order (a deck
+seed is dealt twice, once per seating). Games run on a process pool; each
+result is appended to --out as one JSON line as soon as it finishes, with
+the game's binary record in hex so it can be replayed. The summary rates
+the bots on the Elo scale and reports throughput, think times and memory.
+"""
+import argparse
+import ast
+import itertools
+import json
+import math
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .bots import create_bot
+from .record import GameRecord
+from .session import GameSession
+
+
+def parse_bot(spec: str) -> Tuple[str, dict]:
+    """"mcts:time_budget=0.2,rollout_depth=6" -> ("mcts", {...})."""
+    bot_type, _, params = spec.partition(":")
+    kwargs = {}
+    for item in filter(None, params.split(",")):
+        key, _, value = item.partition("=")
+        kwargs[key.strip()] = ast.literal_eval(value.strip())
+    return bot_type, kwargs
+
+
+def schedule(bots: List[str], games: int, seed: int) -> List[Tuple[int, int, Tuple[str, str]]]:
+    """(game index, deck seed, (first seat, second seat)) for a round robin."""
+    rng = random.Random(seed)
+    tasks = []
+    for a, b in itertools.combinations(bots, 2):
+        for i in range(games):
+            if i % 2 == 0:
+                deal = rng.randrange(2 ** 32)
+            tasks.append((len(tasks), deal, (a, b) if i % 2 == 0 else (b, a)))
+    return tasks
+
+
+def play_game(task: Tuple[int, int, Tuple[str, ...]]) -> dict:
+    index, seed, specs = task
+    random.seed(seed)  # RandomBot and the search bots' sampling use the module RNG
+    game = GameSession(num_players=len(specs), seed=seed)
+    seats = []
+    for spec in specs:
+        bot_type, kwargs = parse_bot(spec)
+        player = game.add_player(spec, is_bot=True, bot_type=bot_type)
+        player.bot = create_bot(bot_type, **kwargs)
+        seats.append(player.id)
+
+    think: Dict[str, List[float]] = {pid: [] for pid in seats}
+    start = time.perf_counter()
+    for _ in range(1000):
+        cp = game.current_player()
+        if cp is None:
+            break
+        t = time.perf_counter()
+        game.try_bot_turn()
+        think[cp.id].append((time.perf_counter() - t) * 1000)
+
+    return {
+        "game": index,
+        "seed": seed,
+        "bots": list(specs),
+        "scores": [game.players[pid].score for pid in seats],
+        "finished": game.phase == "finished",
+        "turns": len(game.history),
+        "seconds": time.perf_counter() - start,
+        "think_ms": [think[pid] for pid in seats],
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "record": GameRecord.from_session(game).encode().hex(),
+    }
+
+
+def run(bots: List[str], games: int = 100, workers: int = 1, seed: int = 0,
+        out: Optional[str] = None, bootstrap: int = 200) -> dict:
+    """Play the tournament, streaming results to out (JSON lines), and summarize."""
+    tasks = schedule(bots, games, seed)
+    results = []
+    sink = open(out, "w") if out else None
+    start = time.perf_counter()
+    try:
+        for result in _play_all(tasks, workers):
+            results.append(result)
+            if sink:
+                sink.write(json.dumps(result) + "\n")
+                sink.flush()
+    finally:
+        if sink:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    return summarize(results, bots, elapsed, bootstrap=bootstrap, seed=seed)
+
+
+def _play_all(tasks, workers: int) -> Iterable[dict]:
+    if workers <= 1:
+        yield from map(play_game, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for future in as_completed([pool.submit(play_game, t) for t in tasks]):
+            yield future.result()
+
+
+# ── Ratings ──
+
+def elo_ratings(results: List[dict], bots: List[str]) -> Dict[str, float]:
+    """
+    Bradley-Terry maximum likelihood on the Elo scale (400 log10 odds,
+    mean 1500), fitted with Hunter's MM iteration. A draw scores half a
+    win; one virtual draw per pair keeps winless bots finite.
+    """
+    idx = {b: i for i, b in enumerate(bots)}
+    n = len(bots)
+    wins = [[0.5 if i != j else 0.0 for j in range(n)] for i in range(n)]
+    for r in results:
+        (a, b), (sa, sb) = r["bots"], r["scores"]
+        i, j = idx[a], idx[b]
+        if i == j:
+            continue
+        win = 1.0 if sa > sb else 0.5 if sa == sb else 0.0
+        wins[i][j] += win
+        wins[j][i] += 1.0 - win
+    strength = [1.0] * n
+    for _ in range(1000):
+        new = []
+        for i in range(n):
+            total = sum(wins[i])
+            denom = sum((wins[i][j] + wins[j][i]) / (strength[i] + strength[j])
+                        for j in range(n) if j != i)
+            new.append(total / denom if denom else strength[i])
+        mean_log = sum(math.log(p) for p in new) / n
+        new = [p / math.exp(mean_log) for p in new]
+        done = max(abs(p - q) for p, q in zip(new, strength)) < 1e-10
+        strength = new
+        if done:
+            break
+    return {b: 1500 + 400 * math.log10(strength[idx[b]]) for b in bots}
+
+
+def rating_intervals(results: List[dict], bots: List[str], samples: int = 200,
+                     seed: int = 0, level: float = 0.95) -> Dict[str, Tuple[float, float]]:
+    """Percentile bootstrap interval of each rating, resampling whole games."""
+    rng = random.Random(seed)
+    draws = {b: [] for b in bots}
+    for _ in range(samples):
+        resample = [rng.choice(results) for _ in results]
+        for b, rating in elo_ratings(resample, bots).items():
+            draws[b].append(rating)
+    tail = (1 - level) / 2
+    out = {}
+    for b, values in draws.items():
+        values.sort()
+        out[b] = (_quantile(values, tail), _quantile(values, 1 - tail))
+    return out
+
+
+# ── Report ──
+
+def summarize(results: List[dict], bots: List[str], elapsed: float,
+              bootstrap: int = 200, seed: int = 0) -> dict:
+    ratings = elo_ratings(results, bots)
+    intervals = rating_intervals(results, bots, bootstrap, seed) if results and bootstrap else {}
+    think = {b: [] for b in bots}
+    record = {b: [0, 0, 0] for b in bots}  # wins, draws, losses
+    for r in results:
+        for seat, bot in enumerate(r["bots"]):
+            think[bot].extend(r["think_ms"][seat])
+            mine, theirs = r["scores"][seat], r["scores"][1 - seat]
+            record[bot][0 if mine > theirs else 1 if mine == theirs else 2] += 1
+    return {
+        "games": len(results),
+        "unfinished": sum(not r["finished"] for r in results),
+        "seconds": elapsed,
+        "games_per_second": len(results) / elapsed if elapsed else 0.0,
+        "peak_rss_mb": max([resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]
+                           + [r["peak_rss_kb"] for r in results]) / 1024,
+        "bots": {
+            b: {
+                "elo": ratings[b],
+                "elo_ci": intervals.get(b, (ratings[b], ratings[b])),
+                "wins": record[b][0], "draws": record[b][1], "losses": record[b][2],
+                "think_ms": _distribution(think[b]),
+            }
+            for b in bots
+        },
+    }
+
+
+def _distribution(values: List[float]) -> dict:
+    if not values:
+        return {"moves": 0}
+    values = sorted(values)
+    return {
+        "moves": len(values),
+        "mean": sum(values) / len(values),
+        "p50": _quantile(values, 0.5),
+        "p90": _quantile(values, 0.9),
+        "p99": _quantile(values, 0.99),
+        "max": values[-1],
+    }
+
+
+def _quantile(values: List[float], q: float) -> float:
+    """Linear-interpolated quantile of sorted values."""
+    pos = q * (len(values) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def format_summary(summary: dict) -> str:
+    lines = [
+        f"{summary['games']} games in {summary['seconds']:.1f}s "
+        f"({summary['games_per_second']:.2f} games/s), peak RSS {summary['peak_rss_mb']:.0f} MB"
+        + (f", {summary['unfinished']} unfinished" if summary["unfinished"] else ""),
+        "",
+        f"{'bot':<28} {'elo':>6} {'95% CI':>15} {'W-D-L':>13} "
+        f"{'think p50':>10} {'p90':>8} {'p99':>8} {'max':>8}",
+    ]
+    ranked = sorted(summary["bots"].items(), key=lambda kv: -kv[1]["elo"])
+    for bot, s in ranked:
+        t = s["think_ms"]
+        lo, hi = s["elo_ci"]
+        times = (f"{t['p50']:>8.1f}ms {t['p90']:>6.1f}ms {t['p99']:>6.1f}ms {t['max']:>6.1f}ms"
+                 if t["moves"] else "")
+        lines.append(f"{bot:<28} {s['elo']:>6.0f} {f'[{lo:.0f}, {hi:.0f}]':>15} "
+                     f"{s['wins']:>4}-{s['draws']}-{s['losses']:<4} {times}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m game.tournament",
+                                     description="Round-robin bot tournament with Elo ratings.")
+    parser.add_argument("bots", nargs="+",
+                        help='bot specs: a create_bot type, optionally "type:key=value,..."')
+    parser.add_argument("--games", type=int, default=100, help="games per pair of bots")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="JSON lines file for per-game results")
+    parser.add_argument("--bootstrap", type=int, default=200, help="rating CI resamples")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+    if len(set(args.bots)) < 2:
+        parser.error("need at least two different bot specs")
+
+    summary = run(args.bots, args.games, args.workers, args.seed, args.out, args.bootstrap)
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,6 +22,7 @@ class GameClient {
         this.validMoves = [];
         this.currentHand = [];
         this.pollTimer = null;
+        this.events = null;
         this.lastStateKey = '';
         this.hasBotOpponent = false;
         this.analyticsData = null;
@@ -132,15 +133,31 @@ class GameClient {
 
     // ── Polling ──
 
-    startPolling() { this.poll(); this.pollTimer = setInterval(() => this.poll(), 1200); }
+    // The server pushes each new state over SSE (EventSource resumes from the
+    // last event id on reconnect); interval polling is only the fallback.
+    startPolling() {
+        this.poll();
+        if (window.EventSource) {
+            this.events = new EventSource(`/api/games/${this.gameId}/events?player_id=${this.playerId}`);
+            this.events.addEventListener('state', e => this.onState(JSON.parse(e.data)));
+        } else {
+            this.pollTimer = setInterval(() => this.poll(), 1200);
+        }
+    }
 
     async poll() {
         if (!this.gameId || !this.playerId) return;
         try {
-            const resp = await fetch(`/api/games/${this.gameId}?player_id=${this.playerId}`);
-            if (!resp.ok) return;
-            const state = await resp.json();
-            this.gameState = state;
+            const since = this.gameState ? `&since=${this.gameState.version}` : '';
+            const resp = await fetch(`/api/games/${this.gameId}?player_id=${this.playerId}${since}`);
+            if (resp.ok) this.onState(await resp.json());
+        } catch (e) { console.error('Poll:', e); }
+    }
+
+    onState(update) {
+        try {
+            const state = this.applyState(update);
+            if (!state) return;
 
             const key = `${state.turn}-${state.turn_phase}-${state.phase}`;
             if (key === this.lastStateKey) return;
@@ -169,7 +186,33 @@ class GameClient {
 
             if (state.turn > 0 && state.turn % 3 === 0) this.fetchAnalytics();
             if (state.phase === 'finished') this.fetchAnalytics();
-        } catch (e) { console.error('Poll:', e); }
+        } catch (e) { console.error('State:', e); }
+    }
+
+    // A delta (state.changes) is replayed onto the board and meeples we hold;
+    // anything else is a full state and replaces them. Polls and pushes can
+    // cross, so states we are already past and deltas from another base are
+    // dropped (null).
+    applyState(state) {
+        const held = this.gameState;
+        if (held && state.version <= held.version) return null;
+        if (!state.changes) return (this.gameState = state);
+        if (!held || state.since !== held.version) return null;
+        const { board, meeples } = held;
+        const cell = (x, y) => `${x},${y}`;
+        for (const c of state.changes) {
+            if (c.type === 'tile') board.tiles[cell(c.tile.x, c.tile.y)] = c.tile;
+            else if (c.type === 'slots') {
+                const gone = new Set(c.removed.map(([x, y]) => cell(x, y)));
+                board.open_slots = board.open_slots.filter(([x, y]) => !gone.has(cell(x, y))).concat(c.added);
+            } else if (c.type === 'meeple') meeples.placed.push(c.meeple);
+            else if (c.type === 'meeple_removed') {
+                const m = c.meeple;
+                meeples.placed = meeples.placed.filter(p => p.x !== m.x || p.y !== m.y || p.position !== m.position);
+            }
+        }
+        delete state.changes;
+        return (this.gameState = { ...state, board, meeples });
     }
 
     async triggerBotTurn() {
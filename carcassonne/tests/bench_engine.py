@@ -0,0 +1,254 @@
+"""
+Engine performance benchmarks across board sizes.
+
+    python tests/bench_engine.py --out bench.json
+    python tests/bench_engine.py --baseline bench.json --threshold 0.5
+
+Boards of each size are grown from seeded random games (with extra decks
+for boards past one deck's 55 tiles). Each hot path is timed per call at
+every size, and its growth is summarised as the log-log slope of time
+against tile count. The run fails (exit status 1) when a path grows faster
+than its expected class allows, or, given --baseline, when it is slower
+than the baseline run by more than --threshold across the sizes.
+"""
+import sys, os, argparse, json, math, platform, random, time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from game.tile import EdgeType, TILE_DEFS
+from game.deck import Deck
+from game.bots import MinimaxBot
+from game.analytics import AnalyticsEngine, METRICS, _heatmap_from_rollouts
+from game.rollout import RolloutBoard
+from game.session import GameSession
+
+
+SIZES = (10, 40, 70, 200)
+
+# largest log-log slope each growth class may show before the run fails:
+# n log n still passes as linear over these sizes, n^1.5 does not
+LIMITS = {"constant": 0.4, "linear": 1.4}
+
+
+def seeded_game(tiles: int, seed: int) -> GameSession:
+    """
+    A two-player game of random placements, claiming a random feature
+    whenever a meeple can go down, until tiles tiles are on the board.
+    """
+    rng = random.Random(seed)
+    game = GameSession(seed=seed, custom_rules={"objectives": False})
+    game.add_player("A")
+    game.add_player("B")
+    decks = math.ceil(tiles / len(game.deck.tiles)) + 1
+    game.deck.tiles = [t for _ in range(decks) for t in Deck(rng=rng).tiles]
+    while len(game.board.grid) < tiles:
+        cp = game.current_player()
+        if game.turn_phase == "place_meeple":
+            options = game.get_meeple_options(cp.id)
+            if options:
+                game.place_meeple(cp.id, rng.choice(options)["position"])
+            else:
+                game.skip_meeple(cp.id)
+            continue
+        moves = game.get_valid_moves(cp.id)
+        if not moves:
+            game.apply({"action": "pass", "player_id": cp.id})
+            continue
+        m = rng.choice(moves)
+        game.make_move(cp.id, m["tile_idx"], m["x"], m["y"], m["rotation"])
+    if game.turn_phase == "place_meeple":
+        game.skip_meeple(game.current_player().id)
+    return game
+
+
+def time_per_call(fn, min_time: float = 0.1, repeat: int = 5) -> float:
+    """Best per-call seconds over repeat batches, each sized to ~min_time / repeat."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1 << 16:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(16, int(min_time / repeat / elapsed) + 1))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def hot_paths(game: GameSession) -> dict:
+    """name -> (growth class, zero-argument callable) for one board."""
+    board, meeples, scoring = game.board, game.meeples, game.scoring
+    rng = random.Random(len(board.grid))
+    turn = len(game.history)
+    cp = game.current_player()
+
+    # a legal placement for the next tile, taken back after every timing call
+    tile_def, (coord, rotation) = next(
+        (td, p) for td in cp.hand + list(TILE_DEFS) for p in board.get_valid_placements(td)[:1])
+
+    def place_and_undo():
+        board.place_tile(tile_def, coord, rotation)
+        board.undo()
+
+    def score_placed():
+        board.place_tile(tile_def, coord, rotation)
+        mark = scoring.checkpoint()
+        scoring.check_and_score_completed(turn, [coord])
+        scoring.rollback(mark)
+        board.undo()
+
+    def score_scan():
+        mark = scoring.checkpoint()
+        scoring.check_and_score_completed(turn)
+        scoring.rollback(mark)
+
+    def score_end():
+        mark = scoring.checkpoint()
+        scoring.score_end_game(turn)
+        scoring.rollback(mark)
+
+    sample = rng.sample(sorted(board.grid), min(40, len(board.grid)))
+    nodes = meeples.node_ids
+
+    def meeple_positions():
+        for x, y in sample:
+            board.get_valid_meeple_positions(x, y, nodes)
+
+    def valid_placements():
+        for td in TILE_DEFS:
+            board.get_valid_placements(td)
+
+    def features():
+        for edge_type in (EdgeType.ROAD, EdgeType.CITY, EdgeType.FIELD):
+            board.get_features(edge_type)
+
+    # depth 1 with no effective budget times the search itself; the default
+    # bot (depth 2, 0.3 s budget) is what play uses, and the budget caps it
+    bot, state = MinimaxBot(max_depth=1, time_budget=60.0), game._build_bot_state(cp)
+    default_bot = MinimaxBot()
+    since = max(game.version - 4, 0)
+    paths = {
+        # per call, averaged over the 17 tile types / 3 feature kinds / sampled tiles
+        "get_valid_placements": ("linear", valid_placements, len(TILE_DEFS)),
+        "get_features": ("linear", features, 3),
+        "get_valid_meeple_positions": ("constant", meeple_positions, len(sample)),
+        "place_tile+undo": ("constant", place_and_undo, 1),
+        "check_and_score_completed": ("constant", score_placed, 1),
+        "check_and_score_completed[scan]": ("linear", score_scan, 1),
+        "score_end_game": ("linear", score_end, 1),
+        "MinimaxBot.choose_move[depth=1]": ("linear", lambda: bot.choose_move(state), 1),
+        "MinimaxBot.choose_move[depth=2]": ("linear", lambda: default_bot.choose_move(state), 1),
+        "GameSession.to_dict": ("linear", lambda: game.to_dict(cp.id), 1),
+        "GameSession.to_dict[since]": ("constant", lambda: game.to_dict(cp.id, since=since), 1),
+    }
+    # metrics straight from an unversioned engine, so nothing is memoized
+    engine = AnalyticsEngine(board, meeples, game.players, game.history, game.deck.remaining())
+    for name in METRICS:
+        paths[f"analytics.{name}"] = ("linear", lambda name=name: engine.metric(name), 1)
+    # the heatmap skips its rollouts once one deck's worth of a tile type is
+    # down or no open city is claimed, so time them directly: every open
+    # city, a full deck, a fixed seed
+    cities = [f for f in board.features.features(EdgeType.CITY) if not f.complete]
+    deck = Deck(shuffle=False).tiles
+    paths["analytics.heatmap"] = ("linear", lambda: _heatmap_from_rollouts(
+        RolloutBoard(board, cities), deck, 200, 0, 1, 1.96), 1)
+    return paths
+
+
+def slope(sizes, times) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    x, y = np.log(sizes), np.log(times)
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run(sizes=SIZES, seed: int = 0, min_time: float = 0.1, log=print) -> dict:
+    results, built = {}, []
+    for size in sizes:
+        game = seeded_game(size, seed + size)
+        built.append(len(game.board.grid))
+        for name, (growth, fn, calls) in hot_paths(game).items():
+            entry = results.setdefault(name, {"growth": growth, "per_call_us": {}})
+            entry["per_call_us"][str(size)] = time_per_call(fn, min_time) / calls * 1e6
+        log(f"  {size:4d} tiles timed")
+    for entry in results.values():
+        entry["exponent"] = slope(built, [entry["per_call_us"][str(s)] for s in sizes])
+    return {
+        "meta": {
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "seed": seed, "min_time": min_time,
+        },
+        "sizes": list(sizes),
+        "results": results,
+    }
+
+
+def check(report: dict, baseline: dict = None, threshold: float = 0.5) -> list:
+    """Failure messages: super-linear growth and, with a baseline, regressions."""
+    failures = []
+    for name, entry in report["results"].items():
+        limit = LIMITS[entry["growth"]]
+        if entry["exponent"] > limit:
+            failures.append(f"{name}: grows as n^{entry['exponent']:.2f}, "
+                            f"{entry['growth']} allows n^{limit}")
+        old = (baseline or {}).get("results", {}).get(name, {}).get("per_call_us", {})
+        # geometric mean over the sizes both runs timed, so one noisy point
+        # does not fail the run on its own
+        ratios = [us / old[size] for size, us in entry["per_call_us"].items() if old.get(size)]
+        if ratios:
+            slowdown = math.exp(sum(map(math.log, ratios)) / len(ratios))
+            if slowdown > 1 + threshold:
+                failures.append(f"{name}: {(slowdown - 1) * 100:.0f}% slower than the baseline "
+                                f"(allowed {threshold * 100:.0f}%)")
+    return failures
+
+
+def format_report(report: dict) -> str:
+    sizes = report["sizes"]
+    lines = [f"{'path':<34}" + "".join(f"{f'{s} tiles':>12}" for s in sizes) + f"{'slope':>8}  growth"]
+    for name, entry in report["results"].items():
+        times = "".join(f"{_us(entry['per_call_us'][str(s)]):>12}" for s in sizes)
+        lines.append(f"{name:<34}{times}{entry['exponent']:>8.2f}  {entry['growth']}")
+    return "\n".join(lines)
+
+
+def _us(us: float) -> str:
+    return f"{us / 1000:.2f}ms" if us >= 1000 else f"{us:.1f}us"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds spent per timing")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.5,
+                        help="allowed slowdown against the baseline (0.5 = 50%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.seed, args.min_time)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report["failures"] = check(report, baseline, args.threshold)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(format_report(report))
+    for failure in report["failures"]:
+        print(f"FAIL: {failure}")
+    print("\nBENCHMARKS PASSED" if not report["failures"] else "\nBENCHMARKS FAILED")
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
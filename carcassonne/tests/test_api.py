@@ -1,8 +1,11 @@
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CARCASSONNE_DB", ":memory:")
 
 import json
+import random
+import threading
 from app import app
 
 
@@ -121,7 +124,149 @@ def test_404():
     print("PASS: 404 handling")
 
 
+def _apply_delta(mirror, delta):
+    tiles, slots, placed = mirror
+    for c in delta["changes"]:
+        if c["type"] == "tile":
+            tiles[(c["tile"]["x"], c["tile"]["y"])] = c["tile"]
+        elif c["type"] == "slots":
+            slots -= {tuple(s) for s in c["removed"]}
+            slots |= {tuple(s) for s in c["added"]}
+        elif c["type"] == "meeple":
+            m = c["meeple"]
+            placed[(m["x"], m["y"], m["position"])] = m
+        elif c["type"] == "meeple_removed":
+            m = c["meeple"]
+            del placed[(m["x"], m["y"], m["position"])]
+
+
+def _mirror(state):
+    return (
+        {(t["x"], t["y"]): t for t in state["board"]["tiles"].values()},
+        {tuple(s) for s in state["board"]["open_slots"]},
+        {(m["x"], m["y"], m["position"]): m for m in state["meeples"]["placed"]},
+    )
+
+
+def test_delta_state():
+    client = app.test_client()
+    rng = random.Random(5)
+    game_id = client.post('/api/games', json={"num_players": 2}).get_json()["game_id"]
+    ids = [client.post(f'/api/games/{game_id}/join', json={"name": n}).get_json()["player_id"]
+           for n in ("Alice", "Bob")]
+    url = f'/api/games/{game_id}?player_id={ids[0]}'
+
+    resp = client.get(url)
+    state = resp.get_json()
+    mirror = _mirror(state)
+    assert client.get(url, headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+
+    actions = 0
+    while state["phase"] == "playing":
+        cp_id = state["current_player"]
+        if state["turn_phase"] == "place_meeple":
+            options = client.get(f'/api/games/{game_id}/meeple_options?player_id={cp_id}').get_json()["options"]
+            if options and rng.random() < 0.6:
+                client.post(f'/api/games/{game_id}/meeple',
+                            json={"player_id": cp_id, "position": rng.choice(options)["position"]})
+            else:
+                client.post(f'/api/games/{game_id}/skip_meeple', json={"player_id": cp_id})
+        else:
+            targets = client.get(f'/api/games/{game_id}/engineer_targets?player_id={cp_id}').get_json()["targets"]
+            if targets and actions > 20:
+                t = rng.choice(targets)
+                client.post(f'/api/games/{game_id}/engineer', json={"player_id": cp_id, "x": t["x"], "y": t["y"]})
+            moves = client.get(f'/api/games/{game_id}/moves?player_id={cp_id}').get_json()["moves"]
+            if not moves:
+                break
+            m = rng.choice(moves)
+            client.post(f'/api/games/{game_id}/place', json={"player_id": cp_id, **m})
+        actions += 1
+
+        resp = client.get(f'{url}&since={state["version"]}')
+        delta = resp.get_json()
+        assert "board" not in delta and delta["since"] == state["version"]
+        assert delta["version"] > state["version"]
+        assert client.get(f'{url}&since={state["version"]}',
+                          headers={"If-None-Match": resp.headers["ETag"]}).status_code == 304
+        _apply_delta(mirror, delta)
+        state = client.get(url).get_json()
+        assert mirror == _mirror(state), f"mirror diverged after {actions} actions"
+        assert {k: v for k, v in delta.items() if k not in ("since", "changes")} == \
+            {k: v for k, v in state.items() if k not in ("board", "meeples")}
+
+    assert actions > 40
+    # a client the log cannot bring up to date gets the full state back
+    stale = client.get(f'{url}&since=-1').get_json()
+    assert "board" in stale and "changes" not in stale
+    print(f"  {actions} actions replayed from deltas, final version {state['version']}")
+    print("PASS: delta state responses")
+
+
+def _read_events(resp, count):
+    """The next count `state` messages of an SSE response, as (id, data)."""
+    events, fields = [], {}
+    for chunk in resp.response:
+        for line in chunk.decode().split("\n"):
+            if line.startswith(("id:", "event:", "data:")):
+                name, value = line.split(":", 1)
+                fields[name] = value.strip()
+            elif not line and fields:
+                assert fields["event"] == "state"
+                events.append((int(fields["id"]), json.loads(fields["data"])))
+                fields = {}
+        if len(events) >= count:
+            return events
+    return events
+
+
+def test_event_stream():
+    client = app.test_client()
+    game_id = client.post('/api/games', json={"num_players": 2}).get_json()["game_id"]
+    ids = [client.post(f'/api/games/{game_id}/join', json={"name": n}).get_json()["player_id"]
+           for n in ("Alice", "Bob")]
+    url = f'/api/games/{game_id}/events?player_id={ids[1]}'
+    assert client.get('/api/games/nonexistent/events').status_code == 404
+
+    resp = client.get(url, buffered=False)
+    assert resp.mimetype == "text/event-stream"
+    (version, state), = _read_events(resp, 1)
+    assert "board" in state and version == state["version"]
+
+    # a move by the other player arrives as a pushed delta
+    m = client.get(f'/api/games/{game_id}/moves?player_id={ids[0]}').get_json()["moves"][0]
+    client.post(f'/api/games/{game_id}/place', json={"player_id": ids[0], **m})
+    (pushed, delta), = _read_events(resp, 1)
+    assert pushed > version and delta["since"] == version
+    assert {(c["tile"]["x"], c["tile"]["y"]) for c in delta["changes"] if c["type"] == "tile"} == \
+        {(m["x"], m["y"])}
+    assert "hand" in delta["players"][ids[1]] and "hand" not in delta["players"][ids[0]]
+    resp.close()
+
+    # reconnecting with Last-Event-ID resumes from that version
+    if delta["turn_phase"] == "place_meeple":
+        client.post(f'/api/games/{game_id}/skip_meeple', json={"player_id": ids[0]})
+    resp = client.get(url, buffered=False, headers={"Last-Event-ID": str(version)})
+    (resumed, delta), = _read_events(resp, 1)
+    assert delta["since"] == version and resumed == delta["version"] >= pushed
+    assert delta["current_player"] == ids[1]
+    assert any(c["type"] == "tile" for c in delta["changes"])
+
+    # the stream is now caught up and blocks until the next move is made
+    m = client.get(f'/api/games/{game_id}/moves?player_id={ids[1]}').get_json()["moves"][0]
+    mover = threading.Timer(0.05, lambda: app.test_client().post(
+        f'/api/games/{game_id}/place', json={"player_id": ids[1], **m}))
+    mover.start()
+    (woken, delta), = _read_events(resp, 1)
+    mover.join()
+    assert delta["since"] == resumed and woken > resumed
+    resp.close()
+    print("PASS: event stream")
+
+
 if __name__ == "__main__":
     test_api()
     test_404()
+    test_delta_state()
+    test_event_stream()
     print("\n=== ALL API TESTS PASSED ===")
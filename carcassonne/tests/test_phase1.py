@@ -45,6 +45,46 @@ def test_tile_get_edge():
     print("PASS: tile get_edge")
 
 
+def test_orientation_catalog():
+    import pickle
+    from game.tile import orientation
+
+    for td in TILE_DEFS:
+        for rot in (0, 90, 180, 270):
+            a = create_placed_tile(td, rot, 1, 2)
+            b = create_placed_tile(td, rot, 3, 4)
+            # tiles share one precomputed entry per (TileDef, rotation)
+            assert a.orientation is b.orientation is orientation(td, rot)
+            steps = rot // 90
+            edges = td.edges[-steps:] + td.edges[:-steps] if steps else list(td.edges)
+            assert a.get_rotated_edges() == edges
+            assert list(a.rotated_edges) == edges
+            connections = [((x + steps) % 4, (y + steps) % 4) for x, y in td.internal_connections]
+            assert a.get_rotated_connections() == connections
+            for i in range(4):
+                linked = {y if x == i else x for x, y in connections if i in (x, y)}
+                assert a.orientation.links[i] == sum(1 << j for j in linked)
+                stub = edges[i] == EdgeType.ROAD and not linked and \
+                    td.center != CenterType.CROSSROAD
+                assert bool(a.orientation.stub_mask >> i & 1) == stub
+
+    tile = create_placed_tile(TILE_DEFS[0], 0)
+    tile.rotation = 90
+    assert tile.orientation is orientation(TILE_DEFS[0], 90)
+    assert tile.get_rotated_edges() == [0, 1, 0, 1]
+
+    board = Board()
+    td = next(d for d in TILE_DEFS if d.tile_type == "city_edge")
+    coord, rot = board.get_valid_placements(td)[0]
+    board.place_tile(td, coord, rot)
+    grid = pickle.loads(pickle.dumps(board.grid))
+    for c, t in grid.items():
+        assert (t.tile_type, t.rotation, t.x, t.y) == \
+            (board.grid[c].tile_type, board.grid[c].rotation, c[0], c[1])
+        assert t.orientation is orientation(t.tile_def, t.rotation)
+    print("PASS: orientation catalog")
+
+
 def test_board_start_tile():
     board = Board()
     assert (0, 0) in board.grid
@@ -270,9 +310,156 @@ def test_serialization():
     print("PASS: serialization")
 
 
+def test_feature_index_tracks_merges():
+    board = Board()
+    straight = next(d for d in TILE_DEFS if d.tile_type == "straight_road")
+    city_edge = next(d for d in TILE_DEFS if d.tile_type == "city_edge")
+
+    board.place_tile(straight, (1, 0), 90)
+    road = board.get_feature((0, 0, "E"))
+    assert road is board.get_feature((1, 0, "E"))
+    assert road.edge_type == EdgeType.ROAD
+    assert road.tiles == {(0, 0), (1, 0)}
+    assert road.open_edges == 2  # (0,0,W) and (1,0,E)
+
+    city = board.get_feature((0, 0, "N"))
+    assert city.open_edges == 1
+    board.place_tile(city_edge, (0, -1), 180)
+    city = board.get_feature((0, 0, "N"))
+    assert city.nodes == {(0, 0, "N"), (0, -1, "S")}
+    assert city.open_edges == 0
+    assert board.is_feature_complete(city.nodes, EdgeType.CITY)
+
+    copied = board.get_feature_containing((0, 0, "N"))
+    assert copied == city.nodes and copied is not city.nodes
+    assert board.is_feature_complete(copied, EdgeType.CITY)
+    board.undo()
+    assert copied == {(0, 0, "N"), (0, -1, "S")}
+    assert board.get_feature_containing((0, 0, "N")) == {(0, 0, "N")}
+    board.place_tile(city_edge, (0, -1), 180)
+
+    assert board.get_feature_containing((0, 0, "CENTER")) is None
+    assert board.node_edge_type((0, 0, "N")) == EdgeType.CITY
+    assert board.node_edge_type((5, 5, "N")) is None
+    print("PASS: feature index tracks merges")
+
+
+def test_feature_index_matches_graph():
+    import random
+    import networkx as nx
+    random.seed(7)
+    game = GameSession(num_players=2)
+    board = game.board
+    for _ in range(40):
+        tile_def = game.deck.draw()
+        placements = board.get_valid_placements(tile_def)
+        if placements:
+            coord, rot = random.choice(placements)
+            board.place_tile(tile_def, coord, rot)
+
+    graph = board.feature_graph
+    for edge_type in (EdgeType.FIELD, EdgeType.ROAD, EdgeType.CITY):
+        nodes = [n for n in graph.nodes
+                 if n[2] != "CENTER" and graph.nodes[n]["edge_type"] == edge_type]
+        expected = sorted(sorted(c) for c in nx.connected_components(graph.subgraph(nodes)))
+        assert sorted(sorted(f) for f in board.get_features(edge_type)) == expected
+    print("PASS: feature index matches graph")
+
+
+def test_slot_patterns():
+    from game.tile import NO_NEIGHBOR, rotation_table
+    board = Board()
+    # start: N=city, E=road, S=field, W=road; the slot east of it sees a road on its W
+    assert board.slot_patterns[(1, 0)] == (NO_NEIGHBOR, NO_NEIGHBOR, NO_NEIGHBOR, EdgeType.ROAD)
+    assert set(board.slot_patterns) == board.open_slots
+
+    straight = next(d for d in TILE_DEFS if d.tile_type == "straight_road")
+    assert rotation_table(straight)[board.slot_patterns[(1, 0)]] == (90, 270)
+    assert ((1, 0), 90) in board.get_valid_placements(straight)
+
+    board.place_tile(straight, (1, 0), 90)
+    assert (1, 0) not in board.slot_patterns
+    # (1,-1) now has the straight's N (field) below it
+    assert board.slot_patterns[(1, -1)] == (NO_NEIGHBOR, NO_NEIGHBOR, EdgeType.FIELD, NO_NEIGHBOR)
+    assert set(board.slot_patterns) == board.open_slots
+    print("PASS: slot patterns")
+
+
+def test_board_undo():
+    board = Board()
+    straight = next(d for d in TILE_DEFS if d.tile_type == "straight_road")
+    city_edge = next(d for d in TILE_DEFS if d.tile_type == "city_edge")
+    before_slots = dict(board.slot_patterns)
+    before_road = set(board.get_feature((0, 0, "E")).nodes)
+
+    mark = board.checkpoint()
+    board.place_tile(straight, (1, 0), 90)
+    board.place_tile(city_edge, (0, -1), 180)
+    assert board.get_feature((0, 0, "N")).open_edges == 0
+
+    removed = board.undo()
+    assert removed.tile_type == "city_edge"
+    assert board.get_feature((0, 0, "N")).open_edges == 1
+    assert (0, -1) in board.open_slots
+
+    board.rollback(mark)
+    assert list(board.grid) == [(0, 0)]
+    assert board.slot_patterns == before_slots
+    assert board.open_slots == set(before_slots)
+    assert board.get_feature((0, 0, "E")).nodes == before_road
+    assert board.get_feature((1, 0, "W")) is None
+    print("PASS: board undo")
+
+
+def test_board_planes():
+    import random
+    from game.planes import BoardPlanes
+
+    random.seed(8)
+    board = Board()
+    planes = board.planes
+    deck = Deck()
+    mark = board.checkpoint()
+    while len(board.grid) < 40:
+        td = deck.draw()
+        placements = board.get_valid_placements(td)
+        if placements:
+            board.place_tile(td, *random.choice(placements))
+
+    # the planes grew around the board and mirror the grid cell for cell
+    assert planes.occupied.sum() == len(board.grid)
+    for (x, y), tile in board.grid.items():
+        row, col = planes.index(x, y)
+        assert planes.occupied[row, col]
+        assert list(planes.edges[:, row, col]) == list(tile.rotated_edges)
+    for x, y in board.open_slots:
+        assert not planes.occupied[planes.index(x, y)]
+
+    counts = planes.neighbour_counts()
+    for x, y in list(board.grid)[:10]:
+        around = sum((x + dx, y + dy) in board.grid for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+        assert counts[planes.index(x, y)] == around
+
+    board.rollback(mark)
+    assert planes.occupied.sum() == 1
+    assert (planes.edges != -1).sum() == 4
+
+    # growing keeps what is there and leaves room around the new tile
+    small = BoardPlanes(radius=1)
+    small.set_tile(0, 0, [2, 1, 0, 1])
+    small.set_tile(3, -4, [1, 1, 1, 1])
+    row, col = small.index(3, -4)
+    assert 1 <= row < small.shape[0] - 1 and 1 <= col < small.shape[1] - 1
+    assert list(small.edges[:, row, col]) == [1, 1, 1, 1]
+    assert list(small.edges[(slice(None),) + small.index(0, 0)]) == [2, 1, 0, 1]
+    assert small.occupied.sum() == 2
+    print(f"PASS: board planes ({planes.shape[0]}x{planes.shape[1]})")
+
+
 if __name__ == "__main__":
     test_tile_rotation()
     test_tile_get_edge()
+    test_orientation_catalog()
     test_board_start_tile()
     test_placement_validation()
     test_place_tile()
@@ -286,4 +473,9 @@ if __name__ == "__main__":
     test_full_game_simulation()
     test_city_completion()
     test_serialization()
+    test_feature_index_tracks_merges()
+    test_feature_index_matches_graph()
+    test_slot_patterns()
+    test_board_undo()
+    test_board_planes()
     print("\n=== ALL TESTS PASSED ===")
@@ -1,5 +1,6 @@
 import sys, os, random
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CARCASSONNE_DB", ":memory:")
 
 from game.tile import TileDef, EdgeType, CenterType, TILE_DEFS, create_placed_tile
 from game.board import Board
@@ -471,6 +472,199 @@ def test_api_meeple_flow():
     print("PASS: API meeple flow")
 
 
+def test_completion_counters():
+    board = Board()
+    city_edge = next(d for d in TILE_DEFS if d.tile_type == "city_edge")
+    monastery_road = next(d for d in TILE_DEFS if d.tile_type == "monastery_road")
+    straight = next(d for d in TILE_DEFS if d.tile_type == "straight_road")
+
+    # monastery_road south of start: its road stub faces the empty (0,2)
+    assert board.place_tile(monastery_road, (0, 1), 0)
+    stub = board.get_feature((0, 1, "S"))
+    assert stub.open_stubs == 1 and not stub.complete
+    assert board.features_completed_by((0, 1)) == []
+
+    assert board.place_tile(straight, (0, 2), 0)
+    road = board.get_feature((0, 1, "S"))
+    assert road.open_stubs == 0
+    assert board.is_feature_complete(road.nodes, EdgeType.ROAD)
+    assert road in board.features_completed_by((0, 2))
+
+    city = board.get_feature((0, 0, "N"))
+    assert not board.is_feature_complete(city.nodes, EdgeType.CITY)
+    assert board.place_tile(city_edge, (0, -1), 180)
+    completed = board.features_completed_by((0, -1))
+    assert [f.edge_type for f in completed] == [EdgeType.CITY]
+    assert completed[0].tiles == {(0, 0), (0, -1)}
+
+    # a detached copy of the nodes is still answered by walking it
+    assert board.is_feature_complete(set(completed[0].nodes), EdgeType.CITY)
+    print("PASS: completion counters")
+
+
+def test_scoring_rollback():
+    board = Board()
+    mgr = MeepleManager()
+    mgr.init_player("p1")
+    mgr.init_player("p2")
+    scoring = ScoringEngine(board, mgr)
+    mgr.place(Meeple("p2", 0, 0, "S"))
+    city_edge = next(d for d in TILE_DEFS if d.tile_type == "city_edge")
+
+    board_mark = board.checkpoint()
+    scoring_mark = scoring.checkpoint()
+    board.place_tile(city_edge, (0, -1), 180)
+    mgr.place(Meeple("p1", 0, 0, "N"))
+    events = scoring.check_and_score_completed(0)
+    assert [e.points for e in events] == [4]
+    assert mgr.available("p1") == MEEPLES_PER_PLAYER
+
+    scoring.rollback(scoring_mark)
+    board.rollback(board_mark)
+    assert scoring.score_log == []
+    assert [m.node_id for m in mgr.placed] == [(0, 0, "S")]
+    assert mgr.available("p1") == MEEPLES_PER_PLAYER
+    assert mgr.available("p2") == MEEPLES_PER_PLAYER - 1
+    assert (0, -1) not in board.grid
+
+    # a committed turn can no longer be taken back
+    board.place_tile(city_edge, (0, -1), 180)
+    mgr.place(Meeple("p1", 0, 0, "N"))
+    board.commit()
+    mgr.commit()
+    assert board._undo_stack == [] and mgr._undo_stack == []
+    assert board.checkpoint() == board_mark + 1
+    for rollback, mark in ((board.rollback, board_mark), (mgr.rollback, scoring_mark[1])):
+        try:
+            rollback(mark)
+            assert False, "rolled back past a commit"
+        except ValueError:
+            pass
+    assert (0, -1) in board.grid and len(mgr.placed) == 2
+    print("PASS: scoring rollback")
+
+
+def test_minimax_leaves_state_untouched():
+    game = GameSession(num_players=2)
+    p1 = game.add_player("Human")
+    p2 = game.add_player("Bot", is_bot=True, bot_type="minimax")
+    for _ in range(6):
+        game.try_bot_turn() if game.current_player().is_bot else None
+        cp = game.current_player()
+        if not cp.is_bot:
+            moves = game.get_valid_moves(cp.id)
+            m = moves[0]
+            game.make_move(cp.id, m["tile_idx"], m["x"], m["y"], m["rotation"])
+            if game.turn_phase == "place_meeple":
+                game.place_meeple(cp.id, game.get_meeple_options(cp.id)[0]["position"])
+
+    def snapshot():
+        state = game.to_dict()
+        state["board"]["open_slots"] = sorted(state["board"]["open_slots"])
+        return state
+
+    state = snapshot()
+    placed = list(game.meeples.placed)
+    p2.bot.choose_move(game._build_bot_state(p2))
+    assert snapshot() == state
+    assert game.meeples.placed == placed
+    # finished turns are committed, so no undo records pile up
+    assert game.board._undo_stack == [] and game.meeples._undo_stack == []
+    print("PASS: minimax leaves state untouched")
+
+
+def test_meeple_indexes():
+    random.seed(11)
+    game = GameSession(num_players=2)
+    p1 = game.add_player("Alice")
+    p2 = game.add_player("Bob")
+    mgr = game.meeples
+
+    def check():
+        placed = mgr.placed
+        for edge_type in (EdgeType.ROAD, EdgeType.CITY, EdgeType.FIELD):
+            for nodes in game.board.get_features(edge_type):
+                expected = [m for m in placed if m.node_id in nodes]
+                assert mgr.get_meeples_on_feature(nodes) == expected
+                assert mgr.get_meeples_on_feature(set(nodes)) == expected
+        for pid in (p1.id, p2.id):
+            assert mgr.get_player_meeples(pid) == [m for m in placed if m.player_id == pid]
+        for (x, y) in game.board.grid:
+            assert mgr.get_meeples_at(x, y) == [m for m in placed if m.coord == (x, y)]
+
+    for turn in range(30):
+        cp = game.current_player()
+        if cp is None:
+            break
+        moves = game.get_valid_moves(cp.id)
+        if not moves:
+            break
+        m = random.choice(moves)
+        game.make_move(cp.id, m["tile_idx"], m["x"], m["y"], m["rotation"])
+        if game.turn_phase == "place_meeple":
+            options = game.get_meeple_options(cp.id)
+            game.place_meeple(cp.id, random.choice(options)["position"])
+        check()
+
+        # merges taken back by rollback hand meeples back to the split features
+        board_mark, meeple_mark = game.board.checkpoint(), mgr.checkpoint()
+        hand = game.current_player().hand
+        placements = game.board.get_valid_placements(hand[0]) if hand else []
+        if placements:
+            (x, y), rot = placements[0]
+            game.board.place_tile(hand[0], (x, y), rot)
+            check()
+            mgr.rollback(meeple_mark)
+            game.board.rollback(board_mark)
+            check()
+
+    # the engineer rebuilds the feature index; the meeple map follows it
+    game.board.features.rebuild(game.board.grid)
+    check()
+    assert mgr.placed, "expected some meeples on the board"
+    print(f"PASS: meeple indexes ({len(mgr.placed)} meeples)")
+
+
+def test_incremental_scoring_matches_full_scan():
+    random.seed(21)
+    game = GameSession(num_players=2)
+    game.add_player("Alice")
+    game.add_player("Bob")
+    scoring = game.scoring
+
+    def outcome(coords):
+        mark = scoring.checkpoint()
+        events = scoring.check_and_score_completed(0, coords)
+        result = (sorted((e.player_id, e.points, e.reason, sorted(e.tiles)) for e in events),
+                  sorted(m.node_id for m in game.meeples.placed))
+        scoring.rollback(mark)
+        return result
+
+    compared = scored = 0
+    while game.phase == "playing" and compared < 50:
+        cp = game.current_player()
+        moves = game.get_valid_moves(cp.id)
+        if not moves:
+            break
+        m = random.choice(moves)
+        game.make_move(cp.id, m["tile_idx"], m["x"], m["y"], m["rotation"])
+        if game.turn_phase != "place_meeple":
+            continue
+        options = game.get_meeple_options(cp.id)
+        game.meeples.place(Meeple(cp.id, m["x"], m["y"], random.choice(options)["position"]))
+
+        incremental = outcome([(m["x"], m["y"])])
+        assert incremental == outcome(None)
+        compared += 1
+        scored += bool(incremental[0])
+
+        game.meeples.undo()
+        game.place_meeple(cp.id, random.choice(options)["position"])
+
+    assert compared > 10 and scored > 0
+    print(f"PASS: incremental scoring matches full scan ({compared} turns, {scored} scoring)")
+
+
 if __name__ == "__main__":
     test_meeple_manager_basics()
     test_meeple_exhaustion()
@@ -487,4 +681,9 @@ if __name__ == "__main__":
     test_full_game_with_scoring()
     test_end_game_scoring()
     test_api_meeple_flow()
+    test_completion_counters()
+    test_scoring_rollback()
+    test_minimax_leaves_state_untouched()
+    test_meeple_indexes()
+    test_incremental_scoring_matches_full_scan()
     print("\n=== ALL PHASE 2 TESTS PASSED ===")
@@ -1,13 +1,18 @@
-import sys, os, random, time
+import sys, os, json, random, time
+from collections import defaultdict
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CARCASSONNE_DB", ":memory:")
 
 from game.tile import TileDef, EdgeType, CenterType, TILE_DEFS
 from game.board import Board
 from game.deck import Deck
 from game.scoring import MeepleManager, Meeple, ScoringEngine
-from game.bots import RandomBot, MinimaxBot, create_bot, BotMove
-from game.analytics import AnalyticsEngine, compute_analytics
+from game.bots import RandomBot, MinimaxBot, MCTSBot, ExpectimaxBot, create_bot, BotMove
+from game.bots import MCTS_POOL_SIZE, _mcts_pool
+from game.analytics import AnalyticsEngine, compute_analytics, METRICS
 from game.session import GameSession
+from game.record import GameRecord
+from game import tournament
 
 
 def test_random_bot():
@@ -148,6 +153,170 @@ def test_full_game_vs_minimax_bot():
     print("PASS: full game vs minimax bot")
 
 
+def test_minimax_search_budget():
+    from game.bots import remaining_tile_counts
+    random.seed(3)
+    game = _play_game_for_analytics_turns(12)
+    cp = game.current_player()
+    state = game._build_bot_state(cp)
+
+    unseen = remaining_tile_counts(game.board, cp.hand)
+    deck_size = sum(td.count for td in TILE_DEFS if td.tile_type != "start")
+    assert sum(unseen.values()) == deck_size - (len(game.board.grid) - 1) - len(cp.hand)
+
+    bot = MinimaxBot(max_depth=3, time_budget=0.2)
+    start = time.time()
+    move = bot.choose_move(state)
+    elapsed = time.time() - start
+    assert move is not None
+    assert 1 <= bot.last_search["depth"] <= 3
+    assert bot.last_search["nodes"] > 0
+    assert elapsed < 2.0, f"search overran its budget: {elapsed:.2f}s"
+
+    # a one-ply bot ranks every move by the heuristic and is deterministic
+    shallow = MinimaxBot(max_depth=1)
+    a = shallow.choose_move(state).to_dict()
+    b = shallow.choose_move(state).to_dict()
+    assert a == b
+    print(f"PASS: minimax search budget (depth {bot.last_search['depth']}, {elapsed:.2f}s)")
+
+
+def test_mcts_bot():
+    random.seed(5)
+    game = _play_game_for_analytics_turns(10)
+    cp = game.current_player()
+    state = game._build_bot_state(cp)
+    before = game.to_dict()
+
+    assert isinstance(create_bot("mcts", time_budget=0.1), MCTSBot)
+
+    bot = MCTSBot(time_budget=0.2, workers=0, seed=1)
+    start = time.time()
+    move = bot.choose_move(state)
+    elapsed = time.time() - start
+    assert move is not None
+    assert elapsed < 1.0, f"search overran its budget: {elapsed:.2f}s"
+    assert bot.last_search["iterations"] > 10
+    assert 0.0 <= move.score <= 1.0
+
+    legal = game.board.get_valid_placements(cp.hand[move.tile_idx])
+    assert ((move.x, move.y), move.rotation) in legal
+
+    # make/unmake leaves the live game as it was
+    after = game.to_dict()
+    for d in (before, after):
+        d["board"]["open_slots"].sort()
+    assert before == after
+
+    # root-parallel workers search copies and add their visits
+    parallel = MCTSBot(time_budget=0.3, workers=1, seed=2)
+    pool = _mcts_pool()
+    assert parallel.choose_move(state) is not None
+    assert parallel.last_search["workers"] <= 1
+    # a bot asking for more workers shares the same pool, capped at its size
+    greedy = MCTSBot(time_budget=0.1, workers=MCTS_POOL_SIZE + 4, seed=3)
+    assert greedy.workers == MCTS_POOL_SIZE
+    greedy.choose_move(state)
+    assert _mcts_pool() is pool
+    assert MCTSBot().workers == 0  # web sessions' bots stay in-process
+    print(f"PASS: mcts bot ({bot.last_search['iterations_per_sec']} iterations/s)")
+
+
+def test_expectimax_bot():
+    from game.bots import remaining_tile_counts
+    from game.odds import TileOdds
+    random.seed(9)
+    game = _play_game_for_analytics_turns(6)
+    cp = game.current_player()
+
+    bot = create_bot("expectimax")
+    assert isinstance(bot, ExpectimaxBot)
+    move = bot.choose_move(game._build_bot_state(cp))
+    assert move is not None
+    assert ((move.x, move.y), move.rotation) in \
+        game.board.get_valid_placements(cp.hand[move.tile_idx])
+
+    # completion chances stay between 0 and 1 for every open feature
+    for edge_type in (EdgeType.ROAD, EdgeType.CITY):
+        for feature in game.board.features.features(edge_type):
+            p = bot.odds.completion_probability(game.board, feature, 4)
+            assert 0.0 <= p <= 1.0
+            assert p == 1.0 or not feature.complete
+
+    # a few more turns: the synced table matches one built from scratch
+    for _ in range(6):
+        player = game.current_player()
+        m = random.choice(game.get_valid_moves(player.id))
+        game.make_move(player.id, m["tile_idx"], m["x"], m["y"], m["rotation"])
+        if game.turn_phase == "place_meeple":
+            game.skip_meeple(player.id)
+    cp = game.current_player()
+    bot.choose_move(game._build_bot_state(cp))
+    # the board's per-type counts (what the sync reads) survive the search's undos
+    recount = {}
+    for tile in game.board.grid.values():
+        recount[tile.tile_type] = recount.get(tile.tile_type, 0) + 1
+    assert {t: n for t, n in game.board.type_counts.items() if n} == recount
+    fresh = TileOdds(remaining_tile_counts(game.board, cp.hand))
+    assert bot.odds.total == fresh.total
+    for key in list(bot.odds._closers):
+        assert bot.odds.closers(key) == fresh.closers(key)
+    print(f"PASS: expectimax bot ({len(bot.odds._closers)} cached slot keys)")
+
+
+def _play_game_for_analytics_turns(n_turns):
+    game = GameSession(num_players=2)
+    game.add_player("Alice")
+    game.add_player("Bob")
+    for _ in range(n_turns):
+        cp = game.current_player()
+        moves = game.get_valid_moves(cp.id)
+        m = random.choice(moves)
+        game.make_move(cp.id, m["tile_idx"], m["x"], m["y"], m["rotation"])
+        if game.turn_phase == "place_meeple":
+            options = game.get_meeple_options(cp.id)
+            game.place_meeple(cp.id, options[0]["position"])
+    return game
+
+
+def test_tournament():
+    import tempfile
+    # two differently named random bots: cheap games, ratings near equal
+    bots = ["random", "random:"]
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "results.jsonl")
+        summary = tournament.run(bots, games=4, workers=1, seed=2, out=out, bootstrap=50)
+        with open(out) as f:
+            results = [json.loads(line) for line in f]
+    assert len(results) == summary["games"] == 4 and summary["unfinished"] == 0
+    assert [r["bots"] for r in results] == [bots, bots[::-1]] * 2
+    assert results[0]["seed"] == results[1]["seed"] != results[2]["seed"]
+    for bot, s in summary["bots"].items():
+        lo, hi = s["elo_ci"]
+        assert lo <= s["elo"] <= hi and s["think_ms"]["moves"] > 0
+        assert s["wins"] + s["draws"] + s["losses"] == 4
+    assert summary["games_per_second"] > 0 and summary["peak_rss_mb"] > 0
+    assert "games/s" in tournament.format_summary(summary)
+
+    # games are reproducible from their task, in a worker process too, and
+    # the stored record replays to the same scores
+    tasks = tournament.schedule(bots, 2, seed=2)
+    pooled = sorted(tournament._play_all(tasks, workers=2), key=lambda r: r["game"])
+    for task, result in zip(tasks, pooled):
+        again = tournament.play_game(task)
+        assert again["scores"] == result["scores"] and again["record"] == result["record"]
+        rebuilt = GameRecord.decode(bytes.fromhex(result["record"])).to_session()
+        assert [p.score for p in rebuilt.players.values()] == result["scores"]
+
+    # a 90% winner rates about 400 * log10(9) = 382 points higher
+    games = [{"bots": ["a", "b"], "scores": [10, 0] if i % 10 else [0, 10]} for i in range(200)]
+    ratings = tournament.elo_ratings(games, ["a", "b"])
+    assert 360 < ratings["a"] - ratings["b"] < 390 and abs(ratings["a"] + ratings["b"] - 3000) < 1e-6
+    print(f"  {summary['games_per_second']:.1f} games/s, ratings "
+          f"{ {b: round(s['elo']) for b, s in summary['bots'].items()} }")
+    print("PASS: tournament")
+
+
 # ── Analytics Tests ──
 
 def _play_game_for_analytics():
@@ -192,6 +361,66 @@ def test_analytics_heatmap():
     print("PASS: analytics heatmap")
 
 
+def test_rollout_board():
+    from game import rollout
+    from game.rollout import (
+        ROLLOUT_POOL_SIZE, RolloutBoard, completion_rollouts, simulation_seeds)
+
+    random.seed(11)
+    game = _play_game_for_analytics_turns(10)
+    board = game.board
+    cities = [f for f in board.features.features(EdgeType.CITY) if not f.complete]
+    sim = RolloutBoard(board, cities)
+    pristine = RolloutBoard(board, cities)
+
+    # the same placements on both boards leave cities joined and open alike
+    mark = board.checkpoint()
+    deck = list(game.deck.tiles)
+    for td in deck[:8]:
+        placements = board.get_valid_placements(td)
+        if not placements:
+            continue
+        coord, rotation = random.choice(placements)
+        board.place_tile(td, coord, rotation)
+        sim.place(sim.cell(*coord), td, rotation)
+    assert sorted(sim.slots) == sorted(sim.cell(*c) for c in board.open_slots)
+    for feature in board.features.features(EdgeType.CITY):
+        roots = {sim.find(sim.node(n)) for n in feature.nodes}
+        assert len(roots) == 1
+        assert sim.open[roots.pop()] == feature.open_edges
+    board.rollback(mark)
+
+    sim.reset()
+    assert sim.edges == pristine.edges
+    assert sim.parent == pristine.parent and sim.open == pristine.open
+    assert sorted(sim.slots) == sorted(pristine.slots)
+    assert sim.is_slot == pristine.is_slot
+
+    # a simulation's outcome depends on its seed only, not on the batch it ran in
+    seeds = simulation_seeds(300, seed=5)
+    whole = sim.run(deck, seeds)
+    halves = [a + b for a, b in zip(sim.run(deck, seeds[:120]), sim.run(deck, seeds[120:]))]
+    assert whole == halves
+    counts = completion_rollouts(board, cities, deck, 300, seed=5)
+    assert counts == completion_rollouts(board, cities, deck, 300, seed=5)
+    assert all(0 < n <= 300 for n in counts.values())
+    # any workers count shares one fixed-size pool and gives the same counts
+    pooled = sim.completion_counts(deck, 300, seed=5, workers=ROLLOUT_POOL_SIZE + 4)
+    assert pooled == sim.completion_counts(deck, 300, seed=5, workers=2) == counts
+    pool = rollout._ROLLOUT_POOL
+    sim.completion_counts(deck, 300, seed=5, workers=ROLLOUT_POOL_SIZE + 8)
+    assert rollout._ROLLOUT_POOL is pool
+
+    engine = AnalyticsEngine(board, game.meeples, game.players, game.history,
+                             game.deck.remaining())
+    heatmap = engine.heatmap_completion(500, seed=3)
+    assert heatmap == engine.heatmap_completion(500, seed=3)
+    for key, prob in heatmap["cells"].items():
+        lo, hi = heatmap["ci"][key]
+        assert lo <= prob <= hi
+    print(f"PASS: rollout board ({len(counts)} cells reached)")
+
+
 def test_analytics_luck():
     game = _play_game_for_analytics()
     engine = AnalyticsEngine(
@@ -270,6 +499,39 @@ def test_analytics_voronoi():
     print("PASS: analytics voronoi control")
 
 
+def test_spatial_metrics_scale():
+    from types import SimpleNamespace
+    from game.analytics import _close_pairs
+
+    rng = random.Random(21)
+    sets = []
+    for _ in range(150):
+        x, y = rng.randrange(60), rng.randrange(60)
+        sets.append({(x + rng.randrange(3), y + rng.randrange(3)) for _ in range(4)})
+    brute = {}
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            d = min(abs(a - c) + abs(b - e) for a, b in sets[i] for c, e in sets[j])
+            if d <= 3:
+                brute[(i, j)] = d
+    assert _close_pairs(sets, 3) == brute
+    assert _close_pairs(sets, 2) == {k: d for k, d in brute.items() if d <= 2}
+
+    # nearest meeple by Manhattan distance, the earliest placed on a tie
+    meeples = [SimpleNamespace(x=rng.randrange(40), y=rng.randrange(40), player_id=f"p{i % 3}")
+               for i in range(200)]
+    slots = {(rng.randrange(40), rng.randrange(40)) for _ in range(800)}
+    engine = AnalyticsEngine(SimpleNamespace(open_slots=slots), SimpleNamespace(placed=meeples),
+                             {"p0": None, "p1": None, "p2": None}, [], 0)
+    expected = defaultdict(int)
+    for sx, sy in slots:
+        dists = [abs(sx - m.x) + abs(sy - m.y) for m in meeples]
+        expected[meeples[dists.index(min(dists))].player_id] += 1
+    result = engine.voronoi_control()
+    assert {pid: r["area"] for pid, r in result.items()} == dict(expected)
+    print(f"PASS: spatial metrics at scale ({len(brute)} close pairs)")
+
+
 def test_analytics_nash():
     game = _play_game_for_analytics()
     engine = AnalyticsEngine(
@@ -320,6 +582,50 @@ def test_compute_all_analytics():
     print("PASS: compute all analytics")
 
 
+def test_analytics_memoization():
+    random.seed(4)
+    game = _play_game_for_analytics_turns(6)
+    engine = game.analytics
+    calls = defaultdict(int)
+    for name, (method, _) in METRICS.items():
+        def counted(method=method, original=getattr(engine, method)):
+            calls[method] += 1
+            return original()
+        setattr(engine, method, counted)
+
+    # one metric is computed alone, and only once per state
+    single = game.get_analytics("entropy")
+    assert set(single) == {"entropy"} and dict(calls) == {"field_entropy": 1}
+    game.get_analytics()
+    game.get_analytics()
+    assert all(n == 1 for n in calls.values()) and len(calls) == len(METRICS)
+
+    # only the metrics reading a changed input are recomputed
+    game._touch("history")
+    game.get_analytics()
+    recomputed = {m for m, n in calls.items() if n == 2}
+    assert recomputed == {METRICS[k][0] for k, (_, inputs) in METRICS.items()
+                          if "history" in inputs}
+    assert calls["field_entropy"] == 1
+
+    # the heatmap is served stale while a fresh one is computed in the background
+    before = game.get_analytics("heatmap")["heatmap"]
+    cp = game.current_player()
+    if game.turn_phase == "place_meeple":
+        game.skip_meeple(cp.id)
+        cp = game.current_player()
+    move = game.get_valid_moves(cp.id)[0]
+    game.make_move(cp.id, move["tile_idx"], move["x"], move["y"], move["rotation"])
+    assert not engine.is_fresh("heatmap")
+    assert game.get_analytics("heatmap")["heatmap"] is before
+    job = engine.refreshing("heatmap")
+    if job is not None:
+        job.result(timeout=30)
+    after = game.get_analytics("heatmap")["heatmap"]
+    assert engine.is_fresh("heatmap") and after is not before
+    print(f"PASS: analytics memoization ({sum(calls.values())} metric computations)")
+
+
 def test_api_bot_game():
     from app import app
     client = app.test_client()
@@ -421,19 +727,26 @@ if __name__ == "__main__":
     test_bot_auto_turn()
     test_full_game_vs_random_bot()
     test_full_game_vs_minimax_bot()
+    test_minimax_search_budget()
+    test_mcts_bot()
+    test_expectimax_bot()
+    test_tournament()
 
     print("\n=== ANALYTICS TESTS ===")
     test_analytics_heatmap()
+    test_rollout_board()
     test_analytics_luck()
     test_analytics_entropy()
     test_analytics_greed()
     test_analytics_conflict()
     test_analytics_aggression()
     test_analytics_voronoi()
+    test_spatial_metrics_scale()
     test_analytics_nash()
     test_analytics_parasitism()
     test_analytics_depth()
     test_compute_all_analytics()
+    test_analytics_memoization()
 
     print("\n=== API TESTS ===")
     test_api_bot_game()
@@ -1,10 +1,14 @@
 import sys, os, random
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("CARCASSONNE_DB", ":memory:")
 
 from game.tile import TileDef, EdgeType, CenterType, TILE_DEFS, SIDE_NAMES
 from game.board import Board
+from game.deck import Deck
 from game.scoring import MeepleManager, Meeple, ScoringEngine
 from game.session import GameSession
+from game.store import GameStore
+from game.record import GameRecord, Move, Replayer, decode_many, encode_many, _HEADER
 from game.objectives import ObjectiveManager, OBJECTIVES, ObjectiveChecker
 from game.engineer import (
     EngineerManager, get_valid_engineer_targets, apply_engineer_rotation,
@@ -380,6 +384,137 @@ def test_api_engineer():
     print("PASS: API engineer + objectives")
 
 
+def _state(game):
+    # set iteration order (open slots, end-game features) is not kept across a reload
+    state = game.to_dict()
+    state["board"]["open_slots"].sort()
+    state["recent_scores"] = sorted(
+        (e["player_id"], e["reason"], e["points"], sorted(map(tuple, e["tiles"])))
+        for e in state["recent_scores"])
+    return state
+
+
+def _play_bots(store, game, actions):
+    while game.phase == "playing" and actions:
+        game.try_bot_turn()
+        assert store.save(game)
+        actions -= 1
+
+
+def test_game_store():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "games.db")
+        store = GameStore(path, capacity=2, snapshot_every=10)
+        game = store.create(num_players=2, seed=7)
+        for name in ("A", "B"):
+            game.add_player(name, is_bot=True, bot_type="random")
+        _play_bots(store, game, 30)
+        assert store.get(game.id) is game
+
+        # a get() between an action and its save (a poll during a bot turn)
+        # must not count the action as saved
+        game.try_bot_turn()
+        assert store.get(game.id) is game
+        assert store.save(game)
+        rows = store._db.execute(
+            "SELECT COUNT(*), MAX(seq) FROM events WHERE game_id = ?", (game.id,)).fetchone()
+        assert rows == (len(game.actions), len(game.actions) - 1)
+        assert not store.behind(game)
+
+        # a second process on the same file replays the log (from the latest
+        # snapshot) into an identical game
+        other = GameStore(path, capacity=2, snapshot_every=10)
+        copy = other.get(game.id)
+        assert copy is not game and _state(copy) == _state(game)
+
+        # both keep playing: each picks up the other's actions, and a save
+        # made on a copy that missed one is refused
+        _play_bots(other, copy, 5)
+        assert store.behind(game)
+        assert _state(store.get(game.id)) == _state(copy)
+        assert not store.behind(game)
+        _play_bots(store, game, 5)
+        copy.try_bot_turn()
+        assert not other.save(copy)
+        assert _state(other.get(game.id)) == _state(game)
+
+        # least recently used games are snapshotted and dropped, then reloaded
+        for _ in range(2):
+            store.create(num_players=2)
+        assert game.events.closed
+        _play_bots(store, store.get(game.id), 100)
+        reloaded = store.get(game.id)
+        assert reloaded is not game and reloaded.phase == "finished"
+
+        # a fresh session with the same seed, replaying the actions, ends the same
+        replay = GameSession(game.id, 2, {}, seed=7)
+        for action in reloaded.actions:
+            assert "error" not in replay.apply(action)
+        assert _state(replay) == _state(reloaded)
+        assert store.get("missing") is None and "missing" not in store and len(store) == 3
+        store.close()
+        other.close()
+    print(f"  {len(reloaded.actions)} actions logged, replayed identically")
+    print("PASS: game store")
+
+
+def test_game_record():
+    rng = random.Random(3)
+    games = []
+    for seed in (11, 12, 13):
+        game = GameSession(seed=seed)
+        for name in ("Player 1", "Player 2"):
+            game.add_player(name, is_bot=True, bot_type="random")
+        while game.phase == "playing":
+            cp = game.current_player()
+            targets = game.get_engineer_targets(cp.id) if game.turn_phase == "place_tile" else []
+            if targets and rng.random() < 0.1:
+                t = rng.choice(targets)
+                game.use_engineer(cp.id, t["x"], t["y"])
+            game.try_bot_turn()
+        games.append(game)
+
+    # the same seed deals the same deck
+    assert [t.tile_type for t in Deck(seed=11).tiles] == [t.tile_type for t in Deck(seed=11).tiles]
+
+    records = [GameRecord.from_session(g) for g in games]
+    data = encode_many(records)
+    turns = sum(len(r.moves) for r in records)
+    assert len(data) < 6 * turns, f"{len(data)} bytes for {turns} turns"
+    assert decode_many(data) == records
+    assert GameRecord.decode(records[0].encode()) == records[0]
+    for bad in (data[:5], records[0].encode()[:-1], b"XYZ" + data[3:]):
+        try:
+            GameRecord.decode(bad)
+            assert False, "corrupt record decoded"
+        except ValueError:
+            pass
+    # a tile code past TILE_DEFS is a bad move, not a short read
+    bad = bytearray(GameRecord(1, moves=[Move("place", 1, 0, "start")]).encode())
+    bad[_HEADER.size + 1] |= 31 << 2
+    try:
+        GameRecord.decode(bytes(bad))
+        assert False, "corrupt record decoded"
+    except ValueError as e:
+        assert "bad move" in str(e)
+
+    assert any(m.kind == "engineer" for r in records for m in r.moves)
+    for game, record in zip(games, records):
+        # the full game plays back to the same scores, the board to the same tiles
+        rebuilt = record.to_session()
+        assert {p.name: p.score for p in rebuilt.players.values()} == \
+            {p.name: p.score for p in game.players.values()}
+        assert record.board().to_dict()["tiles"] == game.board.to_dict()["tiles"]
+
+        # seeking back and forth (across engineer rotations) matches fresh replays
+        replayer = Replayer(record)
+        for turn in rng.sample(range(len(record.moves) + 1), 10):
+            assert replayer.seek(turn).to_dict()["tiles"] == record.board(turn).to_dict()["tiles"]
+    print(f"  {len(data)} bytes for {turns} turns ({len(data) / turns:.1f} per turn)")
+    print("PASS: game record")
+
+
 if __name__ == "__main__":
     print("=== ENGINEER TESTS ===")
     test_engineer_manager()
@@ -403,5 +538,7 @@ if __name__ == "__main__":
     print("\n=== INTEGRATION TESTS ===")
     test_full_game_with_mechanics()
     test_api_engineer()
+    test_game_store()
+    test_game_record()
 
     print("\n=== ALL PHASE 4 TESTS PASSED ===")